@@ -0,0 +1,46 @@
+"""In-process ASGI driver shared by the benchmark scripts."""
+
+import asyncio
+
+
+def http_scope(path: str, headers: list[tuple[bytes, bytes]]) -> dict:
+    """Build the scope of a GET request."""
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"testserver"), (b"accept", b"*/*"), *headers],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+
+async def request(app, scope: dict) -> None:
+    """Run a request through the app, without a server."""
+    done = asyncio.Event()
+    received = False
+
+    async def receive():
+        nonlocal received
+
+        if received:
+            # Disconnect once the response is sent, as a client would
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        received = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and not message.get(
+            "more_body", False
+        ):
+            done.set()
+
+    await app(dict(scope), receive, send)
@@ -0,0 +1,115 @@
+"""Synthetic profiles shared by the benchmark scripts."""
+
+import base64
+import json
+from uuid import UUID
+
+import zstandard as zstd
+
+
+def tenant_uuid(index: int) -> UUID:
+    return UUID(int=(1 << 120) + index)
+
+
+def account_uuid(index: int) -> UUID:
+    return UUID(int=(2 << 120) + index)
+
+
+def role_uuid(index: int) -> UUID:
+    return UUID(int=(3 << 120) + index)
+
+
+ROLES = ["admin", "editor", "viewer", "customer"]
+
+
+def license_record(index: int, n_tenants: int, n_accounts: int) -> dict:
+    return {
+        "accId": str(account_uuid(index % n_accounts)),
+        "sysAcc": False,
+        "tenantId": str(tenant_uuid(index % n_tenants)),
+        "accName": f"ACCOUNT_{index % n_accounts:06d}",
+        "role": ROLES[index % len(ROLES)],
+        "roleId": str(role_uuid(index % len(ROLES))),
+        "perm": "write" if index % 3 == 0 else "read",
+        "verified": index % 2 == 0,
+    }
+
+
+def license_url(index: int, n_tenants: int, n_accounts: int) -> str:
+    record = license_record(index, n_tenants, n_accounts)
+    name = base64.b64encode(record["accName"].encode("utf-8")).decode("ascii")
+    perm = 1 if record["perm"] == "write" else 0
+    return (
+        f"t/{record['tenantId']}/a/{record['accId']}/r/{record['roleId']}"
+        f"?p={record['role']}:{perm}&s=0&v={int(record['verified'])}&n={name}"
+    )
+
+
+def profile_dict(
+    n_licenses: int,
+    form: str = "records",
+    n_tenants: int = 8,
+    n_accounts: int = 1000,
+) -> dict:
+    """Build a profile dict with `n_licenses` licensed resources.
+
+    Args:
+        n_licenses: Number of licensed resources.
+        form: Either "records" or "urls".
+        n_tenants: Number of distinct tenants.
+        n_accounts: Number of distinct accounts.
+    """
+    if form == "records":
+        licenses = {
+            "records": [
+                license_record(i, n_tenants, n_accounts)
+                for i in range(n_licenses)
+            ]
+        }
+    else:
+        licenses = {
+            "urls": [
+                license_url(i, n_tenants, n_accounts) for i in range(n_licenses)
+            ]
+        }
+
+    return {
+        "owners": [
+            {
+                "id": str(UUID(int=1)),
+                "email": "user@example.com",
+                "firstName": "User",
+                "lastName": "Family Name",
+                "username": "user",
+                "isPrincipal": True,
+            }
+        ],
+        "accId": str(UUID(int=2)),
+        "isSubscription": False,
+        "isManager": False,
+        "isStaff": False,
+        "ownerIsActive": True,
+        "accountIsActive": True,
+        "accountWasApproved": True,
+        "accountWasArchived": False,
+        "accountWasDeleted": False,
+        "verboseStatus": "verified",
+        "licensedResources": licenses,
+        "tenantsOwnership": {"records": []},
+    }
+
+
+def encode_profile(profile: dict) -> str:
+    """Compress and encode a profile dict as the gateway does."""
+    payload = json.dumps(profile).encode("utf-8")
+    compressed = zstd.ZstdCompressor().compress(payload)
+    return base64.standard_b64encode(compressed).decode("ascii")
+
+
+def report(title: str, rows: list[tuple[str, ...]]) -> None:
+    """Print a small aligned table."""
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    print(title)
+    for row in rows:
+        print("  " + "  ".join(c.rjust(w) for c, w in zip(row, widths)))
+    print()
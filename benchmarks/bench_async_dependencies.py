@@ -0,0 +1,115 @@
+"""Compare the request latency of the sync and async profile dependencies.
+
+`def` dependencies are run in the AnyIO threadpool, whose 40 tokens queue the
+requests beyond that concurrency, while `async def` ones run on the event
+loop: inline for small profiles, in the configured executor from the default
+offload threshold on. Requests are driven in-process, without a server, in bursts of
+`CONCURRENCY` arriving together, with the profile cache disabled so that every
+request decodes. Latencies are measured from the arrival of the burst.
+
+Run with: python benchmarks/bench_async_dependencies.py
+"""
+
+import asyncio
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from _asgi import http_scope, request
+from _profiles import encode_profile, profile_dict, report
+from fastapi import Depends, FastAPI
+
+from myc_http_tools.fastapi import (
+    configure_profile_decoding,
+    get_profile_from_header_required,
+    get_profile_from_header_required_async,
+)
+from myc_http_tools.settings import (
+    DEFAULT_PROFILE_KEY,
+    DEFAULT_PROFILE_OFFLOAD_THRESHOLD as THRESHOLD,
+)
+
+CONCURRENCY = 256
+ROUNDS = 8
+
+
+def build_app(dependency) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/me")
+    async def me(profile=Depends(dependency)):
+        return {"ok": profile is not None}
+
+    return app
+
+
+async def latencies(app: FastAPI, headers: list[bytes]) -> list[float]:
+    scopes = [
+        http_scope("/me", [(DEFAULT_PROFILE_KEY.encode(), header)])
+        for header in headers
+    ]
+
+    async def timed(start: float, scope: dict) -> float:
+        await request(app, scope)
+        return time.perf_counter() - start
+
+    async def burst() -> list[float]:
+        # Requests arrive together, so the latency includes queueing
+        start = time.perf_counter()
+        return await asyncio.gather(
+            *(timed(start, scopes[i % len(scopes)]) for i in range(CONCURRENCY))
+        )
+
+    await burst()  # warm up
+
+    samples = []
+    for _ in range(ROUNDS):
+        samples += await burst()
+
+    return samples
+
+
+def percentiles(samples: list[float]) -> tuple[str, str]:
+    cuts = statistics.quantiles(samples, n=100)
+    return f"{cuts[49] * 1000:,.1f}", f"{cuts[98] * 1000:,.1f}"
+
+
+def main() -> None:
+    sync_app = build_app(get_profile_from_header_required)
+    async_app = build_app(get_profile_from_header_required_async)
+
+    small = encode_profile(profile_dict(10)).encode("ascii")
+    large = encode_profile(profile_dict(1_000)).encode("ascii")
+    workloads = (
+        (f"small headers ({len(small):,} bytes)", [small]),
+        (f"large headers ({len(large):,} bytes)", [large]),
+        ("1 large header in 16", [large] + [small] * 15),
+    )
+
+    with (
+        ThreadPoolExecutor(4) as threads,
+        ProcessPoolExecutor(4) as processes,
+    ):
+        setups = (
+            ("def", sync_app, None, None),
+            ("async def, inline", async_app, None, None),
+            ("async def, threads", async_app, threads, THRESHOLD),
+            ("async def, processes", async_app, processes, THRESHOLD),
+        )
+
+        for title, headers in workloads:
+            rows = [("dependency", "p50 (ms)", "p99 (ms)")]
+
+            for name, app, executor, threshold in setups:
+                configure_profile_decoding(executor, threshold)
+                rows.append(
+                    (name, *percentiles(asyncio.run(latencies(app, headers))))
+                )
+
+            report(f"{title}, {CONCURRENCY} concurrent requests", rows)
+
+    configure_profile_decoding()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Time authorization guards, as predicates and as exception-based chains.
+
+`Profile.can` answers from the selection masks and the per tenant and role
+permission table of the licensed resources, without building the filtered
+profiles nor raising on the negative path. `Profile.can_many` answers a batch
+of queries from tables of the highest permission granted per tenant, account
+and role, built once per batch.
+
+Run with: python benchmarks/bench_authorization.py
+"""
+
+import random
+import timeit
+
+from _profiles import ROLES, account_uuid, profile_dict, report, tenant_uuid
+from myc_http_tools.exceptions import (
+    InsufficientLicensesError,
+    InsufficientPrivilegesError,
+)
+from myc_http_tools.models.access_query import AccessQuery
+from myc_http_tools.models.permission import Permission
+from myc_http_tools.models.profile import Profile
+
+N_QUERIES = 1_000
+N_BATCH_QUERIES = 10_000
+N_BATCH_LICENSES = 5_000
+
+
+def chain_guard(profile: Profile, query: tuple) -> bool:
+    """The guard written as a filter chain."""
+    tenant_id, account_id, roles, permission = query
+    profile = profile.on_tenant(tenant_id)
+    if account_id is not None:
+        profile = profile.on_account(account_id)
+    profile = profile.with_roles(roles)
+    if permission is Permission.WRITE:
+        profile = profile.with_write_access()
+
+    try:
+        profile.get_related_account_or_error()
+        return True
+    except (InsufficientLicensesError, InsufficientPrivilegesError):
+        return False
+
+
+def predicate_guard(profile: Profile, query: tuple) -> bool:
+    """The guard written with `Profile.can`."""
+    tenant_id, account_id, roles, permission = query
+    return profile.can(
+        permission, tenant_id=tenant_id, account_id=account_id, roles=roles
+    )
+
+
+def make_queries(
+    n_tenants: int,
+    n_accounts: int,
+    with_account: bool,
+    n_queries: int = N_QUERIES,
+):
+    """Random guards, about half of them denied."""
+    rng = random.Random(0)
+    return [
+        (
+            tenant_uuid(rng.randrange(n_tenants * 2)),
+            account_uuid(rng.randrange(n_accounts)) if with_account else None,
+            [rng.choice(ROLES)],
+            rng.choice(list(Permission)),
+        )
+        for _ in range(n_queries)
+    ]
+
+
+def batch_throughput() -> None:
+    """Queries per second of the per-query and batch guards."""
+    profile = Profile.model_validate(profile_dict(N_BATCH_LICENSES))
+    queries = [
+        AccessQuery(tenant_id, account_id, roles[0], permission)
+        for tenant_id, account_id, roles, permission in make_queries(
+            8, 1000, True, N_BATCH_QUERIES
+        )
+    ]
+    guards = [
+        (tenant_id, account_id, [role], permission)
+        for tenant_id, account_id, role, permission in queries
+    ]
+
+    assert profile.can_many(queries) == [
+        predicate_guard(profile, guard) for guard in guards
+    ]
+
+    timings = {
+        "chain": lambda: [chain_guard(profile, guard) for guard in guards],
+        "can": lambda: [predicate_guard(profile, guard) for guard in guards],
+        "can_many": lambda: profile.can_many(queries),
+    }
+
+    rows = [("guard", "total (ms)", "queries/s")]
+
+    for label, run in timings.items():
+        elapsed = min(timeit.repeat(run, number=1, repeat=3))
+        rows.append(
+            (
+                label,
+                f"{elapsed * 1e3:.1f}",
+                f"{N_BATCH_QUERIES / elapsed:,.0f}",
+            )
+        )
+
+    report(
+        f"Batch authorization ({N_BATCH_QUERIES:,} tenant, account and role"
+        f" queries, {N_BATCH_LICENSES:,} licenses)",
+        rows,
+    )
+
+
+def main() -> None:
+    rows = [("guard", "licenses", "chain (us)", "can (us)", "speedup")]
+
+    for n_licenses in (1_000, 20_000):
+        profile = Profile.model_validate(profile_dict(n_licenses))
+
+        for label, with_account in (
+            ("tenant, role", False),
+            ("tenant, account, role", True),
+        ):
+            queries = make_queries(8, 1000, with_account)
+            assert [chain_guard(profile, q) for q in queries] == [
+                predicate_guard(profile, q) for q in queries
+            ]
+
+            chain = min(
+                timeit.repeat(
+                    lambda: [chain_guard(profile, q) for q in queries],
+                    number=1,
+                )
+            )
+            predicate = min(
+                timeit.repeat(
+                    lambda: [predicate_guard(profile, q) for q in queries],
+                    number=1,
+                )
+            )
+
+            rows.append(
+                (
+                    label,
+                    f"{n_licenses:,}",
+                    f"{chain / N_QUERIES * 1e6:.1f}",
+                    f"{predicate / N_QUERIES * 1e6:.1f}",
+                    f"{chain / predicate:.1f}x",
+                )
+            )
+
+    report(f"Authorization guards ({N_QUERIES:,} queries)", rows)
+    batch_throughput()
+
+
+if __name__ == "__main__":
+    main()
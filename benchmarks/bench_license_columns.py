@@ -0,0 +1,87 @@
+"""Compare the memory held by row and columnar licensed resources.
+
+Rows are one pydantic `LicensedResource` per license, with three `UUID`s.
+Columns pack UUIDs in byte buffers, intern roles and names and keep the flags
+in a byte per license. Records are validated from the "records" form, so the
+memory of the URL strings is not counted.
+
+Run with: python benchmarks/bench_license_columns.py
+"""
+
+import gc
+import timeit
+import tracemalloc
+
+from _profiles import account_uuid, profile_dict, report, tenant_uuid
+from myc_http_tools.exceptions import InsufficientPrivilegesError
+from myc_http_tools.models.licensed_resources import LicensedResources
+from myc_http_tools.models.profile import Profile
+
+N_LICENSES = 20_000
+
+
+def retained(build) -> tuple[int, object]:
+    """Return the bytes still allocated by `build` once it returns."""
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, value
+
+
+def chain(profile: Profile) -> None:
+    try:
+        profile.on_tenant(tenant_uuid(0)).with_read_access().with_roles(
+            ["admin"]
+        ).on_account(account_uuid(0)).get_related_account_or_error()
+    except InsufficientPrivilegesError:
+        pass
+
+
+def main() -> None:
+    data = profile_dict(N_LICENSES, form="records", n_accounts=N_LICENSES)
+    licenses = data["licensedResources"]
+
+    rows_size, rows = retained(
+        lambda: LicensedResources.model_validate(licenses)
+    )
+    columns_size, columns = retained(
+        lambda: LicensedResources.model_validate(
+            licenses, context={"columnar_licenses": True}
+        )
+    )
+    assert rows == columns
+
+    rows_profile = Profile.model_validate(data)
+    columns_profile = Profile.model_validate(
+        data, context={"columnar_licenses": True}
+    )
+    rows_chain = min(timeit.repeat(lambda: chain(rows_profile), number=20))
+    columns_chain = min(
+        timeit.repeat(lambda: chain(columns_profile), number=20)
+    )
+
+    report(
+        f"Licensed resources memory ({N_LICENSES:,} licenses)",
+        [
+            ("store", "MB", "bytes/license", "filter chain (ms)"),
+            (
+                "rows",
+                f"{rows_size / 1e6:.2f}",
+                f"{rows_size / N_LICENSES:.0f}",
+                f"{rows_chain / 20 * 1e3:.3f}",
+            ),
+            (
+                "columns",
+                f"{columns_size / 1e6:.2f}",
+                f"{columns_size / N_LICENSES:.0f}",
+                f"{columns_chain / 20 * 1e3:.3f}",
+            ),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Time existence checks on URL licenses, streamed and fully parsed.
+
+`LicensedResources.has_match` streams URLs not parsed yet through
+`iter_licenses`, parsing them up to the first match. The "parse all" column
+parses the whole vector first, as filters do. The process-wide license URL
+cache is disabled, so that every check parses its URLs.
+
+Run with: python benchmarks/bench_license_iterator.py
+"""
+
+import timeit
+
+from _profiles import profile_dict, report, tenant_uuid
+from myc_http_tools.models.licensed_resources import (
+    LicensedResources,
+    configure_license_url_cache,
+)
+from myc_http_tools.models.permission import Permission
+from myc_http_tools.settings import DEFAULT_LICENSE_URL_CACHE_MAX_ENTRIES
+
+CHECKS = {
+    "write license on a tenant": (tenant_uuid(3), Permission.WRITE),
+    "license on a missing tenant": (tenant_uuid(99), Permission.READ),
+}
+
+
+def parse_all(urls: list[str], tenant_id, permission) -> bool:
+    licensed_resources = LicensedResources.model_construct(urls=urls)
+    return any(
+        resource.tenant_id == tenant_id
+        and (permission is Permission.READ or resource.perm is Permission.WRITE)
+        for resource in licensed_resources.to_licenses_vector()
+    )
+
+
+def streamed(urls: list[str], tenant_id, permission) -> bool:
+    licensed_resources = LicensedResources.model_construct(urls=urls)
+    return licensed_resources.has_match(
+        tenant_id=tenant_id, permission=permission
+    )
+
+
+def main() -> None:
+    configure_license_url_cache(0)
+    rows = [("check", "licenses", "parse all (ms)", "streamed (ms)")]
+
+    for n_licenses in (1_000, 50_000):
+        urls = profile_dict(n_licenses, form="urls")["licensedResources"][
+            "urls"
+        ]
+
+        for label, (tenant_id, permission) in CHECKS.items():
+            assert parse_all(urls, tenant_id, permission) == streamed(
+                urls, tenant_id, permission
+            )
+
+            timings = [
+                min(
+                    timeit.repeat(
+                        lambda: check(urls, tenant_id, permission),
+                        number=1,
+                        repeat=3,
+                    )
+                )
+                for check in (parse_all, streamed)
+            ]
+
+            rows.append(
+                (
+                    label,
+                    f"{n_licenses:,}",
+                    *(f"{seconds * 1e3:.2f}" for seconds in timings),
+                )
+            )
+
+    configure_license_url_cache(DEFAULT_LICENSE_URL_CACHE_MAX_ENTRIES)
+    report("Existence checks on URL licenses", rows)
+
+
+if __name__ == "__main__":
+    main()
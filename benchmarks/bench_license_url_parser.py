@@ -0,0 +1,44 @@
+"""Compare the per-URL cost of the license URL parsers.
+
+The generic parser goes through `urlparse`, `parse_qs` and full pydantic
+validation. Canonical URLs now take a precompiled pattern and skip validation.
+
+Run with: python benchmarks/bench_license_url_parser.py
+"""
+
+import timeit
+
+from _profiles import license_url, report
+from myc_http_tools.models.licensed_resources import LicensedResource
+
+
+def main() -> None:
+    urls = [license_url(i, n_tenants=8, n_accounts=1000) for i in range(1000)]
+
+    def generic() -> None:
+        for url in urls:
+            LicensedResource._parse_url(url)
+
+    def fast() -> None:
+        for url in urls:
+            LicensedResource.from_str(url)
+
+    legacy = min(timeit.repeat(generic, number=5)) / (5 * len(urls))
+    current = min(timeit.repeat(fast, number=5)) / (5 * len(urls))
+
+    report(
+        "License URL parsing (per URL)",
+        [
+            ("parser", "us/URL", "speedup"),
+            ("urlparse + validation", f"{legacy * 1e6:.2f}", "1.00x"),
+            (
+                "precompiled pattern",
+                f"{current * 1e6:.2f}",
+                f"{legacy / current:.2f}x",
+            ),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
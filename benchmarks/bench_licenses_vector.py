@@ -0,0 +1,145 @@
+"""Count URL parses across the README filter chain.
+
+`LicensedResources.to_licenses_vector` memoizes parsed URLs, so a profile
+checked several times (or served from the profile cache) parses each URL once.
+The "no memo" columns drop the memoized vector before every call. The first
+filter of a profile is checked on the raw URL segments, so a single check,
+as made on a profile decoded for one request, parses the matching URLs only.
+The process-wide license URL cache is disabled, so that every parse is counted.
+
+Run with: python benchmarks/bench_licenses_vector.py
+"""
+
+import timeit
+from contextlib import contextmanager
+
+from _profiles import account_uuid, profile_dict, report, tenant_uuid
+from myc_http_tools.exceptions import InsufficientPrivilegesError
+from myc_http_tools.models.licensed_resources import (
+    LicensedResource,
+    LicensedResources,
+    configure_license_url_cache,
+    get_license_url_cache_stats,
+)
+from myc_http_tools.models.profile import Profile
+
+CHAINS = 5
+
+
+@contextmanager
+def without_url_cache():
+    """Disable the license URL cache, restoring its size afterwards."""
+    max_entries = get_license_url_cache_stats().max_entries
+    configure_license_url_cache(0)
+    try:
+        yield
+    finally:
+        configure_license_url_cache(max_entries)
+
+
+@contextmanager
+def counting_from_str():
+    """Count `LicensedResource.from_str` calls."""
+    calls = [0]
+    original = LicensedResource.__dict__["from_str"]
+
+    def from_str(cls, value):
+        calls[0] += 1
+        return original.__func__(cls, value)
+
+    LicensedResource.from_str = classmethod(from_str)
+    try:
+        with without_url_cache():
+            yield calls
+    finally:
+        LicensedResource.from_str = original
+
+
+@contextmanager
+def without_memo():
+    """Drop the memoized vector before every call."""
+    original = LicensedResources.to_licenses_vector
+
+    def to_licenses_vector(self):
+        self._licenses_vector = None
+        return original(self)
+
+    LicensedResources.to_licenses_vector = to_licenses_vector
+    try:
+        yield
+    finally:
+        LicensedResources.to_licenses_vector = original
+
+
+def readme_chain(profile: Profile) -> None:
+    """The filter chain from the README."""
+    try:
+        profile.on_tenant(tenant_uuid(0)).with_read_access().with_roles(
+            ["admin"]
+        ).on_account(account_uuid(0)).get_related_account_or_error()
+    except InsufficientPrivilegesError:
+        pass
+
+
+def run_chains(profile: Profile) -> None:
+    for _ in range(CHAINS):
+        readme_chain(profile)
+
+
+def measure(data: dict, run=run_chains) -> tuple[int, float]:
+    """Count parses and time the chains on freshly validated profiles."""
+    with counting_from_str() as calls:
+        run(Profile.model_validate(data))
+
+    profiles = [Profile.model_validate(data) for _ in range(5)]
+    seconds = min(
+        timeit.timeit(lambda: run(profile), number=1) for profile in profiles
+    )
+    return calls[0], seconds
+
+
+def main() -> None:
+    rows = [
+        (
+            "licenses",
+            "no memo parses",
+            "memo parses",
+            "no memo (ms)",
+            "memo (ms)",
+        )
+    ]
+
+    for n_licenses in (100, 1_000, 10_000):
+        data = profile_dict(n_licenses, form="urls")
+
+        with without_memo():
+            legacy_calls, legacy = measure(data)
+
+        calls, current = measure(data)
+
+        rows.append(
+            (
+                f"{n_licenses:,}",
+                f"{legacy_calls:,}",
+                f"{calls:,}",
+                f"{legacy * 1e3:.2f}",
+                f"{current * 1e3:.2f}",
+            )
+        )
+
+    report(f"README filter chain, {CHAINS} checks per profile (URL form)", rows)
+
+    rows = [("licenses", "parses", "check (ms)")]
+
+    for n_licenses in (100, 1_000, 10_000):
+        calls, seconds = measure(
+            profile_dict(n_licenses, form="urls"), readme_chain
+        )
+        rows.append((f"{n_licenses:,}", f"{calls:,}", f"{seconds * 1e3:.2f}"))
+
+    report("README filter chain, one check per profile (URL form)", rows)
+
+
+if __name__ == "__main__":
+    with without_url_cache():
+        main()
@@ -0,0 +1,91 @@
+"""Compare the throughput of the profile middleware setups.
+
+The `BaseHTTPMiddleware` setup mounts `profile_middleware`, which runs the
+route in a separate task and relays its response through a memory stream.
+`ProfileMiddleware` is a plain ASGI middleware reading the header straight
+from the scope. Requests are driven in-process, without a server, with the
+profile cache enabled so that the middleware overhead is not hidden by
+decoding. The "stream" route sends its body in 64 chunks.
+
+Run with: python benchmarks/bench_profile_middleware.py
+"""
+
+import asyncio
+import time
+
+from _asgi import http_scope, request
+from _profiles import encode_profile, profile_dict, report
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from myc_http_tools.fastapi import ProfileMiddleware, profile_middleware
+from myc_http_tools.functions import ProfileCache, configure_profile_cache
+from myc_http_tools.settings import DEFAULT_PROFILE_KEY
+
+REQUESTS = 3_000
+CHUNKS = 64
+
+
+def build_app(setup: str) -> FastAPI:
+    app = FastAPI()
+
+    if setup == "BaseHTTPMiddleware":
+        app.add_middleware(BaseHTTPMiddleware, dispatch=profile_middleware)
+    elif setup == "ProfileMiddleware":
+        app.add_middleware(ProfileMiddleware)
+
+    @app.get("/me")
+    async def me(request: Request):
+        profile = getattr(request.state, "profile", None)
+        return {"ok": profile is not None}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(CHUNKS):
+                yield b"x" * 1024
+
+        return StreamingResponse(chunks())
+
+    return app
+
+
+async def throughput(app: FastAPI, path: str, header: bytes) -> float:
+    scope = http_scope(path, [(DEFAULT_PROFILE_KEY.encode(), header)])
+
+    for _ in range(100):  # warm up, and fill the profile cache
+        await request(app, scope)
+
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        await request(app, scope)
+
+    return REQUESTS / (time.perf_counter() - start)
+
+
+def main() -> None:
+    configure_profile_cache(ProfileCache())
+    header = encode_profile(profile_dict(100)).encode("ascii")
+    setups = ("no middleware", "BaseHTTPMiddleware", "ProfileMiddleware")
+
+    rows = [("middleware", "JSON (req/s)", "stream (req/s)")]
+
+    for setup in setups:
+        app = build_app(setup)
+        rows.append(
+            (
+                setup,
+                *(
+                    f"{asyncio.run(throughput(app, path, header)):,.0f}"
+                    for path in ("/me", "/stream")
+                ),
+            )
+        )
+
+    configure_profile_cache(None)
+    report(f"Profile middleware throughput ({REQUESTS:,} requests)", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Compare dict-based and single-pass JSON validation of decoded profiles.
+
+Run with: python benchmarks/bench_profile_validation.py
+"""
+
+import base64
+import json
+import timeit
+
+import zstandard as zstd
+
+from _profiles import encode_profile, profile_dict, report
+from myc_http_tools.functions import decode_and_decompress_profile_from_base64
+from myc_http_tools.models.profile import Profile
+
+
+def legacy_decode(header: str) -> Profile:
+    """The decode path before single-pass validation."""
+    decoded = base64.standard_b64decode(header.encode("utf-8"))
+    decompressed = zstd.ZstdDecompressor().decompress(decoded)
+    return Profile.model_validate(json.loads(decompressed.decode("utf-8")))
+
+
+def main() -> None:
+    rows = [("licenses", "json.loads (ms)", "validate_json (ms)", "speedup")]
+
+    for n_licenses in (10, 1_000, 10_000):
+        header = encode_profile(profile_dict(n_licenses))
+        number = max(1, 20_000 // (n_licenses + 10))
+
+        legacy = min(
+            timeit.repeat(lambda: legacy_decode(header), number=number)
+        )
+        current = min(
+            timeit.repeat(
+                lambda: decode_and_decompress_profile_from_base64(header),
+                number=number,
+            )
+        )
+
+        rows.append(
+            (
+                f"{n_licenses:,}",
+                f"{legacy / number * 1e3:.3f}",
+                f"{current / number * 1e3:.3f}",
+                f"{legacy / current:.2f}x",
+            )
+        )
+
+    report("Profile decoding (records form)", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Time the route-level authorization of `requires` against handler chains.
+
+Handlers usually repeat the README filter chain, building a profile per
+filter before reading the related accounts. `Profile.authorize`, on which the
+`requires` dependency relies, reads the accounts from the matching licenses
+instead, replaying the chain only to raise its error when none matches.
+Routes are driven in-process, without a server, with the profile cache
+enabled as in production.
+
+Run with: python benchmarks/bench_requires.py
+"""
+
+import asyncio
+import random
+import time
+import timeit
+from uuid import UUID
+
+from _asgi import http_scope, request
+from _profiles import ROLES, encode_profile, profile_dict, report, tenant_uuid
+from fastapi import Depends, FastAPI
+
+from myc_http_tools.exceptions import MyceliumError
+from myc_http_tools.fastapi import get_profile_from_header_required, requires
+from myc_http_tools.functions import ProfileCache, configure_profile_cache
+from myc_http_tools.models.permission import Permission
+from myc_http_tools.models.profile import Profile
+from myc_http_tools.settings import DEFAULT_PROFILE_KEY
+
+N_QUERIES = 1_000
+REQUESTS = 2_000
+
+
+def chain(profile: Profile, tenant_id: UUID, role: str):
+    """The related accounts, as handlers get them."""
+    return (
+        profile.with_read_access()
+        .on_tenant(tenant_id)
+        .with_roles([role])
+        .get_related_account_or_error()
+    )
+
+
+def authorize(profile: Profile, tenant_id: UUID, role: str):
+    """The related accounts, as `requires` gets them."""
+    return profile.authorize(Permission.READ, tenant_id=tenant_id, roles=[role])
+
+
+def per_call() -> None:
+    rng = random.Random(0)
+    rows = [("queries", "licenses", "chain (us)", "authorize (us)", "speedup")]
+
+    for n_licenses in (1_000, 20_000):
+        profile = Profile.model_validate(profile_dict(n_licenses))
+        queries = [
+            (tenant_uuid(rng.randrange(16)), rng.choice(ROLES))
+            for _ in range(N_QUERIES)
+        ]
+        granted = [
+            q for q in queries if profile.can(tenant_id=q[0], roles=[q[1]])
+        ]
+        denied = [q for q in queries if q not in granted]
+
+        for label, selected in (("granted", granted), ("denied", denied)):
+
+            def run(guard):
+                for tenant_id, role in selected:
+                    try:
+                        guard(profile, tenant_id, role)
+                    except MyceliumError:
+                        pass
+
+            chained = min(timeit.repeat(lambda: run(chain), number=1))
+            authorized = min(timeit.repeat(lambda: run(authorize), number=1))
+
+            rows.append(
+                (
+                    label,
+                    f"{n_licenses:,}",
+                    f"{chained / len(selected) * 1e6:.1f}",
+                    f"{authorized / len(selected) * 1e6:.1f}",
+                    f"{chained / authorized:.1f}x",
+                )
+            )
+
+    report(f"Related accounts ({N_QUERIES:,} tenant and role queries)", rows)
+
+
+def build_app(setup: str) -> FastAPI:
+    app = FastAPI()
+
+    if setup == "handler chain":
+
+        @app.get("/tenants/{tenant_id}")
+        async def handler(
+            tenant_id: UUID,
+            profile: Profile = Depends(get_profile_from_header_required),
+        ):
+            return chain(profile, tenant_id, ROLES[0]).model_dump()
+
+    else:
+
+        @app.get("/tenants/{tenant_id}")
+        async def handler(
+            related=Depends(
+                requires(roles=[ROLES[0]], tenant_from="path:tenant_id")
+            ),
+        ):
+            return related.model_dump()
+
+    return app
+
+
+async def throughput(app: FastAPI, header: bytes) -> float:
+    scope = http_scope(
+        f"/tenants/{tenant_uuid(0)}", [(DEFAULT_PROFILE_KEY.encode(), header)]
+    )
+
+    for _ in range(100):  # warm up, and fill the profile cache
+        await request(app, scope)
+
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        await request(app, scope)
+
+    return REQUESTS / (time.perf_counter() - start)
+
+
+def per_route() -> None:
+    configure_profile_cache(ProfileCache(scan_resistant=False))
+    rows = [("route", "licenses", "req/s")]
+
+    for n_licenses in (100, 1_000):
+        header = encode_profile(profile_dict(n_licenses)).encode("ascii")
+
+        for setup in ("handler chain", "requires"):
+            rate = asyncio.run(throughput(build_app(setup), header))
+            rows.append((setup, f"{n_licenses:,}", f"{rate:,.0f}"))
+
+    configure_profile_cache(None)
+    report(f"Authorized route throughput ({REQUESTS:,} requests)", rows)
+
+
+def main() -> None:
+    per_call()
+    per_route()
+
+
+if __name__ == "__main__":
+    main()
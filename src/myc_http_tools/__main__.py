@@ -0,0 +1,58 @@
+"""Command line utilities for mycelium-http-tools.
+
+Usage:
+    python -m myc_http_tools train-dictionary profiles/*.json -o profile.dict
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+
+def _train_dictionary(args: argparse.Namespace) -> int:
+    from myc_http_tools.functions import train_profile_dictionary
+
+    samples = [Path(path).read_bytes() for path in args.samples]
+    dictionary, report = train_profile_dictionary(
+        samples, dict_size=args.dict_size, level=args.level
+    )
+
+    Path(args.output).write_bytes(dictionary.as_bytes())
+
+    print(f"Dictionary ID:        {report.dict_id}")
+    print(f"Dictionary size:      {report.dictionary_size} bytes")
+    print(f"Samples:              {report.samples}")
+    print(f"Raw size:             {report.raw_size} bytes")
+    print(
+        f"Compressed size:      {report.compressed_size} bytes "
+        f"(ratio {report.ratio:.2f})"
+    )
+    print(
+        f"With dictionary:      {report.compressed_size_with_dictionary} "
+        f"bytes (ratio {report.ratio_with_dictionary:.2f})"
+    )
+    print(f"Size reduction:       {report.size_reduction:.1%}")
+
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m myc_http_tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train = commands.add_parser(
+        "train-dictionary",
+        help="Train a ZSTD dictionary from captured profile JSON documents",
+    )
+    train.add_argument("samples", nargs="+", help="Profile JSON files")
+    train.add_argument("-o", "--output", required=True)
+    train.add_argument("--dict-size", type=int, default=16 * 1024)
+    train.add_argument("--level", type=int, default=3)
+    train.set_defaults(handler=_train_dictionary)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
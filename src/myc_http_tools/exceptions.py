@@ -39,3 +39,11 @@ class ProfileDecodingError(MyceliumError):
 
     def __init__(self, message: str):
         super().__init__(message=message, code="MYC00020", exp_true=False)
+
+
+class ProfileTooLargeError(ProfileDecodingError):
+    """Raised when a profile exceeds one of the configured size limits."""
+
+    def __init__(self, message: str, limit: int):
+        self.limit = limit
+        super().__init__(message=message)
@@ -1,18 +1,45 @@
 """FastAPI integration for mycelium-http-tools."""
 
+from .config import MyceliumSettings
+
 try:
     from .middleware import (
+        ProfileMiddleware,
+        configure_profile_decoding,
+        configure_settings,
+        get_current_profile,
         get_profile_from_header,
+        get_profile_from_header_async,
         get_profile_from_header_required,
+        get_profile_from_header_required_async,
+        get_lazy_profile_from_header,
+        get_lazy_profile_from_header_required,
         get_profile_from_request,
+        get_profile_projection_from_header,
+        get_settings,
+        lazy_profile_middleware,
         profile_middleware,
+        requires,
     )
 
     __all__ = [
+        "MyceliumSettings",
+        "ProfileMiddleware",
+        "configure_profile_decoding",
+        "configure_settings",
+        "get_current_profile",
         "get_profile_from_header",
+        "get_profile_from_header_async",
         "get_profile_from_header_required",
+        "get_profile_from_header_required_async",
+        "get_lazy_profile_from_header",
+        "get_lazy_profile_from_header_required",
         "get_profile_from_request",
+        "get_profile_projection_from_header",
+        "get_settings",
+        "lazy_profile_middleware",
         "profile_middleware",
+        "requires",
     ]
 
 except ImportError:
@@ -29,15 +56,64 @@ except ImportError:
     def profile_middleware(*args, **kwargs):  # type: ignore[misc]
         _raise_import_error()
 
+    def ProfileMiddleware(*args, **kwargs):  # type: ignore[misc]
+        _raise_import_error()
+
     def get_profile_from_header(*args, **kwargs):  # type: ignore[misc]
         _raise_import_error()
 
     def get_profile_from_header_required(*args, **kwargs):  # type: ignore[misc]
         _raise_import_error()
 
+    def get_profile_from_header_async(*args, **kwargs):  # type: ignore[misc]
+        _raise_import_error()
+
+    def get_profile_from_header_required_async(*args, **kwargs):  # type: ignore[misc]
+        _raise_import_error()
+
+    def configure_profile_decoding(*args, **kwargs):  # type: ignore[misc]
+        _raise_import_error()
+
+    def get_current_profile(*args, **kwargs):  # type: ignore[misc]
+        _raise_import_error()
+
+    def configure_settings(*args, **kwargs):  # type: ignore[misc]
+        _raise_import_error()
+
+    def get_settings(*args, **kwargs):  # type: ignore[misc]
+        _raise_import_error()
+
+    def requires(*args, **kwargs):  # type: ignore[misc]
+        _raise_import_error()
+
+    def get_profile_projection_from_header(*args, **kwargs):  # type: ignore[misc]
+        _raise_import_error()
+
+    def lazy_profile_middleware(*args, **kwargs):  # type: ignore[misc]
+        _raise_import_error()
+
+    def get_lazy_profile_from_header(*args, **kwargs):  # type: ignore[misc]
+        _raise_import_error()
+
+    def get_lazy_profile_from_header_required(*args, **kwargs):  # type: ignore[misc]
+        _raise_import_error()
+
     __all__ = [
+        "MyceliumSettings",
+        "ProfileMiddleware",
+        "configure_profile_decoding",
+        "configure_settings",
+        "get_current_profile",
         "get_profile_from_header",
+        "get_profile_from_header_async",
         "get_profile_from_header_required",
+        "get_profile_from_header_required_async",
+        "get_lazy_profile_from_header",
+        "get_lazy_profile_from_header_required",
         "get_profile_from_request",
+        "get_profile_projection_from_header",
+        "get_settings",
+        "lazy_profile_middleware",
         "profile_middleware",
+        "requires",
     ]
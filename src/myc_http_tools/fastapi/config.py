@@ -0,0 +1,122 @@
+"""Settings of the FastAPI integration.
+
+The settings are resolved once, when `configure_settings` is called at
+application startup or else when the first request is handled, instead of
+reading the environment on every request.
+"""
+
+import os
+from typing import Mapping, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+from myc_http_tools.functions.profile_cache import ProfileCache
+from myc_http_tools.settings import (
+    DEFAULT_CONNECTION_STRING_KEY,
+    DEFAULT_EMAIL_KEY,
+    DEFAULT_LICENSE_URL_CACHE_MAX_ENTRIES,
+    DEFAULT_MAX_DECOMPRESSED_PROFILE_SIZE,
+    DEFAULT_MAX_LICENSED_RESOURCES,
+    DEFAULT_MAX_PROFILE_HEADER_SIZE,
+    DEFAULT_MYCELIUM_ROLE_KEY,
+    DEFAULT_PROFILE_CACHE_MAX_BYTES,
+    DEFAULT_PROFILE_CACHE_MAX_ENTRIES,
+    DEFAULT_PROFILE_CACHE_TTL_SECONDS,
+    DEFAULT_PROFILE_KEY,
+    DEFAULT_REQUEST_ID_KEY,
+    DEFAULT_SCOPE_KEY,
+    DEFAULT_TENANT_ID_KEY,
+)
+
+
+class MyceliumSettings(BaseModel):
+    """Immutable settings of the FastAPI integration.
+
+    Args:
+        environment: Deployment environment. Outside "development", missing
+            or invalid profiles are rejected instead of giving None.
+        profile_key: Header holding the profile, read by the middlewares
+            and the profile dependencies.
+        email_key: Header of the user email.
+        scope_key: Header of the request scope.
+        mycelium_role_key: Header of the Mycelium role.
+        request_id_key: Header of the request id.
+        connection_string_key: Header of the connection string.
+        tenant_id_key: Header of the tenant id.
+        max_profile_header_size: Maximum length of the encoded profile, None
+            to disable the limit.
+        max_decompressed_profile_size: Maximum size of the decompressed
+            profile, None to disable the limit.
+        max_licensed_resources: Maximum number of licensed resources, None
+            to disable the limit.
+        profile_cache: Whether to cache decoded profiles.
+        profile_cache_max_entries: Maximum number of cached profiles.
+        profile_cache_max_bytes: Maximum estimated memory of the cached
+            profiles.
+        profile_cache_ttl_seconds: Time to live of the cached profiles.
+        license_url_cache_max_entries: Maximum number of cached license URLs,
+            zero to disable the cache.
+
+    The cache fields left unset keep the caches configured with
+    `configure_profile_cache` and `configure_license_url_cache`.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    environment: str = "development"
+
+    profile_key: str = DEFAULT_PROFILE_KEY
+    email_key: str = DEFAULT_EMAIL_KEY
+    scope_key: str = DEFAULT_SCOPE_KEY
+    mycelium_role_key: str = DEFAULT_MYCELIUM_ROLE_KEY
+    request_id_key: str = DEFAULT_REQUEST_ID_KEY
+    connection_string_key: str = DEFAULT_CONNECTION_STRING_KEY
+    tenant_id_key: str = DEFAULT_TENANT_ID_KEY
+
+    max_profile_header_size: Optional[int] = DEFAULT_MAX_PROFILE_HEADER_SIZE
+    max_decompressed_profile_size: Optional[int] = (
+        DEFAULT_MAX_DECOMPRESSED_PROFILE_SIZE
+    )
+    max_licensed_resources: Optional[int] = DEFAULT_MAX_LICENSED_RESOURCES
+
+    profile_cache: bool = False
+    profile_cache_max_entries: int = DEFAULT_PROFILE_CACHE_MAX_ENTRIES
+    profile_cache_max_bytes: int = DEFAULT_PROFILE_CACHE_MAX_BYTES
+    profile_cache_ttl_seconds: float = DEFAULT_PROFILE_CACHE_TTL_SECONDS
+
+    license_url_cache_max_entries: int = DEFAULT_LICENSE_URL_CACHE_MAX_ENTRIES
+
+    # --------------------------------------------------------------------------
+    # PUBLIC METHODS
+    # --------------------------------------------------------------------------
+
+    @classmethod
+    def from_env(
+        cls, environ: Optional[Mapping[str, str]] = None
+    ) -> "MyceliumSettings":
+        """Build the default settings, reading the environment mode.
+
+        Args:
+            environ: The environment variables, `os.environ` if None. The
+                mode is read from `ENVIRONMENT`, "development" if unset.
+        """
+        if environ is None:
+            environ = os.environ
+
+        return cls(environment=environ.get("ENVIRONMENT", "development"))
+
+    @property
+    def is_development(self) -> bool:
+        """Tell whether missing or invalid profiles are tolerated."""
+        return self.environment == "development"
+
+    def build_profile_cache(self) -> Optional[ProfileCache]:
+        """Return a profile cache of these settings, None if disabled."""
+        if not self.profile_cache:
+            return None
+
+        return ProfileCache(
+            max_entries=self.profile_cache_max_entries,
+            max_bytes=self.profile_cache_max_bytes,
+            ttl=self.profile_cache_ttl_seconds,
+        )
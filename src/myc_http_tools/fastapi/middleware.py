@@ -5,19 +5,53 @@ from HTTP headers in FastAPI applications. The profile is expected to be
 Base64-encoded and ZSTD-compressed in the 'x-mycelium-profile' header.
 """
 
+import asyncio
 import logging
-import os
-from typing import Optional
+from concurrent.futures import Executor
+from contextvars import ContextVar
+from functools import partial
+from typing import (
+    Annotated,
+    Any,
+    Awaitable,
+    Callable,
+    Iterable,
+    NoReturn,
+    Optional,
+)
+from uuid import UUID
 
-from myc_http_tools.exceptions import ProfileDecodingError
-from myc_http_tools.functions import decode_and_decompress_profile_from_base64
+from myc_http_tools.exceptions import (
+    InsufficientLicensesError,
+    InsufficientPrivilegesError,
+    ProfileDecodingError,
+)
+from myc_http_tools.functions import (
+    configure_license_url_cache,
+    configure_profile_cache,
+    decode_and_decompress_profile_from_base64,
+    decode_profile_projection,
+    get_profile_cache,
+    get_zstd_backend,
+)
+from myc_http_tools.functions.decode_and_decompress_profile_from_base64 import (
+    ProfileHeader,
+)
+from myc_http_tools.models.lazy_profile import LazyProfile
+from myc_http_tools.models.permission import Permission
 from myc_http_tools.models.profile import Profile
-from myc_http_tools.settings import DEFAULT_PROFILE_KEY
+from myc_http_tools.models.related_accounts import RelatedAccounts
+from myc_http_tools.settings import (
+    DEFAULT_PROFILE_KEY,
+    DEFAULT_PROFILE_OFFLOAD_THRESHOLD,
+)
+
+from .config import MyceliumSettings
 
 try:
-    from fastapi import HTTPException, Request, Header
+    from fastapi import Depends, HTTPException, Header, Request
     from fastapi.responses import JSONResponse
-    from typing import Annotated
+    from starlette.types import ASGIApp, Receive, Scope, Send
 
     FASTAPI_AVAILABLE = True
 except ImportError:
@@ -51,35 +85,409 @@ except ImportError:
                 "Install with: pip install mycelium-http-tools[fastapi]"
             )
 
-    class Header:  # type: ignore[no-redef]
+    def Header(*args, **kwargs):  # type: ignore[misc]
         """Placeholder for Header when FastAPI is not available."""
+        raise ImportError(
+            "FastAPI dependencies not installed. "
+            "Install with: pip install mycelium-http-tools[fastapi]"
+        )
 
-        def __init__(self, *args, **kwargs):
-            raise ImportError(
-                "FastAPI dependencies not installed. "
-                "Install with: pip install mycelium-http-tools[fastapi]"
-            )
-
-    def Annotated(*args, **kwargs):  # type: ignore[misc]
-        """Placeholder for Annotated when FastAPI is not available."""
+    def Depends(*args, **kwargs):  # type: ignore[misc]
+        """Placeholder for Depends when FastAPI is not available."""
         raise ImportError(
             "FastAPI dependencies not installed. "
             "Install with: pip install mycelium-http-tools[fastapi]"
         )
 
+    ASGIApp = Receive = Scope = Send = Any  # type: ignore[misc]
+
 
 logger = logging.getLogger(__name__)
 
 
-def get_profile_from_request(request: Request) -> Optional[Profile]:
+def _decode_profile(profile_header: ProfileHeader) -> Profile:
+    """Decode the profile header, going through the profile cache if enabled."""
+    cache = get_profile_cache()
+
+    if cache is None:
+        return _settings_binding().decoder(profile_header)
+
+    return cache.get_or_decode(profile_header, _settings_binding().decoder)
+
+
+_decoding_executor: Optional[Executor] = None
+
+_offload_threshold: Optional[int] = DEFAULT_PROFILE_OFFLOAD_THRESHOLD
+
+
+def configure_profile_decoding(
+    executor: Optional[Executor] = None,
+    offload_threshold: Optional[int] = DEFAULT_PROFILE_OFFLOAD_THRESHOLD,
+) -> None:
+    """Set where the async dependencies decode profile headers.
+
+    Headers shorter than `offload_threshold` are decoded inline on the event
+    loop, where a small profile costs less than a thread hop. Longer ones are
+    decoded in `executor`, so a large profile does not stall the other
+    requests of the loop. Process pools decode in their workers, in parallel
+    with the loop, and profiles are still cached in the calling process. The
+    ZSTD backend is selected too, unless already chosen, so its benchmark
+    does not delay the first request.
+
+    Args:
+        executor: Thread or process pool decoding large headers, None for the
+            default executor of the event loop
+        offload_threshold: Header length from which decoding is offloaded,
+            None to always decode inline
+    """
+    global _decoding_executor, _offload_threshold
+    _decoding_executor = executor
+    _offload_threshold = offload_threshold
+
+    # Benchmark the ZSTD backends now rather than on the first request
+    get_zstd_backend()
+
+
+async def _decode_profile_async(profile_header: str) -> Profile:
+    """Decode the profile header, offloading large headers to the executor."""
+    if _offload_threshold is None or len(profile_header) < _offload_threshold:
+        return _decode_profile(profile_header)
+
+    cache = get_profile_cache()
+
+    if cache is not None:
+        profile = cache.get(profile_header)
+        if profile is not None:
+            return profile
+
+    profile = await asyncio.get_running_loop().run_in_executor(
+        _decoding_executor, _settings_binding().decoder, profile_header
+    )
+
+    if cache is not None:
+        profile = cache.put(profile_header, profile)
+
+    return profile
+
+
+# Key of the profile in the request state, shared by every integration point
+# so that the header is decoded once per request
+_PROFILE_STATE_KEY = "profile"
+
+_current_profile: ContextVar[Optional[Profile]] = ContextVar(
+    "myc_http_tools_current_profile"
+)
+
+
+def _attached_profile(request: Optional[Request]) -> Optional[Profile]:
+    """Return the profile already decoded for the request, if any."""
+    if request is None:
+        return None
+
+    return request.scope.get("state", {}).get(_PROFILE_STATE_KEY)
+
+
+def _attach_profile(
+    request: Optional[Request], profile: Optional[Profile]
+) -> Optional[Profile]:
+    """Store the profile in the request state and publish it.
+
+    The next callers of the request reuse the stored profile, and code run in
+    the same context, or in contexts copied from it, reads the published one
+    with `get_current_profile`.
+    """
+    if request is not None:
+        request.scope.setdefault("state", {})[_PROFILE_STATE_KEY] = profile
+        _current_profile.set(profile)
+
+    return profile
+
+
+def get_current_profile() -> Optional[Profile]:
+    """Return the profile of the request being handled.
+
+    Lets service layers reach the profile without the request being passed
+    down to them. The profile is published for the rest of the request,
+    including routes and dependencies run in the threadpool, by
+    `ProfileMiddleware`, `profile_middleware`, `lazy_profile_middleware`,
+    `get_profile_from_request` and the async dependencies. Profiles decoded
+    by `def` dependencies are only published to the threadpool call running
+    them: declare an async dependency, or mount a middleware, to publish them
+    to the route.
+
+    Returns:
+        The profile of the request, None if the header is missing in
+        development mode
+
+    Raises:
+        LookupError: If no profile was published for the request
+    """
+    try:
+        return _current_profile.get()
+    except LookupError:
+        raise LookupError(
+            "No current profile. Mount ProfileMiddleware, or depend on an "
+            "async profile dependency, to publish it."
+        ) from None
+
+
+def _raise_unauthorized(error: Exception) -> NoReturn:
+    """Turn a decoding failure into the HTTP 401 response."""
+    if isinstance(error, ProfileDecodingError):
+        logger.warning(
+            f"Unable to decode and decompress profile: {error.message}"
+        )
+    else:
+        logger.warning(f"Unable to check user identity due: {error}")
+
+    raise HTTPException(
+        status_code=401,
+        detail="Unable to check user identity. Please contact administrators",
+    )
+
+
+def _raise_forbidden() -> NoReturn:
+    """Reject a request missing the profile header in production."""
+    raise HTTPException(
+        status_code=403,
+        detail=f"Required header '{_settings_binding().settings.profile_key}' missing in production environment.",
+    )
+
+
+def _ignore_missing_header() -> None:
+    return None
+
+
+def _ignore_decoding_error(error: Exception) -> None:
+    # In development, we're more lenient with errors
+    logger.debug(f"Failed to decode profile in development mode: {error}")
+    return None
+
+
+# ------------------------------------------------------------------------------
+# SETTINGS
+# ------------------------------------------------------------------------------
+
+
+class _SettingsBinding:
+    """Request handling functions specialized for some settings.
+
+    Requests run straight-line code for the environment mode of the settings
+    instead of checking it, and decode with the limits already bound.
+    """
+
+    __slots__ = (
+        "settings",
+        "decoder",
+        "projection_decoder",
+        "on_missing_header",
+        "on_decoding_error",
+        "profile_key_bytes",
+    )
+
+    def __init__(self, settings: MyceliumSettings):
+        limits = {
+            "max_header_size": settings.max_profile_header_size,
+            "max_decompressed_size": settings.max_decompressed_profile_size,
+            "max_licensed_resources": settings.max_licensed_resources,
+        }
+
+        self.settings = settings
+        self.decoder: Callable[[ProfileHeader], Profile] = partial(
+            decode_and_decompress_profile_from_base64, **limits
+        )
+        self.projection_decoder: Callable[..., Profile] = partial(
+            decode_profile_projection, **limits
+        )
+
+        # Header names are lowercase byte strings in ASGI scopes
+        self.profile_key_bytes = settings.profile_key.lower().encode("latin-1")
+
+        self.on_missing_header: Callable[[], None]
+        self.on_decoding_error: Callable[[Exception], None]
+
+        if settings.is_development:
+            self.on_missing_header = _ignore_missing_header
+            self.on_decoding_error = _ignore_decoding_error
+        else:
+            self.on_missing_header = _raise_forbidden
+            self.on_decoding_error = _raise_unauthorized
+
+
+_binding: Optional[_SettingsBinding] = None
+
+
+def _settings_binding() -> _SettingsBinding:
+    """Return the binding of the settings in use.
+
+    Settings not injected with `configure_settings` are read from the
+    environment on first use, not at import time, so that an `ENVIRONMENT`
+    set by the application after importing the integration still applies.
+    """
+    global _binding
+
+    binding = _binding
+    if binding is None:
+        binding = _binding = _SettingsBinding(MyceliumSettings.from_env())
+
+    return binding
+
+
+# Settings fields describing each process-wide cache
+_PROFILE_CACHE_FIELDS = frozenset(
+    {
+        "profile_cache",
+        "profile_cache_max_entries",
+        "profile_cache_max_bytes",
+        "profile_cache_ttl_seconds",
+    }
+)
+_LICENSE_URL_CACHE_FIELDS = frozenset({"license_url_cache_max_entries"})
+
+
+def configure_settings(
+    settings: Optional[MyceliumSettings] = None,
+) -> MyceliumSettings:
+    """Resolve the settings of the FastAPI integration.
+
+    Unless this is called, the settings are read from the environment when
+    the first request is handled. Call this at application startup to resolve
+    them explicitly, or to inject other settings in tests.
+
+    The profile cache and the license URL cache are only replaced when the
+    settings set some of their fields explicitly, so caches configured with
+    `configure_profile_cache` or `configure_license_url_cache` are kept
+    otherwise. The ZSTD backend is selected too, unless already chosen, so
+    its benchmark does not delay the first request.
+
+    Args:
+        settings: The settings, None to read them from the environment
+
+    Returns:
+        The settings in use
+    """
+    global _binding
+
+    if settings is None:
+        settings = MyceliumSettings.from_env()
+
+    explicit_fields = settings.model_fields_set
+    if not _PROFILE_CACHE_FIELDS.isdisjoint(explicit_fields):
+        configure_profile_cache(settings.build_profile_cache())
+    if not _LICENSE_URL_CACHE_FIELDS.isdisjoint(explicit_fields):
+        configure_license_url_cache(settings.license_url_cache_max_entries)
+
+    _binding = _SettingsBinding(settings)
+
+    # Benchmark the ZSTD backends now rather than on the first request
+    get_zstd_backend()
+
+    return settings
+
+
+def get_settings() -> MyceliumSettings:
+    """Return the settings of the FastAPI integration."""
+    return _settings_binding().settings
+
+
+def _profile_header(
+    request: Request, profile_header: Optional[ProfileHeader] = None
+) -> Optional[ProfileHeader]:
+    """Return the given profile header, else read the one of the request.
+
+    The header of the request is the one named by the settings.
+    """
+    if profile_header is not None:
+        return profile_header
+
+    return request.headers.get(_settings_binding().settings.profile_key)
+
+
+def _required_profile_header(
+    request: Request, profile_header: Optional[ProfileHeader] = None
+) -> ProfileHeader:
+    """Same as `_profile_header`, raising HTTP 401 if the header is missing."""
+    profile_header = _profile_header(request, profile_header)
+    if profile_header is None:
+        raise HTTPException(
+            status_code=401,
+            detail=f"Required header '{_settings_binding().settings.profile_key}' missing.",
+        )
+
+    return profile_header
+
+
+def _declared_profile_header(
+    request: Request,
+    declared_header: Annotated[
+        Optional[str],
+        Header(
+            alias=DEFAULT_PROFILE_KEY,
+            description="Base64-encoded, ZSTD-compressed Mycelium profile",
+        ),
+    ] = None,
+) -> Optional[ProfileHeader]:
+    """Read the profile header of a request, declaring it to OpenAPI.
+
+    The schema names the default header, the value is read from the header
+    named by the `profile_key` setting.
+    """
+    return _profile_header(request)
+
+
+# Profile header parameter of the dependencies, injected by FastAPI
+_DeclaredProfileHeader = Annotated[
+    Optional[ProfileHeader], Depends(_declared_profile_header)
+]
+
+
+def _lazy_profile(profile_header: ProfileHeader) -> LazyProfile:
+    return LazyProfile(
+        profile_header, decoder=_decode_profile, on_error=_raise_unauthorized
+    )
+
+
+def _profile_from_header(
+    profile_header: Optional[ProfileHeader], lazy: bool = False
+) -> Optional[Profile]:
+    """Turn the raw profile header of a request into its profile.
+
+    Args:
+        profile_header: The header value, None if missing
+        lazy: Return a `LazyProfile` decoded on first attribute access
+
+    Raises:
+        HTTPException: If the header is missing or the decoding/decompression
+        fails, in production environment
+    """
+    if profile_header is None:
+        return _settings_binding().on_missing_header()
+
+    if lazy:
+        return _lazy_profile(profile_header)
+
+    try:
+        # Decode and decompress the profile from Base64/ZSTD
+        return _decode_profile(profile_header)
+    except Exception as e:
+        return _settings_binding().on_decoding_error(e)
+
+
+def get_profile_from_request(
+    request: Request, lazy: bool = False
+) -> Optional[Profile]:
     """Extract profile from HTTP headers.
 
     This function extracts the profile from the 'x-mycelium-profile' header
     in the HTTP request. The header should contain a Base64-encoded,
-    ZSTD-compressed profile.
+    ZSTD-compressed profile. The profile is stored in the request state, so
+    the middleware, the dependencies and later calls of the same request
+    reuse it instead of decoding the header again.
 
     Args:
         request: The FastAPI Request object
+        lazy: Return a `LazyProfile` that decodes the header on first
+            attribute access, raising HTTP 401 at that point if decoding fails
 
     Returns:
         Profile object if successfully parsed, None if in development mode
@@ -95,48 +503,15 @@ def get_profile_from_request(request: Request) -> Optional[Profile]:
             "FastAPI dependencies not installed. "
             "Install with: pip install mycelium-http-tools[fastapi]"
         )
-    environment = os.getenv("ENVIRONMENT", "development")
-    incoming_headers = dict(request.headers)
-
-    if environment != "development":
-        if DEFAULT_PROFILE_KEY not in incoming_headers:
-            raise HTTPException(
-                status_code=403,
-                detail=f"Required header '{DEFAULT_PROFILE_KEY}' missing in production environment.",
-            )
-
-        try:
-            # Decode and decompress the profile from Base64/ZSTD
-            return decode_and_decompress_profile_from_base64(
-                incoming_headers[DEFAULT_PROFILE_KEY]
-            )
-        except ProfileDecodingError as e:
-            logger.warning(
-                f"Unable to decode and decompress profile: {e.message}"
-            )
-            raise HTTPException(
-                status_code=401,
-                detail="Unable to check user identity. Please contact administrators",
-            )
-        except Exception as e:
-            logger.warning(f"Unable to check user identity due: {e}")
-            raise HTTPException(
-                status_code=401,
-                detail="Unable to check user identity. Please contact administrators",
-            )
 
-    # In development mode, try to parse if header exists, otherwise return None
-    if DEFAULT_PROFILE_KEY in incoming_headers:
-        try:
-            return decode_and_decompress_profile_from_base64(
-                incoming_headers[DEFAULT_PROFILE_KEY]
-            )
-        except Exception as e:
-            # In development, we're more lenient with errors
-            logger.debug(f"Failed to decode profile in development mode: {e}")
-            return None
+    profile = _attached_profile(request)
+    if profile is not None:
+        return profile
 
-    return None
+    return _attach_profile(
+        request,
+        _profile_from_header(_profile_header(request), lazy=lazy),
+    )
 
 
 async def profile_middleware(request: Request, call_next):
@@ -176,19 +551,127 @@ async def profile_middleware(request: Request, call_next):
     return response
 
 
+async def lazy_profile_middleware(request: Request, call_next):
+    """FastAPI middleware attaching a lazily decoded profile to request state.
+
+    Same as `profile_middleware`, except that `request.state.profile` is a
+    `LazyProfile`: the header is only decoded when a route reads the profile,
+    and a decoding failure raises HTTP 401 at that point.
+
+    Usage:
+        app.add_middleware(BaseHTTPMiddleware, dispatch=lazy_profile_middleware)
+
+    Raises:
+        ImportError: If FastAPI dependencies are not installed
+    """
+    if not FASTAPI_AVAILABLE:
+        raise ImportError(
+            "FastAPI dependencies not installed. "
+            "Install with: pip install mycelium-http-tools[fastapi]"
+        )
+
+    request.state.profile = get_profile_from_request(request, lazy=True)
+
+    return await call_next(request)
+
+
+class ProfileMiddleware:
+    """ASGI middleware attaching the request profile to the scope state.
+
+    Native alternative to mounting `profile_middleware` through Starlette's
+    `BaseHTTPMiddleware`: the profile header is read as bytes straight from
+    `scope["headers"]`, the profile is stored in `scope["state"]`, where
+    Starlette exposes it as `request.state.profile`, and `receive` and `send`
+    are passed to the application untouched, so streaming responses are not
+    buffered through a memory stream. Requests rejected by
+    `get_profile_from_request` get its HTTP error as a JSON response. The
+    profile is also published to `get_current_profile` for the duration of
+    the request.
+
+    Usage:
+        app.add_middleware(ProfileMiddleware)
+        app.add_middleware(ProfileMiddleware, lazy=True)
+
+    Then in your route handlers:
+        profile = request.state.profile
+
+    Args:
+        app: The ASGI application to wrap
+        lazy: Attach a `LazyProfile`, as `lazy_profile_middleware` does
+
+    Raises:
+        ImportError: If FastAPI dependencies are not installed
+    """
+
+    def __init__(self, app: ASGIApp, lazy: bool = False):
+        if not FASTAPI_AVAILABLE:
+            raise ImportError(
+                "FastAPI dependencies not installed. "
+                "Install with: pip install mycelium-http-tools[fastapi]"
+            )
+
+        self.app = app
+        self.lazy = lazy
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+        profile = state.get(_PROFILE_STATE_KEY)
+
+        if profile is None:
+            profile_key = _settings_binding().profile_key_bytes
+            profile_header = None
+            for name, value in scope["headers"]:
+                if name == profile_key:
+                    profile_header = value
+                    break
+
+            try:
+                profile = _profile_from_header(profile_header, lazy=self.lazy)
+            except HTTPException as e:
+                response = JSONResponse(
+                    status_code=e.status_code, content={"detail": e.detail}
+                )
+                await response(scope, receive, send)
+                return
+            except Exception as e:
+                response = JSONResponse(
+                    status_code=500,
+                    content={"detail": f"Internal server error: {str(e)}"},
+                )
+                await response(scope, receive, send)
+                return
+
+            state[_PROFILE_STATE_KEY] = profile
+
+        token = _current_profile.set(profile)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_profile.reset(token)
+
+
 def get_profile_from_header(
-    profile_header: Annotated[
-        str | None, Header(alias="x-mycelium-profile")
-    ] = None,
+    profile_header: _DeclaredProfileHeader = None,
+    *,
+    request: Request,
 ) -> Profile | None:
     """FastAPI dependency to extract profile from x-mycelium-profile header.
 
     This function can be used as a FastAPI dependency to automatically extract
-    and parse the profile from the HTTP header. The header should contain a
-    Base64-encoded, ZSTD-compressed profile.
+    and parse the profile from the HTTP header named by the `profile_key`
+    setting. The header should contain a Base64-encoded, ZSTD-compressed
+    profile. A profile already decoded for the request is reused.
 
     Args:
-        profile_header: The Base64-encoded, ZSTD-compressed profile string
+        profile_header: The Base64-encoded, ZSTD-compressed profile string,
+            read from the request if None
+        request: The request, injected by FastAPI
 
     Returns:
         Profile object if successfully parsed, None if header is missing or invalid
@@ -204,56 +687,31 @@ def get_profile_from_header(
             "Install with: pip install mycelium-http-tools[fastapi]"
         )
 
-    environment = os.getenv("ENVIRONMENT", "development")
+    profile = _attached_profile(request)
+    if profile is not None:
+        return profile
 
-    if environment != "development":
-        if profile_header is None:
-            raise HTTPException(
-                status_code=403,
-                detail=f"Required header '{DEFAULT_PROFILE_KEY}' missing in production environment.",
-            )
-
-        try:
-            # Decode and decompress the profile from Base64/ZSTD
-            return decode_and_decompress_profile_from_base64(profile_header)
-        except ProfileDecodingError as e:
-            logger.warning(
-                f"Unable to decode and decompress profile: {e.message}"
-            )
-            raise HTTPException(
-                status_code=401,
-                detail="Unable to check user identity. Please contact administrators",
-            )
-        except Exception as e:
-            logger.warning(f"Unable to check user identity due: {e}")
-            raise HTTPException(
-                status_code=401,
-                detail="Unable to check user identity. Please contact administrators",
-            )
-
-    # In development mode, try to parse if header exists, otherwise return None
-    if profile_header is not None:
-        try:
-            return decode_and_decompress_profile_from_base64(profile_header)
-        except Exception as e:
-            # In development, we're more lenient with errors
-            logger.debug(f"Failed to decode profile in development mode: {e}")
-            return None
-
-    return None
+    return _attach_profile(
+        request, _profile_from_header(_profile_header(request, profile_header))
+    )
 
 
 def get_profile_from_header_required(
-    profile_header: Annotated[str, Header(alias="x-mycelium-profile")],
+    profile_header: _DeclaredProfileHeader = None,
+    *,
+    request: Request,
 ) -> Profile:
     """FastAPI dependency to extract profile from x-mycelium-profile header (required).
 
     This function requires the header to be present and will raise an error if missing.
     Use this when the profile is always required for the endpoint. The header should
-    contain a Base64-encoded, ZSTD-compressed profile.
+    contain a Base64-encoded, ZSTD-compressed profile. A profile already decoded
+    for the request is reused.
 
     Args:
-        profile_header: The Base64-encoded, ZSTD-compressed profile string
+        profile_header: The Base64-encoded, ZSTD-compressed profile string,
+            read from the request if None
+        request: The request, injected by FastAPI
 
     Returns:
         Profile object if successfully parsed
@@ -268,18 +726,373 @@ def get_profile_from_header_required(
             "Install with: pip install mycelium-http-tools[fastapi]"
         )
 
+    profile = _attached_profile(request)
+    if profile is not None:
+        return profile
+
+    profile_header = _required_profile_header(request, profile_header)
+
     try:
         # Decode and decompress the profile from Base64/ZSTD
-        return decode_and_decompress_profile_from_base64(profile_header)
-    except ProfileDecodingError as e:
-        logger.warning(f"Unable to decode and decompress profile: {e.message}")
-        raise HTTPException(
-            status_code=401,
-            detail="Unable to check user identity. Please contact administrators",
+        profile = _decode_profile(profile_header)
+    except Exception as e:
+        _raise_unauthorized(e)
+
+    return _attach_profile(request, profile)
+
+
+async def get_profile_from_header_async(
+    profile_header: _DeclaredProfileHeader = None,
+    *,
+    request: Request,
+) -> Profile | None:
+    """Async variant of `get_profile_from_header`.
+
+    FastAPI runs `def` dependencies in its threadpool and awaits `async def`
+    ones on the event loop. Small profiles are decoded inline, large ones in
+    the executor set with `configure_profile_decoding`.
+
+    Args:
+        profile_header: The Base64-encoded, ZSTD-compressed profile string,
+            read from the request if None
+        request: The request, injected by FastAPI
+
+    Returns:
+        Profile object if successfully parsed, None if header is missing or invalid
+
+    Raises:
+        HTTPException: If required header is missing in production environment
+        or if the decoding/decompression fails
+        ImportError: If FastAPI dependencies are not installed
+    """
+    if not FASTAPI_AVAILABLE:
+        raise ImportError(
+            "FastAPI dependencies not installed. "
+            "Install with: pip install mycelium-http-tools[fastapi]"
+        )
+
+    profile = _attached_profile(request)
+    if profile is not None:
+        return profile
+
+    profile_header = _profile_header(request, profile_header)
+    if profile_header is None:
+        return _settings_binding().on_missing_header()
+
+    try:
+        return _attach_profile(
+            request, await _decode_profile_async(profile_header)
         )
     except Exception as e:
-        logger.warning(f"Unable to check user identity due: {e}")
-        raise HTTPException(
-            status_code=401,
-            detail="Unable to check user identity. Please contact administrators",
+        return _settings_binding().on_decoding_error(e)
+
+
+async def get_profile_from_header_required_async(
+    profile_header: _DeclaredProfileHeader = None,
+    *,
+    request: Request,
+) -> Profile:
+    """Async variant of `get_profile_from_header_required`.
+
+    Small profiles are decoded inline on the event loop, large ones in the
+    executor set with `configure_profile_decoding`.
+
+    Args:
+        profile_header: The Base64-encoded, ZSTD-compressed profile string,
+            read from the request if None
+        request: The request, injected by FastAPI
+
+    Returns:
+        Profile object if successfully parsed
+
+    Raises:
+        HTTPException: If header is missing or decoding/decompression fails
+        ImportError: If FastAPI dependencies are not installed
+    """
+    if not FASTAPI_AVAILABLE:
+        raise ImportError(
+            "FastAPI dependencies not installed. "
+            "Install with: pip install mycelium-http-tools[fastapi]"
+        )
+
+    profile = _attached_profile(request)
+    if profile is not None:
+        return profile
+
+    profile_header = _required_profile_header(request, profile_header)
+
+    try:
+        profile = await _decode_profile_async(profile_header)
+    except Exception as e:
+        _raise_unauthorized(e)
+
+    return _attach_profile(request, profile)
+
+
+def get_lazy_profile_from_header(
+    profile_header: _DeclaredProfileHeader = None,
+    *,
+    request: Request,
+) -> Profile | None:
+    """FastAPI dependency returning a lazily decoded profile.
+
+    Same as `get_profile_from_header`, except that the profile is a
+    `LazyProfile` decoded on first attribute access. Decoding failures raise
+    HTTP 401 at that point, also in development mode.
+
+    Args:
+        profile_header: The Base64-encoded, ZSTD-compressed profile string,
+            read from the request if None
+        request: The request, injected by FastAPI
+
+    Returns:
+        LazyProfile if the header is present, None if it is missing in
+        development mode
+
+    Raises:
+        HTTPException: If required header is missing in production environment
+        ImportError: If FastAPI dependencies are not installed
+    """
+    if not FASTAPI_AVAILABLE:
+        raise ImportError(
+            "FastAPI dependencies not installed. "
+            "Install with: pip install mycelium-http-tools[fastapi]"
+        )
+
+    profile = _attached_profile(request)
+    if profile is not None:
+        return profile
+
+    profile_header = _profile_header(request, profile_header)
+    if profile_header is None:
+        return _settings_binding().on_missing_header()
+
+    return _attach_profile(request, _lazy_profile(profile_header))
+
+
+def get_lazy_profile_from_header_required(
+    profile_header: _DeclaredProfileHeader = None,
+    *,
+    request: Request,
+) -> Profile:
+    """FastAPI dependency returning a lazily decoded profile (required).
+
+    Same as `get_profile_from_header_required`, except that the profile is a
+    `LazyProfile` decoded on first attribute access.
+
+    Args:
+        profile_header: The Base64-encoded, ZSTD-compressed profile string,
+            read from the request if None
+        request: The request, injected by FastAPI
+
+    Returns:
+        LazyProfile wrapping the header
+
+    Raises:
+        HTTPException: If header is missing, or on first access if decoding
+        fails
+        ImportError: If FastAPI dependencies are not installed
+    """
+    if not FASTAPI_AVAILABLE:
+        raise ImportError(
+            "FastAPI dependencies not installed. "
+            "Install with: pip install mycelium-http-tools[fastapi]"
+        )
+
+    profile = _attached_profile(request)
+    if profile is not None:
+        return profile
+
+    return _attach_profile(
+        request,
+        _lazy_profile(_required_profile_header(request, profile_header)),
+    )
+
+
+def get_profile_projection_from_header(
+    fields: Iterable[str], tenant_path_param: Optional[str] = None
+) -> Callable[..., Profile]:
+    """Build a FastAPI dependency decoding a projection of the profile.
+
+    Only the selected fields are validated when the request comes in; the
+    other fields are validated on first access. With `tenant_path_param`,
+    only the licensed resources of the tenant named by that path parameter
+    are validated and the profile is returned as `on_tenant(tenant_id)` would.
+    A profile already decoded for the request is reused instead.
+
+    Usage:
+        @app.get("/tenants/{tenant_id}/items")
+        def route(
+            profile: Profile = Depends(
+                get_profile_projection_from_header(
+                    ["acc_id", "is_staff", "is_manager"],
+                    tenant_path_param="tenant_id",
+                )
+            ),
+        ): ...
+
+    Args:
+        fields: Names or aliases of the Profile fields to validate eagerly
+        tenant_path_param: Name of the path parameter holding the tenant UUID
+
+    Returns:
+        The dependency, requiring the profile header
+
+    Raises:
+        ValueError: If a name is not a Profile field
+        ImportError: If FastAPI dependencies are not installed
+    """
+    if not FASTAPI_AVAILABLE:
+        raise ImportError(
+            "FastAPI dependencies not installed. "
+            "Install with: pip install mycelium-http-tools[fastapi]"
+        )
+
+    names = Profile.resolve_projection_fields(fields)
+
+    def dependency(
+        request: Request, profile_header: _DeclaredProfileHeader = None
+    ) -> Profile:
+        tenant_id = None
+        if tenant_path_param is not None:
+            try:
+                tenant_id = UUID(request.path_params[tenant_path_param])
+            except (KeyError, ValueError):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid tenant in path parameter '{tenant_path_param}'",
+                )
+
+        profile = _attached_profile(request)
+        if profile is not None:
+            return (
+                profile if tenant_id is None else profile.on_tenant(tenant_id)
+            )
+
+        profile_header = _required_profile_header(request, profile_header)
+
+        try:
+            return _settings_binding().projection_decoder(
+                profile_header, names, tenant_id=tenant_id
+            )
+        except Exception as e:
+            _raise_unauthorized(e)
+
+    return dependency
+
+
+# Request attributes holding the parameters named by `requires` sources
+_PARAMETER_SOURCES = {
+    "path": "path_params",
+    "query": "query_params",
+    "header": "headers",
+}
+
+
+def _uuid_extractor(source: str) -> Callable[[Request], UUID]:
+    """Compile a "<kind>:<name>" parameter source into a UUID extractor."""
+    kind, _, name = source.partition(":")
+    attribute = _PARAMETER_SOURCES.get(kind)
+
+    if attribute is None or not name:
+        raise ValueError(
+            f"Invalid parameter source {source!r}, expected "
+            "'path:<name>', 'query:<name>' or 'header:<name>'"
         )
+
+    def extract(request: Request) -> UUID:
+        try:
+            return UUID(getattr(request, attribute)[name])
+        except (KeyError, ValueError):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid UUID in {kind} parameter '{name}'",
+            )
+
+    return extract
+
+
+def requires(
+    permission: Permission = Permission.READ,
+    *,
+    roles: Optional[Iterable[str]] = None,
+    tenant_from: Optional[str] = None,
+    account_from: Optional[str] = None,
+) -> Callable[..., Awaitable[RelatedAccounts]]:
+    """Build a FastAPI dependency authorizing the request on its profile.
+
+    The dependency returns the related accounts of the filter chain repeated
+    by route handlers, such as
+    `profile.with_read_access().on_tenant(tenant_id).with_roles(["admin"])
+    .on_account(account_id).get_related_account_or_error()`, through
+    `Profile.authorize`. Roles and parameter sources are compiled when the
+    route is defined, and the profile is read as `get_profile_from_header_async`
+    does.
+
+    Usage:
+        @app.get("/tenants/{tenant_id}/items")
+        async def route(
+            related: RelatedAccounts = Depends(
+                requires(roles=["admin"], tenant_from="path:tenant_id")
+            ),
+        ): ...
+
+    Args:
+        permission: The permission the licenses should grant
+        roles: Role names to filter by, if any
+        tenant_from: Source of the tenant UUID to filter by, as
+            "path:<name>", "query:<name>" or "header:<name>"
+        account_from: Source of the account UUID to filter by, same format
+
+    Returns:
+        The dependency, raising HTTP 400 if a UUID parameter is missing or
+        invalid, HTTP 401 if there is no profile and HTTP 403, with a generic
+        detail, if the profile is not authorized. Other errors propagate.
+
+    Raises:
+        ValueError: If a parameter source is invalid
+        ImportError: If FastAPI dependencies are not installed
+    """
+    if not FASTAPI_AVAILABLE:
+        raise ImportError(
+            "FastAPI dependencies not installed. "
+            "Install with: pip install mycelium-http-tools[fastapi]"
+        )
+
+    role_names = None if roles is None else tuple(roles)
+    tenant_of = None if tenant_from is None else _uuid_extractor(tenant_from)
+    account_of = None if account_from is None else _uuid_extractor(account_from)
+
+    async def dependency(
+        request: Request, profile_header: _DeclaredProfileHeader = None
+    ) -> RelatedAccounts:
+        tenant_id = None if tenant_of is None else tenant_of(request)
+        account_id = None if account_of is None else account_of(request)
+
+        profile = await get_profile_from_header_async(
+            profile_header, request=request
+        )
+
+        if profile is None:
+            raise HTTPException(
+                status_code=401,
+                detail="Unable to check user identity. Please contact administrators",
+            )
+
+        try:
+            return profile.authorize(
+                permission,
+                tenant_id=tenant_id,
+                account_id=account_id,
+                roles=role_names,
+            )
+        except (InsufficientPrivilegesError, InsufficientLicensesError) as e:
+            # The message holds the filtering state, tenant and account UUIDs
+            # included, so it is logged instead of sent to the client
+            logger.info(f"Request denied: {e.message}")
+            raise HTTPException(
+                status_code=403,
+                detail="Insufficient privileges to access this resource",
+            )
+
+    return dependency
@@ -1,11 +1,102 @@
 """Functions module for mycelium-http-tools."""
 
-from myc_http_tools.exceptions import ProfileDecodingError
+from myc_http_tools.exceptions import ProfileDecodingError, ProfileTooLargeError
 from myc_http_tools.functions.decode_and_decompress_profile_from_base64 import (
     decode_and_decompress_profile_from_base64,
+    decode_and_decompress_profile_from_base64_robust,
+    decode_profile_projection,
+    decompress_profile,
+    deserialize_profile,
+)
+from myc_http_tools.functions.compression_codecs import (
+    Codec,
+    GzipCodec,
+    IdentityCodec,
+    ZlibCodec,
+    ZstdCodec,
+    get_codec,
+    get_codec_for_format,
+    register_codec,
+)
+from myc_http_tools.functions.detect_profile_format import (
+    ProfileFormat,
+    detect_profile_format,
+    get_profile_format_counters,
+    reset_profile_format_counters,
+)
+from myc_http_tools.functions.zstd_backends import (
+    ZstdBackend,
+    get_zstd_backend,
+    get_zstd_backends,
+    parse_zstd_frame_header,
+    register_zstd_backend,
+    select_zstd_backend,
+    set_zstd_backend,
+)
+from myc_http_tools.functions.zstd_dictionaries import (
+    ProfileDictionaryReport,
+    ZstdDictionary,
+    get_zstd_dictionary,
+    register_zstd_dictionary,
+    train_profile_dictionary,
+    unregister_zstd_dictionary,
+)
+from myc_http_tools.functions.zstd_decompressor_pool import (
+    ZstdDecompressorPool,
+    get_zstd_decompressor_pool,
+)
+from myc_http_tools.models.licensed_resources import (
+    LicenseUrlCacheStats,
+    configure_license_url_cache,
+    get_license_url_cache_stats,
+)
+from myc_http_tools.functions.profile_cache import (
+    ProfileCache,
+    ProfileCacheStats,
+    configure_profile_cache,
+    get_profile_cache,
 )
 
 __all__ = [
+    "Codec",
+    "GzipCodec",
+    "IdentityCodec",
+    "LicenseUrlCacheStats",
+    "ProfileCache",
+    "ProfileCacheStats",
     "ProfileDecodingError",
+    "ProfileDictionaryReport",
+    "ProfileFormat",
+    "ProfileTooLargeError",
+    "ZlibCodec",
+    "ZstdBackend",
+    "ZstdCodec",
+    "ZstdDecompressorPool",
+    "ZstdDictionary",
+    "configure_license_url_cache",
+    "configure_profile_cache",
     "decode_and_decompress_profile_from_base64",
+    "decode_and_decompress_profile_from_base64_robust",
+    "decode_profile_projection",
+    "decompress_profile",
+    "deserialize_profile",
+    "detect_profile_format",
+    "get_codec",
+    "get_codec_for_format",
+    "get_license_url_cache_stats",
+    "get_profile_cache",
+    "get_profile_format_counters",
+    "get_zstd_backend",
+    "get_zstd_backends",
+    "get_zstd_decompressor_pool",
+    "get_zstd_dictionary",
+    "parse_zstd_frame_header",
+    "register_codec",
+    "register_zstd_backend",
+    "register_zstd_dictionary",
+    "reset_profile_format_counters",
+    "select_zstd_backend",
+    "set_zstd_backend",
+    "train_profile_dictionary",
+    "unregister_zstd_dictionary",
 ]
@@ -0,0 +1,189 @@
+"""Compression codecs for profile payloads.
+
+A codec turns the Base64-decoded profile into its JSON document. The registry
+maps every detectable `ProfileFormat` to a codec, so decoders can dispatch on
+the sniffed format. The ZSTD codec delegates to the selected ZSTD backend.
+"""
+
+import zlib
+from abc import ABC, abstractmethod
+from typing import Optional, Union
+
+from myc_http_tools.exceptions import ProfileTooLargeError
+from myc_http_tools.functions.detect_profile_format import ProfileFormat
+from myc_http_tools.functions.zstd_backends import (
+    get_zstd_backend,
+    parse_zstd_frame_header,
+)
+from myc_http_tools.functions.zstd_dictionaries import get_zstd_dictionary
+
+BufferLike = Union[bytes, bytearray, memoryview]
+
+
+def _too_large(max_output_size: int) -> ProfileTooLargeError:
+    return ProfileTooLargeError(
+        f"Decompressed profile exceeds {max_output_size} bytes",
+        limit=max_output_size,
+    )
+
+
+class Codec(ABC):
+    """Base class of compression codecs."""
+
+    name: str = ""
+    profile_format: ProfileFormat = ProfileFormat.UNKNOWN
+
+    @abstractmethod
+    def compress(self, data: BufferLike) -> bytes:
+        """Compress the payload."""
+
+    @abstractmethod
+    def decompress(
+        self, data: BufferLike, max_output_size: Optional[int] = None
+    ) -> bytes:
+        """Decompress the payload, capped to `max_output_size` bytes.
+
+        Raises:
+            ProfileTooLargeError: If the output exceeds `max_output_size`.
+            Exception: Codec specific errors on invalid payloads.
+        """
+
+
+class ZstdCodec(Codec):
+    """ZSTD codec, backed by the fastest installed ZSTD backend.
+
+    Frames compressed with a dictionary are decoded with the registered
+    dictionary matching the ID in their frame header.
+    """
+
+    name = "zstd"
+    profile_format = ProfileFormat.ZSTD
+
+    def compress(self, data: BufferLike) -> bytes:
+        return self._backend().compress(data)
+
+    def decompress(
+        self, data: BufferLike, max_output_size: Optional[int] = None
+    ) -> bytes:
+        header = parse_zstd_frame_header(data)
+
+        if (
+            max_output_size is not None
+            and header.content_size is not None
+            and header.content_size > max_output_size
+        ):
+            raise _too_large(max_output_size)
+
+        dictionary = None
+        if header.dictionary_id:
+            dictionary = get_zstd_dictionary(header.dictionary_id)
+
+            if dictionary is None:
+                raise ValueError(
+                    f"Unknown ZSTD dictionary {header.dictionary_id}"
+                )
+
+        return self._backend().decompress(data, max_output_size, dictionary)
+
+    @staticmethod
+    def _backend():
+        backend = get_zstd_backend()
+
+        if backend is None:
+            raise ImportError(
+                "ZSTD support is not available. "
+                "Install with: pip install mycelium-http-tools[fastapi]"
+            )
+
+        return backend
+
+
+class ZlibCodec(Codec):
+    """Deflate codec with zlib framing."""
+
+    name = "zlib"
+    profile_format = ProfileFormat.ZLIB
+    wbits = zlib.MAX_WBITS
+
+    def compress(self, data: BufferLike) -> bytes:
+        compressor = zlib.compressobj(wbits=self.wbits)
+        return compressor.compress(data) + compressor.flush()
+
+    def decompress(
+        self, data: BufferLike, max_output_size: Optional[int] = None
+    ) -> bytes:
+        decompressor = zlib.decompressobj(wbits=self.wbits)
+
+        if max_output_size is None:
+            output = decompressor.decompress(data)
+        else:
+            output = decompressor.decompress(data, max_output_size + 1)
+            if len(output) > max_output_size:
+                raise _too_large(max_output_size)
+
+        if not decompressor.eof:
+            raise ValueError(f"Incomplete {self.name} stream")
+
+        return output
+
+
+class GzipCodec(ZlibCodec):
+    """Deflate codec with gzip framing."""
+
+    name = "gzip"
+    profile_format = ProfileFormat.GZIP
+    wbits = 16 + zlib.MAX_WBITS
+
+
+class IdentityCodec(Codec):
+    """Codec of uncompressed JSON profiles."""
+
+    name = "identity"
+    profile_format = ProfileFormat.JSON
+
+    def compress(self, data: BufferLike) -> bytes:
+        return bytes(data)
+
+    def decompress(
+        self, data: BufferLike, max_output_size: Optional[int] = None
+    ) -> bytes:
+        if max_output_size is not None and len(data) > max_output_size:
+            raise _too_large(max_output_size)
+
+        return data if isinstance(data, bytes) else bytes(data)
+
+
+_codecs: dict[str, Codec] = {}
+_codecs_by_format: dict[ProfileFormat, Codec] = {}
+
+
+def register_codec(codec: Codec) -> None:
+    """Register a codec, replacing any codec with the same name or format."""
+    _codecs[codec.name] = codec
+    _codecs_by_format[codec.profile_format] = codec
+
+
+def get_codec(name: str) -> Codec:
+    """Return a registered codec by name.
+
+    Raises:
+        ValueError: If no codec is registered under that name.
+    """
+    try:
+        return _codecs[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown codec '{name}'. "
+            f"Available codecs: {', '.join(sorted(_codecs))}"
+        )
+
+
+def get_codec_for_format(profile_format: ProfileFormat) -> Optional[Codec]:
+    """Return the codec able to decode a sniffed format, if any."""
+    return _codecs_by_format.get(profile_format)
+
+
+register_codec(ZstdCodec())
+register_codec(ZlibCodec())
+register_codec(GzipCodec())
+register_codec(IdentityCodec())
@@ -1,93 +1,310 @@
 """Decode and decompress profile from Base64.
 
 This module provides a function to decode a Base64-encoded, ZSTD-compressed
-profile string and return a Profile object.
+profile string and return a Profile object. Decompression goes through the
+codec registry and the decompressed bytes are validated directly by the
+pydantic-core JSON parser.
 """
 
-import base64
-import json
-import logging
-from typing import Union
+import binascii
+from typing import Iterable, Optional, Union
+from uuid import UUID
 
-from myc_http_tools.exceptions import ProfileDecodingError
+from pydantic_core import from_json
+
+from myc_http_tools.exceptions import ProfileDecodingError, ProfileTooLargeError
+from myc_http_tools.functions.detect_profile_format import (
+    ProfileFormat,
+    detect_profile_format,
+)
+from myc_http_tools.functions.compression_codecs import (
+    Codec,
+    get_codec,
+    get_codec_for_format,
+)
+from myc_http_tools.functions.zstd_backends import ZSTD_AVAILABLE
 from myc_http_tools.models.profile import Profile
+from myc_http_tools.settings import (
+    DEFAULT_MAX_DECOMPRESSED_PROFILE_SIZE,
+    DEFAULT_MAX_LICENSED_RESOURCES,
+    DEFAULT_MAX_PROFILE_HEADER_SIZE,
+)
 
-try:
-    import zstandard as zstd
+ProfileHeader = Union[str, bytes, bytearray, memoryview]
 
-    ZSTD_AVAILABLE = True
-except ImportError:
-    ZSTD_AVAILABLE = False
-    zstd = None  # type: ignore[assignment]
 
+def decode_profile_base64(
+    profile: ProfileHeader,
+    max_header_size: Optional[int] = DEFAULT_MAX_PROFILE_HEADER_SIZE,
+) -> bytes:
+    """Decode the Base64 layer of a profile header.
 
-logger = logging.getLogger(__name__)
+    ASCII strings and buffers are decoded in place, without the intermediate
+    copy made by `base64.standard_b64decode`.
 
+    Args:
+        profile: The Base64-encoded profile.
+        max_header_size: Maximum length of the encoded profile. Longer inputs
+            are rejected before decoding. None disables the limit.
 
-def decode_and_decompress_profile_from_base64_robust(
-    profile: Union[str, bytes],
+    Raises:
+        ProfileTooLargeError: If the encoded profile exceeds `max_header_size`.
+        ProfileDecodingError: If the input is not valid Base64.
+    """
+    if max_header_size is not None and len(profile) > max_header_size:
+        raise ProfileTooLargeError(
+            f"Encoded profile exceeds {max_header_size} bytes",
+            limit=max_header_size,
+        )
+
+    try:
+        return binascii.a2b_base64(profile, strict_mode=False)
+    except Exception as e:
+        raise ProfileDecodingError(
+            f"Failed to decode base64 profile: {e}"
+        ) from e
+
+
+def deserialize_profile(
+    payload: Union[str, bytes, bytearray],
+    max_licensed_resources: Optional[int] = DEFAULT_MAX_LICENSED_RESOURCES,
+    columnar_licenses: bool = False,
 ) -> Profile:
-    """Decode and decompress a profile from Base64 with fallback support.
+    """Validate a JSON profile payload in a single pass.
 
-    This function first tries to decode and decompress using ZSTD (the expected
-    format). If that fails, it falls back to trying plain Base64 decoding,
-    which is useful for development or when profiles are sent without compression.
+    The payload is handed straight to the pydantic-core JSON validator, so no
+    intermediate `str` or `dict` is materialized.
 
     Args:
-        profile: The Base64-encoded profile string or bytes. May be ZSTD-compressed
-            or plain Base64.
+        payload: The decompressed JSON profile.
+        max_licensed_resources: Maximum number of licensed resources. Larger
+            lists are rejected once validated. None disables the limit.
+        columnar_licenses: Store the licensed resources in columns, see
+            `LicensedResources.compact`.
 
     Returns:
-        Profile: The decoded and decompressed profile.
+        Profile: The validated profile.
 
     Raises:
-        ProfileDecodingError: If there is an error during decoding, decompression,
-            or deserialization, and all fallback methods have been exhausted.
+        ProfileTooLargeError: If the profile holds too many licensed resources.
+        ProfileDecodingError: If the payload is not valid UTF-8 JSON or does
+            not match the Profile schema.
     """
-    # Decode from Base64 first
     try:
-        if isinstance(profile, str):
-            profile_bytes = profile.encode("utf-8")
-        else:
-            profile_bytes = profile
-
-        decoded_profile = base64.standard_b64decode(profile_bytes)
+        return Profile.model_validate_json(
+            payload,
+            context={
+                "max_licensed_resources": max_licensed_resources,
+                "columnar_licenses": columnar_licenses,
+            },
+        )
+    except ProfileDecodingError:
+        raise
     except Exception as e:
-        raise ProfileDecodingError(
-            f"Failed to decode base64 profile: {e}"
-        ) from e
+        raise ProfileDecodingError(f"Failed to deserialize profile: {e}") from e
 
-    # Try ZSTD decompression first (expected format)
-    if ZSTD_AVAILABLE:
-        try:
-            decompressor = zstd.ZstdDecompressor()
-            decompressed_profile = decompressor.decompress(decoded_profile)
-            logger.debug("Successfully decompressed profile using ZSTD")
-        except Exception as zstd_error:
-            # If ZSTD fails, try treating as plain Base64 (fallback for development)
-            # This handles cases where profiles are sent without ZSTD compression
-            error_msg = str(zstd_error)
-            logger.info(
-                f"ZSTD decompression failed ({error_msg}), "
-                "trying plain Base64 decoding as fallback"
-            )
-            # Use decoded_profile directly (already Base64-decoded bytes)
-            decompressed_profile = decoded_profile
-    else:
-        # ZSTD not available, use plain Base64
-        logger.debug("ZSTD not available, using plain Base64 decoding")
-        decompressed_profile = decoded_profile
 
-    # Deserialize from JSON
+def decompress_profile(
+    data: Union[bytes, bytearray, memoryview],
+    codec: Codec,
+    max_decompressed_size: Optional[
+        int
+    ] = DEFAULT_MAX_DECOMPRESSED_PROFILE_SIZE,
+) -> bytes:
+    """Decompress a Base64-decoded profile with the given codec.
+
+    Raises:
+        ProfileTooLargeError: If the output exceeds `max_decompressed_size`.
+        ProfileDecodingError: If the codec fails to decompress the payload.
+    """
     try:
-        profile_string = decompressed_profile.decode("utf-8")
+        return codec.decompress(data, max_decompressed_size)
+    except ProfileDecodingError:
+        raise
     except Exception as e:
+        raise ProfileDecodingError(f"Failed to decompress profile: {e}") from e
+
+
+def _decode_zstd_profile(
+    profile: ProfileHeader,
+    max_header_size: Optional[int],
+    max_decompressed_size: Optional[int],
+) -> bytes:
+    """Decode the Base64 and ZSTD layers of a profile header."""
+    if not ZSTD_AVAILABLE:
         raise ProfileDecodingError(
-            f"Failed to convert decompressed profile to string: {e}"
-        ) from e
+            "ZSTD support is not available. "
+            "Install with: pip install mycelium-http-tools[fastapi]"
+        )
+
+    # Decode from Base64
+    decoded_profile = decode_profile_base64(profile, max_header_size)
+
+    # Decompress from ZSTD
+    if detect_profile_format(decoded_profile) is not ProfileFormat.ZSTD:
+        raise ProfileDecodingError(
+            "Failed to decompress profile: missing ZSTD frame magic number"
+        )
+
+    return decompress_profile(
+        decoded_profile, get_codec("zstd"), max_decompressed_size
+    )
+
+
+def decode_and_decompress_profile_from_base64(
+    profile: ProfileHeader,
+    max_header_size: Optional[int] = DEFAULT_MAX_PROFILE_HEADER_SIZE,
+    max_decompressed_size: Optional[
+        int
+    ] = DEFAULT_MAX_DECOMPRESSED_PROFILE_SIZE,
+    max_licensed_resources: Optional[int] = DEFAULT_MAX_LICENSED_RESOURCES,
+    columnar_licenses: bool = False,
+) -> Profile:
+    """Decode and decompress a profile from Base64.
+
+    The profile is expected to be a Base64-encoded, ZSTD-compressed JSON
+    document, as sent by the Mycelium API Gateway in the `x-mycelium-profile`
+    header.
+
+    Args:
+        profile: The Base64-encoded, ZSTD-compressed profile string or bytes.
+            Buffers such as `memoryview` are decoded without copying.
+        max_header_size: Maximum length of the encoded profile.
+        max_decompressed_size: Maximum size of the decompressed JSON document.
+        max_licensed_resources: Maximum number of licensed resources.
+            Each limit can be disabled with None.
+        columnar_licenses: Store the licensed resources in columns, see
+            `LicensedResources.compact`.
+
+    Returns:
+        Profile: The decoded and decompressed profile.
+
+    Raises:
+        ProfileTooLargeError: If the profile exceeds one of the size limits.
+        ProfileDecodingError: If there is an error during decoding,
+            decompression, or deserialization.
+    """
+    decompressed_profile = _decode_zstd_profile(
+        profile, max_header_size, max_decompressed_size
+    )
+
+    # Deserialize from JSON
+    return deserialize_profile(
+        decompressed_profile, max_licensed_resources, columnar_licenses
+    )
+
+
+def decode_profile_projection(
+    profile: ProfileHeader,
+    fields: Iterable[str],
+    tenant_id: Optional[UUID] = None,
+    max_header_size: Optional[int] = DEFAULT_MAX_PROFILE_HEADER_SIZE,
+    max_decompressed_size: Optional[
+        int
+    ] = DEFAULT_MAX_DECOMPRESSED_PROFILE_SIZE,
+    max_licensed_resources: Optional[int] = DEFAULT_MAX_LICENSED_RESOURCES,
+) -> Profile:
+    """Decode a profile from Base64, validating only the selected fields.
+
+    Same as `decode_and_decompress_profile_from_base64`, except that only the
+    selected fields are validated. The other fields are validated on first
+    access (see `Profile.model_validate_projection`).
+
+    Args:
+        profile: The Base64-encoded, ZSTD-compressed profile string or bytes.
+        fields: Names or aliases of the fields to validate eagerly.
+        tenant_id: Only validate the licensed resources of this tenant. The
+            profile is then returned as `on_tenant(tenant_id)` would.
+        max_header_size: Maximum length of the encoded profile.
+        max_decompressed_size: Maximum size of the decompressed JSON document.
+        max_licensed_resources: Maximum number of licensed resources.
+            Each limit can be disabled with None.
+
+    Returns:
+        Profile: The decoded profile.
+
+    Raises:
+        ValueError: If a name is not a Profile field.
+        ProfileTooLargeError: If the profile exceeds one of the size limits.
+        ProfileDecodingError: If there is an error during decoding,
+            decompression, or deserialization of the selected fields.
+    """
+    names = Profile.resolve_projection_fields(fields)
+
+    decompressed_profile = _decode_zstd_profile(
+        profile, max_header_size, max_decompressed_size
+    )
 
     try:
-        profile_dict = json.loads(profile_string)
-        return Profile.model_validate(profile_dict)
+        data = from_json(decompressed_profile)
+
+        if not isinstance(data, dict):
+            raise ValueError("expected a JSON object")
+
+        return Profile.model_validate_projection(
+            data,
+            names,
+            tenant_id=tenant_id,
+            context={"max_licensed_resources": max_licensed_resources},
+        )
+    except ProfileDecodingError:
+        raise
     except Exception as e:
         raise ProfileDecodingError(f"Failed to deserialize profile: {e}") from e
+
+
+def decode_and_decompress_profile_from_base64_robust(
+    profile: ProfileHeader,
+    max_header_size: Optional[int] = DEFAULT_MAX_PROFILE_HEADER_SIZE,
+    max_decompressed_size: Optional[
+        int
+    ] = DEFAULT_MAX_DECOMPRESSED_PROFILE_SIZE,
+    max_licensed_resources: Optional[int] = DEFAULT_MAX_LICENSED_RESOURCES,
+    columnar_licenses: bool = False,
+) -> Profile:
+    """Decode and decompress a profile from Base64 with fallback support.
+
+    The payload format is sniffed after Base64 decoding and dispatched to the
+    matching codec: ZSTD, zlib and gzip payloads are decompressed and plain
+    JSON documents are validated directly, which is useful for development or
+    when profiles are sent without compression.
+    Detected formats are reported through `get_profile_format_counters`.
+
+    Args:
+        profile: The Base64-encoded profile string or bytes. May be compressed
+            with any registered codec or plain Base64.
+        max_header_size: Maximum length of the encoded profile.
+        max_decompressed_size: Maximum size of the decompressed JSON document.
+        max_licensed_resources: Maximum number of licensed resources.
+            Each limit can be disabled with None.
+        columnar_licenses: Store the licensed resources in columns, see
+            `LicensedResources.compact`.
+
+    Returns:
+        Profile: The decoded and decompressed profile.
+
+    Raises:
+        ProfileTooLargeError: If the profile exceeds one of the size limits.
+        ProfileDecodingError: If there is an error during decoding, decompression,
+            or deserialization.
+    """
+    # Decode from Base64 first
+    decoded_profile = decode_profile_base64(profile, max_header_size)
+
+    # Dispatch to the codec of the sniffed format
+    codec = get_codec_for_format(detect_profile_format(decoded_profile))
+
+    if codec is None:
+        # Unknown format, rejected by the JSON validator
+        return deserialize_profile(
+            decoded_profile, max_licensed_resources, columnar_licenses
+        )
+
+    decompressed_profile = decompress_profile(
+        decoded_profile, codec, max_decompressed_size
+    )
+
+    # Deserialize from JSON
+    return deserialize_profile(
+        decompressed_profile, max_licensed_resources, columnar_licenses
+    )
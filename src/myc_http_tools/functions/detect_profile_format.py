@@ -0,0 +1,85 @@
+"""Detect the encoding of a Base64-decoded profile.
+
+Profiles are ZSTD frames, zlib or gzip streams, or plain JSON documents. The
+format is sniffed from the first bytes of the payload so that decoders can
+dispatch straight to the right codec instead of relying on a failed
+decompression. Every detection is counted, so the share of uncompressed
+profiles can be monitored without logging on the hot path.
+"""
+
+import threading
+from enum import Enum
+from typing import Union
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+_JSON_WHITESPACE = b" \t\r\n"
+
+
+class ProfileFormat(Enum):
+    ZSTD = "zstd"
+    ZLIB = "zlib"
+    GZIP = "gzip"
+    JSON = "json"
+    UNKNOWN = "unknown"
+
+
+_counters_lock = threading.Lock()
+_counters = {profile_format: 0 for profile_format in ProfileFormat}
+
+
+def detect_profile_format(
+    data: Union[bytes, bytearray, memoryview],
+) -> ProfileFormat:
+    """Detect the format of a Base64-decoded profile payload.
+
+    Args:
+        data: The Base64-decoded profile.
+
+    Returns:
+        ProfileFormat: ZSTD, GZIP or ZLIB when the payload starts with the
+            matching magic number or header, JSON when its first
+            non-whitespace byte is `{`, and UNKNOWN otherwise.
+    """
+    if data[:4] == ZSTD_MAGIC:
+        profile_format = ProfileFormat.ZSTD
+    elif data[:2] == GZIP_MAGIC:
+        profile_format = ProfileFormat.GZIP
+    elif _is_zlib_header(data):
+        profile_format = ProfileFormat.ZLIB
+    elif bytes(data[:64]).lstrip(_JSON_WHITESPACE)[:1] == b"{":
+        profile_format = ProfileFormat.JSON
+    else:
+        profile_format = ProfileFormat.UNKNOWN
+
+    with _counters_lock:
+        _counters[profile_format] += 1
+
+    return profile_format
+
+
+def _is_zlib_header(data: Union[bytes, bytearray, memoryview]) -> bool:
+    """Check the deflate method, window size and checksum of a zlib header."""
+    if len(data) < 2:
+        return False
+
+    cmf, flg = data[0], data[1]
+    return cmf & 0x0F == 8 and cmf >> 4 <= 7 and (cmf << 8 | flg) % 31 == 0
+
+
+def get_profile_format_counters() -> dict[str, int]:
+    """Return how many profiles of each format have been detected."""
+    with _counters_lock:
+        return {
+            profile_format.value: count
+            for profile_format, count in _counters.items()
+        }
+
+
+def reset_profile_format_counters() -> None:
+    """Reset the format counters to zero."""
+    with _counters_lock:
+        for profile_format in _counters:
+            _counters[profile_format] = 0
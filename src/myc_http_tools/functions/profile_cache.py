@@ -0,0 +1,440 @@
+"""Bounded LRU/TTL cache of decoded profiles.
+
+Gateway profiles repeat byte-for-byte across requests of the same user, so the
+decoded `Profile` can be reused instead of running the Base64, ZSTD and JSON
+stages again. Entries are keyed by a digest of the raw header bytes, bounded
+by entry count and an estimate of their memory footprint, and expire after a
+fixed TTL.
+"""
+
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, NoReturn, Optional, Union
+
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict
+
+from myc_http_tools.functions.decode_and_decompress_profile_from_base64 import (
+    decode_and_decompress_profile_from_base64,
+)
+from myc_http_tools.models.lazy_fields import LazyFieldsModel
+from myc_http_tools.models.permission import Permission
+from myc_http_tools.models.profile import Profile
+from myc_http_tools.models.verbose_status import VerboseStatus
+from myc_http_tools.settings import (
+    DEFAULT_PROFILE_CACHE_MAX_BYTES,
+    DEFAULT_PROFILE_CACHE_MAX_ENTRIES,
+    DEFAULT_PROFILE_CACHE_TTL_SECONDS,
+)
+
+
+class _FrozenProfile(Profile):
+    """Immutable profile returned by the cache.
+
+    Cached instances are shared across requests, so attribute assignment is
+    forbidden, down to the nested models and containers. Filtering methods
+    still work since they return copies.
+    """
+
+    model_config = ConfigDict(**Profile.model_config, frozen=True)
+
+
+_object_setattr = object.__setattr__
+
+
+def _refuse_changes(self, *args: Any, **kwargs: Any) -> NoReturn:
+    raise TypeError("Cached profiles are immutable")
+
+
+class _FrozenList(list):
+    """List of a cached profile, refusing changes.
+
+    Copies are plain lists, so the values of a cached profile can still be
+    copied and changed.
+    """
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _refuse_changes
+    append = extend = insert = pop = remove = clear = _refuse_changes
+    sort = reverse = _refuse_changes
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+
+class _FrozenDict(dict):
+    """Mapping of a cached profile, refusing changes.
+
+    Copies are plain dicts, so the values of a cached profile can still be
+    copied and changed.
+    """
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __ior__ = _refuse_changes
+    pop = popitem = setdefault = update = clear = _refuse_changes
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+@lru_cache(maxsize=None)
+def _frozen_model(
+    kind: type,
+) -> Optional[tuple[type[BaseModel], Optional[dict[str, Any]], bool]]:
+    """Describe how to freeze the instances of a class.
+
+    Returns:
+        The immutable subclass of a model, the defaults of its private
+        attributes and whether it has lazy fields. None for other classes.
+    """
+    if not issubclass(kind, BaseModel):
+        return None
+
+    if kind.model_config.get("frozen"):
+        frozen = kind
+    elif kind is Profile:
+        frozen = _FrozenProfile
+    else:
+        frozen = type(kind)(
+            f"_Frozen{kind.__name__}",
+            (kind,),
+            {
+                "__module__": __name__,
+                "model_config": ConfigDict(**kind.model_config, frozen=True),
+            },
+        )
+
+    private = {
+        name: attribute.get_default()
+        for name, attribute in frozen.__private_attributes__.items()
+    }
+    return frozen, private or None, issubclass(kind, LazyFieldsModel)
+
+
+# Values held as they are by frozen profiles
+_ATOMIC_TYPES = frozenset(
+    (str, bytes, int, float, bool, type(None), UUID, Permission, VerboseStatus)
+)
+
+
+class _Freezer:
+    """Copy profile values into immutable ones, estimating their memory.
+
+    Models are copied into their frozen subclass, with their lazy fields
+    resolved first, and lists and dicts into containers refusing changes.
+    Derived data held by private attributes, such as indexes, is not copied
+    and is rebuilt on first use. Frozen models without lazy fields are kept
+    as they are.
+
+    Attributes:
+        size: Estimated memory of the values frozen so far, in bytes. Shared
+            values are counted once per reference.
+    """
+
+    __slots__ = ("size",)
+
+    def __init__(self):
+        self.size = 0
+
+    def freeze(self, value: Any) -> Any:
+        """Return an immutable copy of a profile value."""
+        kind = type(value)
+        self.size += sys.getsizeof(value)
+
+        if kind in _ATOMIC_TYPES:
+            return value
+
+        if isinstance(value, list):
+            return _FrozenList([self.freeze(item) for item in value])
+
+        if isinstance(value, dict):
+            return _FrozenDict(
+                {key: self.freeze(item) for key, item in value.items()}
+            )
+
+        model = _frozen_model(kind)
+
+        if model is None:
+            return value
+
+        frozen_model, private, lazy = model
+
+        if lazy:
+            value._resolve_lazy_fields()
+
+        fields = value.__dict__
+        self.size += sys.getsizeof(fields)
+
+        if _ATOMIC_TYPES.issuperset(map(type, fields.values())):
+            self.size += sum(map(sys.getsizeof, fields.values()))
+
+            if frozen_model is kind and not lazy:
+                # Immutable down to their values, such as interned licenses
+                return value
+
+            values = fields.copy()
+        else:
+            values = {name: self.freeze(item) for name, item in fields.items()}
+
+        frozen = frozen_model.__new__(frozen_model)
+        _object_setattr(frozen, "__dict__", values)
+        _object_setattr(
+            frozen, "__pydantic_fields_set__", set(value.model_fields_set)
+        )
+        _object_setattr(frozen, "__pydantic_extra__", None)
+        _object_setattr(
+            frozen,
+            "__pydantic_private__",
+            None if private is None else private.copy(),
+        )
+        return frozen
+
+
+class ProfileCacheStats(BaseModel):
+    """Snapshot of the profile cache counters."""
+
+    model_config = ConfigDict(frozen=True)
+
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    rejections: int
+    entries: int
+    size_bytes: int
+
+
+class _Entry:
+    __slots__ = ("profile", "size", "expires_at")
+
+    def __init__(self, profile: Profile, size: int, expires_at: float):
+        self.profile = profile
+        self.size = size
+        self.expires_at = expires_at
+
+
+class ProfileCache:
+    """Thread-safe LRU cache of decoded profiles with TTL expiration.
+
+    The byte budget is charged with an estimate of the memory held by each
+    decoded profile, computed once when it is cached.
+
+    When `scan_resistant` is enabled and the cache is full, a header must be
+    seen twice before it is admitted. One-off headers are remembered in a
+    bounded doorkeeper and never evict the hot entries.
+
+    Args:
+        max_entries: Maximum number of cached profiles.
+        max_bytes: Maximum estimated memory of the cached profiles.
+        ttl: Time to live of each entry, in seconds.
+        scan_resistant: Whether to require a second sighting before admitting
+            new entries into a full cache.
+        clock: Monotonic clock used for expiration. Injectable for tests.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_PROFILE_CACHE_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_PROFILE_CACHE_MAX_BYTES,
+        ttl: float = DEFAULT_PROFILE_CACHE_TTL_SECONDS,
+        scan_resistant: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.scan_resistant = scan_resistant
+
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[bytes, _Entry] = OrderedDict()
+        self._doorkeeper: OrderedDict[bytes, None] = OrderedDict()
+        self._size_bytes = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._rejections = 0
+
+    # --------------------------------------------------------------------------
+    # PUBLIC METHODS
+    # --------------------------------------------------------------------------
+
+    def get(self, header: Union[str, bytes]) -> Optional[Profile]:
+        """Return the cached profile for the header, if any."""
+        return self._lookup(self._digest(self._to_bytes(header)))
+
+    def put(self, header: Union[str, bytes], profile: Profile) -> Profile:
+        """Cache a decoded profile and return its immutable version."""
+        frozen, size = self._freeze(profile)
+        self._store(self._digest(self._to_bytes(header)), frozen, size)
+        return frozen
+
+    def get_or_decode(
+        self,
+        header: Union[str, bytes],
+        decoder: Callable[
+            [Union[str, bytes]], Profile
+        ] = decode_and_decompress_profile_from_base64,
+    ) -> Profile:
+        """Return the cached profile or decode and cache it.
+
+        Args:
+            header: The raw `x-mycelium-profile` header value.
+            decoder: The function used to decode the header on a miss.
+
+        Returns:
+            Profile: An immutable profile.
+
+        Raises:
+            ProfileDecodingError: If the header is not cached and the decoder
+                fails. Failures are never cached.
+        """
+        raw = self._to_bytes(header)
+        digest = self._digest(raw)
+
+        profile = self._lookup(digest)
+        if profile is not None:
+            return profile
+
+        frozen, size = self._freeze(decoder(header))
+        self._store(digest, frozen, size)
+        return frozen
+
+    def clear(self) -> None:
+        """Drop every entry. Counters are preserved."""
+        with self._lock:
+            self._entries.clear()
+            self._doorkeeper.clear()
+            self._size_bytes = 0
+
+    @property
+    def stats(self) -> ProfileCacheStats:
+        """Return a snapshot of the cache counters."""
+        with self._lock:
+            return ProfileCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                rejections=self._rejections,
+                entries=len(self._entries),
+                size_bytes=self._size_bytes,
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # --------------------------------------------------------------------------
+    # PRIVATE METHODS
+    # --------------------------------------------------------------------------
+
+    @staticmethod
+    def _to_bytes(header: Union[str, bytes]) -> bytes:
+        if isinstance(header, str):
+            return header.encode("utf-8")
+        return header
+
+    @staticmethod
+    def _digest(raw: bytes) -> bytes:
+        return hashlib.blake2b(raw, digest_size=16).digest()
+
+    @staticmethod
+    def _freeze(profile: Profile) -> tuple[Profile, int]:
+        """Return the immutable profile to cache and its estimated size."""
+        freezer = _Freezer()
+        return freezer.freeze(profile), freezer.size
+
+    def _lookup(self, digest: bytes) -> Optional[Profile]:
+        with self._lock:
+            entry = self._entries.get(digest)
+
+            if entry is None:
+                self._misses += 1
+                return None
+
+            if entry.expires_at <= self._clock():
+                self._remove(digest)
+                self._expirations += 1
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(digest)
+            self._hits += 1
+            return entry.profile
+
+    def _store(self, digest: bytes, profile: Profile, size: int) -> None:
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if digest in self._entries:
+                self._remove(digest)
+
+            full = (
+                len(self._entries) >= self.max_entries
+                or self._size_bytes + size > self.max_bytes
+            )
+
+            if full and self.scan_resistant:
+                if digest not in self._doorkeeper:
+                    self._doorkeeper[digest] = None
+                    if len(self._doorkeeper) > self.max_entries:
+                        self._doorkeeper.popitem(last=False)
+                    self._rejections += 1
+                    return
+
+                del self._doorkeeper[digest]
+
+            while self._entries and (
+                len(self._entries) >= self.max_entries
+                or self._size_bytes + size > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._evictions += 1
+
+            self._entries[digest] = _Entry(
+                profile=profile,
+                size=size,
+                expires_at=self._clock() + self.ttl,
+            )
+            self._size_bytes += size
+
+    def _remove(self, digest: bytes) -> None:
+        entry = self._entries.pop(digest)
+        self._size_bytes -= entry.size
+
+
+_default_cache: Optional[ProfileCache] = None
+
+
+def configure_profile_cache(cache: Optional[ProfileCache]) -> None:
+    """Set (or unset with None) the process-wide profile cache.
+
+    The FastAPI integration only caches profiles when a cache is configured.
+    """
+    global _default_cache
+    _default_cache = cache
+
+
+def get_profile_cache() -> Optional[ProfileCache]:
+    """Return the process-wide profile cache, if configured."""
+    return _default_cache
@@ -0,0 +1,342 @@
+"""ZSTD backends.
+
+ZSTD frames can be decompressed by several implementations: the `zstandard`
+package, the standard library `compression.zstd` module (Python 3.14+, also
+available as the `backports.zstd` package) and `pyzstd`. Every installed
+backend is registered here, and the fastest one is selected once with a small
+built-in benchmark, unless a backend is chosen explicitly.
+"""
+
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, NamedTuple, Optional, Union
+
+from myc_http_tools.exceptions import ProfileTooLargeError
+from myc_http_tools.functions.zstd_decompressor_pool import (
+    ZSTD_AVAILABLE as ZSTANDARD_AVAILABLE,
+)
+from myc_http_tools.functions.zstd_decompressor_pool import (
+    get_zstd_decompressor_pool,
+)
+from myc_http_tools.functions.zstd_dictionaries import ZstdDictionary
+
+try:
+    from compression import zstd as stdlib_zstd  # type: ignore[import-not-found]
+except ImportError:
+    try:
+        from backports import zstd as stdlib_zstd  # type: ignore[no-redef]
+    except ImportError:
+        stdlib_zstd = None
+
+try:
+    import pyzstd
+except ImportError:
+    pyzstd = None  # type: ignore[assignment]
+
+
+BufferLike = Union[bytes, bytearray, memoryview]
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class ZstdFrameHeader(NamedTuple):
+    """The fields of a ZSTD frame header used by the decoders."""
+
+    content_size: Optional[int]
+    dictionary_id: int
+
+
+def parse_zstd_frame_header(data: BufferLike) -> ZstdFrameHeader:
+    """Parse the header of a ZSTD frame.
+
+    Args:
+        data: The compressed frame.
+
+    Returns:
+        ZstdFrameHeader: The declared content size (None when the frame does
+            not declare it) and the dictionary ID (0 when no dictionary is
+            required).
+
+    Raises:
+        ValueError: If the data does not start with a valid frame header.
+    """
+    if bytes(data[:4]) != ZSTD_MAGIC:
+        raise ValueError("Invalid ZSTD frame magic number")
+
+    if len(data) < 5:
+        raise ValueError("Truncated ZSTD frame header")
+
+    descriptor = data[4]
+    fcs_flag = descriptor >> 6
+    single_segment = (descriptor >> 5) & 1
+    dictionary_id_flag = descriptor & 3
+
+    offset = 5 if single_segment else 6
+    dictionary_id_size = (0, 1, 2, 4)[dictionary_id_flag]
+    fcs_size = (single_segment, 2, 4, 8)[fcs_flag]
+
+    end = offset + dictionary_id_size + fcs_size
+    if len(data) < end:
+        raise ValueError("Truncated ZSTD frame header")
+
+    dictionary_id_end = offset + dictionary_id_size
+    dictionary_id = int.from_bytes(data[offset:dictionary_id_end], "little")
+    offset = dictionary_id_end
+
+    if fcs_size == 0:
+        content_size = None
+    else:
+        content_size = int.from_bytes(data[offset:end], "little")
+        if fcs_size == 2:
+            content_size += 256
+
+    return ZstdFrameHeader(
+        content_size=content_size, dictionary_id=dictionary_id
+    )
+
+
+def _too_large(max_output_size: int) -> ProfileTooLargeError:
+    return ProfileTooLargeError(
+        f"Decompressed profile exceeds {max_output_size} bytes",
+        limit=max_output_size,
+    )
+
+
+class ZstdBackend(ABC):
+    """Base class of ZSTD backends."""
+
+    name: str = ""
+
+    @abstractmethod
+    def compress(self, data: BufferLike) -> bytes:
+        """Compress the payload into a single frame."""
+
+    @abstractmethod
+    def decompress(
+        self,
+        data: BufferLike,
+        max_output_size: Optional[int] = None,
+        dictionary: Optional[ZstdDictionary] = None,
+    ) -> bytes:
+        """Decompress a single frame, capped to `max_output_size` bytes.
+
+        Frames compressed with a dictionary require that `dictionary`.
+
+        Raises:
+            ProfileTooLargeError: If the output exceeds `max_output_size`.
+            Exception: Backend specific errors on invalid frames.
+        """
+
+
+class ZstandardBackend(ZstdBackend):
+    """Backend based on the `zstandard` package and per-thread contexts."""
+
+    name = "zstandard"
+
+    def compress(self, data: BufferLike) -> bytes:
+        import zstandard
+
+        return zstandard.ZstdCompressor().compress(data)
+
+    def decompress(
+        self,
+        data: BufferLike,
+        max_output_size: Optional[int] = None,
+        dictionary: Optional[ZstdDictionary] = None,
+    ) -> bytes:
+        return get_zstd_decompressor_pool().decompress(
+            data, max_output_size, dictionary
+        )
+
+
+class _OneShotBackend(ZstdBackend):
+    """Backend built on a `ZstdDecompressor` class with the stdlib API.
+
+    These decompressors cannot be reused once a frame ends, so a new one is
+    created for each call. The output is capped through `max_length`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        decompressor_factory: Callable,
+        dictionary_factory: Callable[[bytes], Any],
+        compress: Callable[[BufferLike], bytes],
+    ):
+        self.name = name
+        self._decompressor_factory = decompressor_factory
+        self._dictionary_factory = dictionary_factory
+        self._compress = compress
+
+    def compress(self, data: BufferLike) -> bytes:
+        return self._compress(data)
+
+    def decompress(
+        self,
+        data: BufferLike,
+        max_output_size: Optional[int] = None,
+        dictionary: Optional[ZstdDictionary] = None,
+    ) -> bytes:
+        if dictionary is None:
+            decompressor = self._decompressor_factory()
+        else:
+            decompressor = self._decompressor_factory(
+                zstd_dict=dictionary.for_backend(
+                    self.name, self._dictionary_factory
+                )
+            )
+
+        if max_output_size is None:
+            output = decompressor.decompress(data)
+        else:
+            output = decompressor.decompress(data, max_output_size + 1)
+            if len(output) > max_output_size:
+                raise _too_large(max_output_size)
+
+        if not decompressor.eof:
+            raise ValueError("Incomplete ZSTD frame")
+
+        return output
+
+
+_backends: dict[str, ZstdBackend] = {}
+_selected_backend: Optional[ZstdBackend] = None
+_selection_lock = threading.Lock()
+
+
+def register_zstd_backend(backend: ZstdBackend) -> None:
+    """Register a ZSTD backend, replacing any backend with the same name."""
+    global _selected_backend
+
+    with _selection_lock:
+        _backends[backend.name] = backend
+        _selected_backend = None
+
+
+def get_zstd_backends() -> dict[str, ZstdBackend]:
+    """Return the registered ZSTD backends, by name."""
+    return dict(_backends)
+
+
+def set_zstd_backend(name: str) -> ZstdBackend:
+    """Select a registered ZSTD backend by name, skipping the benchmark.
+
+    Raises:
+        ValueError: If no backend is registered under that name.
+    """
+    global _selected_backend
+
+    if name not in _backends:
+        raise ValueError(
+            f"Unknown ZSTD backend '{name}'. "
+            f"Available backends: {', '.join(sorted(_backends)) or 'none'}"
+        )
+
+    with _selection_lock:
+        _selected_backend = _backends[name]
+
+    return _selected_backend
+
+
+def get_zstd_backend() -> Optional[ZstdBackend]:
+    """Return the selected ZSTD backend, benchmarking on first use.
+
+    Returns:
+        The selected backend, or None if no backend is installed.
+    """
+    backend = _selected_backend
+
+    if backend is None and _backends:
+        backend = select_zstd_backend()
+
+    return backend
+
+
+def select_zstd_backend(rounds: int = 20) -> Optional[ZstdBackend]:
+    """Benchmark the registered backends and select the fastest one.
+
+    Each backend decompresses a synthetic profile-like payload `rounds` times.
+    Call it at application startup to keep the benchmark off the first request.
+
+    Returns:
+        The selected backend, or None if no backend is installed. When every
+        backend fails the benchmark, the first registered one is selected and
+        its errors are reported when decoding profiles.
+    """
+    global _selected_backend
+
+    with _selection_lock:
+        if not _backends:
+            return None
+
+        backends = list(_backends.values())
+
+        if len(backends) == 1:
+            _selected_backend = backends[0]
+            return _selected_backend
+
+        timings = {}
+        try:
+            frame = backends[0].compress(_benchmark_payload())
+        except Exception:
+            frame = None
+
+        for backend in backends if frame is not None else ():
+            try:
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    backend.decompress(frame)
+                timings[backend.name] = time.perf_counter() - start
+            except Exception:
+                continue
+
+        fastest = min(
+            timings, key=timings.__getitem__, default=backends[0].name
+        )
+        _selected_backend = _backends[fastest]
+        return _selected_backend
+
+
+def _benchmark_payload() -> bytes:
+    records = [
+        {
+            "accId": f"{index:08x}-0000-4000-8000-000000000000",
+            "sysAcc": False,
+            "tenantId": f"{index % 8:08x}-0000-4000-8000-000000000000",
+            "accName": f"ACCOUNT_{index:06d}",
+            "role": ("admin", "editor", "viewer")[index % 3],
+            "roleId": f"{index % 3:08x}-0000-4000-8000-000000000000",
+            "perm": "write" if index % 2 else "read",
+            "verified": True,
+        }
+        for index in range(500)
+    ]
+    return json.dumps({"licensedResources": {"records": records}}).encode()
+
+
+if ZSTANDARD_AVAILABLE:
+    register_zstd_backend(ZstandardBackend())
+
+if stdlib_zstd is not None:
+    register_zstd_backend(
+        _OneShotBackend(
+            "compression.zstd",
+            stdlib_zstd.ZstdDecompressor,
+            stdlib_zstd.ZstdDict,
+            stdlib_zstd.compress,
+        )
+    )
+
+if pyzstd is not None:
+    register_zstd_backend(
+        _OneShotBackend(
+            "pyzstd",
+            pyzstd.ZstdDecompressor,
+            pyzstd.ZstdDict,
+            pyzstd.compress,
+        )
+    )
+
+ZSTD_AVAILABLE = bool(_backends)
@@ -0,0 +1,179 @@
+"""Reusable ZSTD decompression contexts.
+
+Creating a `ZstdDecompressor` allocates a fresh decompression context. This
+module keeps one context per thread and reuses it across calls. Decompression
+never awaits, so a thread-local context is also safe to share between the
+asyncio tasks running on the same event loop thread.
+"""
+
+import threading
+from typing import TYPE_CHECKING, Optional, Union
+
+from myc_http_tools.exceptions import ProfileTooLargeError
+
+if TYPE_CHECKING:
+    from myc_http_tools.functions.zstd_dictionaries import ZstdDictionary
+
+try:
+    import zstandard as zstd
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+    zstd = None  # type: ignore[assignment]
+
+
+BufferLike = Union[bytes, bytearray, memoryview]
+
+_INPUT_CHUNK_SIZE = 1024
+
+
+class ZstdDecompressorPool:
+    """Per-thread pool of ZSTD decompression contexts."""
+
+    def __init__(self):
+        if not ZSTD_AVAILABLE:
+            raise ImportError(
+                "ZSTD support is not available. "
+                "Install with: pip install mycelium-http-tools[fastapi]"
+            )
+
+        self._local = threading.local()
+
+    # --------------------------------------------------------------------------
+    # PUBLIC METHODS
+    # --------------------------------------------------------------------------
+
+    def get(
+        self, dictionary: Optional["ZstdDictionary"] = None
+    ) -> "zstd.ZstdDecompressor":
+        """Return the decompression context of the current thread.
+
+        Args:
+            dictionary: The dictionary the context is bound to. Each thread
+                keeps one context per dictionary ID, replaced when another
+                dictionary is registered under that ID.
+        """
+        decompressors = getattr(self._local, "decompressors", None)
+
+        if decompressors is None:
+            decompressors = {}
+            self._local.decompressors = decompressors
+
+        dict_id = 0 if dictionary is None else dictionary.dict_id
+        entry = decompressors.get(dict_id)
+
+        if entry is not None and entry[0] is dictionary:
+            return entry[1]
+
+        if dictionary is None:
+            decompressor = zstd.ZstdDecompressor()
+        else:
+            decompressor = zstd.ZstdDecompressor(
+                dict_data=dictionary.for_backend(
+                    "zstandard", zstd.ZstdCompressionDict
+                )
+            )
+
+        decompressors[dict_id] = (dictionary, decompressor)
+        return decompressor
+
+    def decompress(
+        self,
+        data: BufferLike,
+        max_output_size: Optional[int] = None,
+        dictionary: Optional["ZstdDictionary"] = None,
+    ) -> bytes:
+        """Decompress a single ZSTD frame.
+
+        When the frame header declares the content size, the output buffer is
+        allocated once with that exact size. Otherwise the frame is streamed
+        into a growing buffer and must end with a complete frame.
+
+        Args:
+            data: The compressed frame. Buffers are read without copying.
+            max_output_size: Maximum decompressed size, in bytes. Frames
+                declaring a larger content size are rejected before any
+                decompression, and streamed frames stop as soon as the limit
+                is crossed. None disables the limit.
+            dictionary: The dictionary the frame was compressed with.
+
+        Returns:
+            bytes: The decompressed content.
+
+        Raises:
+            ProfileTooLargeError: If the output exceeds `max_output_size`.
+            zstd.ZstdError: If the data is not a valid ZSTD frame.
+        """
+        decompressor = self.get(dictionary)
+        content_size = zstd.frame_content_size(data)
+
+        if content_size >= 0:
+            if max_output_size is not None and content_size > max_output_size:
+                raise self._too_large(max_output_size)
+
+            return decompressor.decompress(data, max_output_size=content_size)
+
+        return self._decompress_streaming(
+            decompressor, memoryview(data), max_output_size
+        )
+
+    # --------------------------------------------------------------------------
+    # PRIVATE METHODS
+    # --------------------------------------------------------------------------
+
+    def _decompress_streaming(
+        self,
+        decompressor: "zstd.ZstdDecompressor",
+        data: memoryview,
+        max_output_size: Optional[int],
+    ) -> bytes:
+        decompressobj = decompressor.decompressobj()
+
+        if max_output_size is None:
+            output = decompressobj.decompress(data)
+        else:
+            # A ZSTD block expands at most ~32768 times, so feeding small
+            # input chunks bounds the memory used before the cap is checked.
+            chunks = []
+            total = 0
+
+            for offset in range(0, len(data), _INPUT_CHUNK_SIZE):
+                end = offset + _INPUT_CHUNK_SIZE
+                chunk = decompressobj.decompress(data[offset:end])
+
+                total += len(chunk)
+                if total > max_output_size:
+                    raise self._too_large(max_output_size)
+
+                chunks.append(chunk)
+
+                if decompressobj.eof:
+                    break
+
+            output = b"".join(chunks)
+
+        if not decompressobj.eof:
+            raise zstd.ZstdError("incomplete ZSTD frame")
+
+        return output
+
+    @staticmethod
+    def _too_large(max_output_size: int) -> ProfileTooLargeError:
+        return ProfileTooLargeError(
+            f"Decompressed profile exceeds {max_output_size} bytes",
+            limit=max_output_size,
+        )
+
+
+_default_pool = None
+
+
+def get_zstd_decompressor_pool() -> ZstdDecompressorPool:
+    """Return the process-wide decompressor pool."""
+    global _default_pool
+
+    if _default_pool is None:
+        _default_pool = ZstdDecompressorPool()
+
+    return _default_pool
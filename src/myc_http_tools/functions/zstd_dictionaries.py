@@ -0,0 +1,186 @@
+"""Trained ZSTD dictionaries for profile payloads.
+
+Profile JSON is highly repetitive (camelCase keys, tenant UUIDs, license URL
+prefixes), so a dictionary trained on captured profiles shrinks the headers
+considerably. Frames compressed with a dictionary carry its ID in the frame
+header, and decoders look the dictionary up in the registry below.
+"""
+
+import json
+import threading
+from typing import Any, Callable, Iterable, Optional, Union
+
+from pydantic import BaseModel, ConfigDict
+
+from myc_http_tools.models.profile import Profile
+
+DICTIONARY_MAGIC = b"\x37\xa4\x30\xec"
+
+
+class ZstdDictionary:
+    """A registered ZSTD dictionary.
+
+    Backends build their own dictionary objects from the raw content. Those
+    objects are created once and kept here.
+
+    Args:
+        data: The raw dictionary content, as produced by the ZSTD trainer.
+    """
+
+    def __init__(self, data: bytes):
+        if bytes(data[:4]) != DICTIONARY_MAGIC or len(data) < 8:
+            raise ValueError("Invalid ZSTD dictionary")
+
+        self.data = bytes(data)
+        self.dict_id = int.from_bytes(self.data[4:8], "little")
+
+        self._lock = threading.Lock()
+        self._backend_objects: dict[str, Any] = {}
+
+    def for_backend(self, name: str, factory: Callable[[bytes], Any]) -> Any:
+        """Return the dictionary object of a backend, building it once."""
+        backend_object = self._backend_objects.get(name)
+
+        if backend_object is None:
+            with self._lock:
+                backend_object = self._backend_objects.get(name)
+
+                if backend_object is None:
+                    backend_object = factory(self.data)
+                    self._backend_objects[name] = backend_object
+
+        return backend_object
+
+
+_dictionaries: dict[int, ZstdDictionary] = {}
+
+
+def register_zstd_dictionary(dictionary: Any) -> int:
+    """Register a dictionary for decoding.
+
+    Args:
+        dictionary: A `zstandard.ZstdCompressionDict` or the raw dictionary
+            content.
+
+    Returns:
+        int: The dictionary ID, as written in the frames it compresses.
+
+    Raises:
+        ValueError: If the content is not a ZSTD dictionary.
+    """
+    if hasattr(dictionary, "as_bytes"):
+        dictionary = dictionary.as_bytes()
+
+    registered = ZstdDictionary(dictionary)
+    _dictionaries[registered.dict_id] = registered
+    return registered.dict_id
+
+
+def unregister_zstd_dictionary(dict_id: int) -> None:
+    """Remove a dictionary from the registry, if present."""
+    _dictionaries.pop(dict_id, None)
+
+
+def get_zstd_dictionary(dict_id: int) -> Optional[ZstdDictionary]:
+    """Return the registered dictionary with the given ID, if any."""
+    return _dictionaries.get(dict_id)
+
+
+class ProfileDictionaryReport(BaseModel):
+    """Size and compression ratio gains of a trained dictionary."""
+
+    model_config = ConfigDict(frozen=True)
+
+    dict_id: int
+    dictionary_size: int
+    samples: int
+    raw_size: int
+    compressed_size: int
+    compressed_size_with_dictionary: int
+
+    @property
+    def ratio(self) -> float:
+        """Compression ratio without the dictionary."""
+        return self.raw_size / self.compressed_size
+
+    @property
+    def ratio_with_dictionary(self) -> float:
+        """Compression ratio with the dictionary."""
+        return self.raw_size / self.compressed_size_with_dictionary
+
+    @property
+    def size_reduction(self) -> float:
+        """Fraction of compressed bytes saved by the dictionary."""
+        return 1 - self.compressed_size_with_dictionary / self.compressed_size
+
+
+def train_profile_dictionary(
+    samples: Iterable[Union[bytes, str, dict, Profile]],
+    dict_size: int = 16 * 1024,
+    level: int = 3,
+) -> tuple[Any, ProfileDictionaryReport]:
+    """Train a ZSTD dictionary from a corpus of captured profiles.
+
+    Requires the `zstandard` package.
+
+    Args:
+        samples: Profiles as JSON documents, dicts or Profile objects.
+        dict_size: Maximum size of the dictionary, in bytes.
+        level: Compression level used to measure the gain.
+
+    Returns:
+        The trained `zstandard.ZstdCompressionDict` and a report comparing the
+        compressed size of the samples with and without it.
+
+    Raises:
+        ImportError: If `zstandard` is not installed.
+        ValueError: If there are not enough samples to train a dictionary.
+    """
+    try:
+        import zstandard as zstd
+    except ImportError:
+        raise ImportError(
+            "Dictionary training requires zstandard. "
+            "Install with: pip install mycelium-http-tools[fastapi]"
+        )
+
+    payloads = [_to_payload(sample) for sample in samples]
+
+    if not payloads:
+        raise ValueError("At least one profile sample is required")
+
+    try:
+        dictionary = zstd.train_dictionary(dict_size, payloads, level=level)
+    except zstd.ZstdError as e:
+        raise ValueError(f"Failed to train profile dictionary: {e}") from e
+
+    plain = zstd.ZstdCompressor(level=level)
+    with_dictionary = zstd.ZstdCompressor(level=level, dict_data=dictionary)
+
+    report = ProfileDictionaryReport(
+        dict_id=dictionary.dict_id(),
+        dictionary_size=len(dictionary.as_bytes()),
+        samples=len(payloads),
+        raw_size=sum(len(payload) for payload in payloads),
+        compressed_size=sum(
+            len(plain.compress(payload)) for payload in payloads
+        ),
+        compressed_size_with_dictionary=sum(
+            len(with_dictionary.compress(payload)) for payload in payloads
+        ),
+    )
+
+    return dictionary, report
+
+
+def _to_payload(sample: Union[bytes, str, dict, Profile]) -> bytes:
+    if isinstance(sample, Profile):
+        return sample.model_dump_json(by_alias=True).encode("utf-8")
+
+    if isinstance(sample, dict):
+        return json.dumps(sample).encode("utf-8")
+
+    if isinstance(sample, str):
+        return sample.encode("utf-8")
+
+    return bytes(sample)
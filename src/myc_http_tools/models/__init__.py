@@ -1,3 +1,5 @@
+from .access_query import AccessQuery
+from .lazy_profile import LazyProfile
 from .licensed_resources import LicensedResources
 from .owner import Owner
 from .permission import Permission
@@ -7,6 +9,8 @@ from .tenants_ownership import TenantsOwnership
 from .verbose_status import VerboseStatus
 
 __all__ = [
+    "AccessQuery",
+    "LazyProfile",
     "LicensedResources",
     "Owner",
     "Permission",
@@ -0,0 +1,18 @@
+from typing import NamedTuple, Optional
+from uuid import UUID
+
+from .permission import Permission
+
+
+class AccessQuery(NamedTuple):
+    """An authorization query, checked in batches by `Profile.can_many`.
+
+    Fields left to None match any value, as a filter left out of a chain.
+    Plain `(tenant_id, account_id, role, permission)` tuples are accepted
+    wherever an `AccessQuery` is.
+    """
+
+    tenant_id: Optional[UUID] = None
+    account_id: Optional[UUID] = None
+    role: Optional[str] = None
+    permission: Permission = Permission.READ
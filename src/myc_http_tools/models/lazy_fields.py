@@ -0,0 +1,85 @@
+from typing import Any
+
+from pydantic import BaseModel, model_serializer
+
+
+class LazyFieldsModel(BaseModel):
+    """Base of models whose fields can be computed on first access.
+
+    Lazy fields are left out of the instance `__dict__` and computed by
+    `_resolve_lazy_field` when first read. Equality, iteration, repr and
+    serialization resolve every lazy field first, so lazy instances behave as
+    fully built ones.
+    """
+
+    # --------------------------------------------------------------------------
+    # PRIVATE METHODS
+    # --------------------------------------------------------------------------
+
+    def _resolve_lazy_field(self, name: str) -> Any:
+        """Compute the value of a field missing from the instance."""
+        raise AttributeError(
+            f"{type(self).__name__!r} object has no attribute {name!r}"
+        )
+
+    def _lazy_fields_resolved(self) -> None:
+        """Called once every lazy field of the instance has been resolved."""
+
+    def _resolve_lazy_fields(self) -> None:
+        """Resolve every lazy field of the instance."""
+        fields = type(self).model_fields
+
+        if len(self.__dict__) < len(fields):
+            for name in fields:
+                if name not in self.__dict__:
+                    getattr(self, name)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            # Private attributes are read straight from their storage, the
+            # generic lookup of pydantic being slow on hot paths
+            private = self.__pydantic_private__
+
+            if private is not None and name in private:
+                return private[name]
+
+            return super().__getattr__(name)
+
+        fields = type(self).model_fields
+
+        if name in fields:
+            value = self._resolve_lazy_field(name)
+            self.__dict__[name] = value
+
+            if len(self.__dict__) == len(fields):
+                # Restore the declaration order, used by repr and
+                # serialization
+                values = {field: self.__dict__[field] for field in fields}
+                self.__dict__.clear()
+                self.__dict__.update(values)
+
+                self._lazy_fields_resolved()
+
+            return value
+
+        return super().__getattr__(name)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, LazyFieldsModel):
+            self._resolve_lazy_fields()
+            other._resolve_lazy_fields()
+
+        return super().__eq__(other)
+
+    def __iter__(self):
+        self._resolve_lazy_fields()
+        return super().__iter__()
+
+    def __repr_args__(self):
+        self._resolve_lazy_fields()
+        return super().__repr_args__()
+
+    @model_serializer(mode="wrap")
+    def __serialize(self, handler):
+        self._resolve_lazy_fields()
+        return handler(self)
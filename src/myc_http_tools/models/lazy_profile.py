@@ -0,0 +1,114 @@
+from typing import Any, Callable, NoReturn, Optional, Union
+
+from myc_http_tools.exceptions import ProfileDecodingError
+from myc_http_tools.models.profile import Profile
+
+
+class LazyProfile:
+    """Profile proxy that decodes the raw header on first attribute access.
+
+    The proxy holds the raw `x-mycelium-profile` header and only decodes and
+    validates it when an attribute of the profile is read, so requests that
+    never touch the profile do not pay for decoding. Afterwards it behaves as
+    the decoded `Profile`, including `isinstance` checks and equality.
+    `isinstance` checks do not decode the header.
+
+    Args:
+        header: The raw profile header.
+        decoder: Function turning the header into a Profile. Defaults to
+            `decode_and_decompress_profile_from_base64`.
+        on_error: Called with the decoding error when decoding fails. It is
+            expected to raise (e.g. an HTTP 401). When omitted, the
+            `ProfileDecodingError` is raised as is.
+    """
+
+    __slots__ = ("_header", "_decoder", "_on_error", "_profile")
+
+    def __init__(
+        self,
+        header: Union[str, bytes],
+        decoder: Optional[Callable[[Union[str, bytes]], Profile]] = None,
+        on_error: Optional[Callable[[Exception], NoReturn]] = None,
+    ):
+        object.__setattr__(self, "_header", header)
+        object.__setattr__(self, "_decoder", decoder)
+        object.__setattr__(self, "_on_error", on_error)
+        object.__setattr__(self, "_profile", None)
+
+    # --------------------------------------------------------------------------
+    # PUBLIC METHODS
+    # --------------------------------------------------------------------------
+
+    @property
+    def is_decoded(self) -> bool:
+        """Whether the header has already been decoded."""
+        return self._profile is not None
+
+    def resolve(self) -> Profile:
+        """Decode the header, once, and return the profile.
+
+        Raises:
+            ProfileDecodingError: If decoding fails and no `on_error` callback
+                is set. Failures are not cached, so every access re-raises.
+        """
+        profile = self._profile
+
+        if profile is None:
+            decoder = self._decoder
+
+            if decoder is None:
+                from myc_http_tools.functions import (
+                    decode_and_decompress_profile_from_base64 as decoder,
+                )
+
+            try:
+                profile = decoder(self._header)
+            except Exception as e:
+                if self._on_error is not None:
+                    self._on_error(e)
+                if isinstance(e, ProfileDecodingError):
+                    raise
+                raise ProfileDecodingError(
+                    f"Failed to decode profile: {e}"
+                ) from e
+
+            object.__setattr__(self, "_profile", profile)
+
+        return profile
+
+    # --------------------------------------------------------------------------
+    # PROXY METHODS
+    # --------------------------------------------------------------------------
+
+    @property  # type: ignore[misc]
+    def __class__(self):
+        # Read by isinstance checks, which must not decode the header
+        profile = self._profile
+        return Profile if profile is None else profile.__class__
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.resolve(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self.resolve(), name, value)
+
+    def __dir__(self):
+        return dir(self.resolve())
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, LazyProfile):
+            other = other.resolve()
+        return self.resolve() == other
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __iter__(self):
+        return iter(self.resolve())
+
+    def __repr__(self) -> str:
+        if self._profile is None:
+            return "LazyProfile(<not decoded>)"
+        return f"LazyProfile({self._profile!r})"
+
+    def __str__(self) -> str:
+        return str(self.resolve())
@@ -0,0 +1,276 @@
+from array import array
+from functools import lru_cache
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Hashable,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+)
+from uuid import UUID
+
+from .permission import Permission
+
+if TYPE_CHECKING:
+    from .licensed_resources import LicensedResource
+
+# Bits of the per-license flags byte
+SYS_ACC_FLAG = 1
+VERIFIED_FLAG = 2
+WRITE_FLAG = 4
+
+# Tenant and role UUIDs repeat across licenses, so materialized rows share them
+_uuid_from_bytes = lru_cache(maxsize=16384)(lambda value: UUID(bytes=value))
+
+
+class LicenseColumns(Sequence["LicensedResource"]):
+    """Struct-of-arrays store of licensed resources.
+
+    UUIDs are packed as 16-byte big-endian integers in contiguous buffers,
+    roles and account names are interned in tables referenced by integer
+    codes, and the flags and permission of each license share a single byte.
+    Rows are materialized on item access, and not kept, so the store costs a
+    few dozen bytes per license instead of a pydantic model with its UUIDs.
+    Selections made with `take` are views sharing the buffers of their store.
+
+    The store is read-only once built: `append` and `append_row` are meant for
+    the builders in `LicensedResources`.
+
+    Args:
+        row_type: The class of the materialized rows.
+    """
+
+    __slots__ = (
+        "row_type",
+        "tenant_ids",
+        "acc_ids",
+        "role_ids",
+        "role_codes",
+        "name_codes",
+        "flags",
+        "roles",
+        "names",
+        "positions",
+        "_role_table",
+        "_name_table",
+    )
+
+    def __init__(self, row_type: type["LicensedResource"]):
+        self.row_type = row_type
+        self.tenant_ids = bytearray()
+        self.acc_ids = bytearray()
+        self.role_ids = bytearray()
+        self.role_codes = array("I")
+        self.name_codes = array("I")
+        self.flags = bytearray()
+        self.roles: list[str] = []
+        self.names: list[str] = []
+        # Positions in the buffers of the licenses of a view, None for all
+        self.positions: Optional[array] = None
+        self._role_table: dict[str, int] = {}
+        self._name_table: dict[str, int] = {}
+
+    # --------------------------------------------------------------------------
+    # PUBLIC METHODS
+    # --------------------------------------------------------------------------
+
+    def append(
+        self,
+        tenant_id: bytes,
+        acc_id: bytes,
+        role_id: bytes,
+        role: str,
+        acc_name: str,
+        flags: int,
+    ) -> None:
+        """Append a license given its packed UUIDs and flags byte."""
+        self.tenant_ids += tenant_id
+        self.acc_ids += acc_id
+        self.role_ids += role_id
+        self.role_codes.append(self._intern(self._role_table, self.roles, role))
+        self.name_codes.append(
+            self._intern(self._name_table, self.names, acc_name)
+        )
+        self.flags.append(flags)
+
+    def append_row(self, resource: "LicensedResource") -> None:
+        """Append a materialized licensed resource."""
+        self.append(
+            resource.tenant_id.bytes,
+            resource.acc_id.bytes,
+            resource.role_id.bytes,
+            resource.role,
+            resource.acc_name,
+            (SYS_ACC_FLAG if resource.sys_acc else 0)
+            | (VERIFIED_FLAG if resource.verified else 0)
+            | (WRITE_FLAG if resource.perm is Permission.WRITE else 0),
+        )
+
+    def take(self, positions: Iterable[int]) -> "LicenseColumns":
+        """Return a view of the licenses at the given positions."""
+        taken = LicenseColumns.__new__(LicenseColumns)
+        for name in self.__slots__:
+            setattr(taken, name, getattr(self, name))
+
+        taken.positions = (
+            array("I", positions)
+            if self.positions is None
+            else array("I", map(self.positions.__getitem__, positions))
+        )
+        return taken
+
+    def row(self, position: int) -> "LicensedResource":
+        """Materialize the licensed resource at a position."""
+        if self.positions is not None:
+            position = self.positions[position]
+
+        start = position * 16
+        end = start + 16
+        flags = self.flags[position]
+
+        return self.row_type._construct(
+            {
+                "acc_id": UUID(bytes=bytes(self.acc_ids[start:end])),
+                "sys_acc": bool(flags & SYS_ACC_FLAG),
+                "tenant_id": _uuid_from_bytes(
+                    bytes(self.tenant_ids[start:end])
+                ),
+                "acc_name": self.names[self.name_codes[position]],
+                "role": self.roles[self.role_codes[position]],
+                "role_id": _uuid_from_bytes(bytes(self.role_ids[start:end])),
+                "perm": (
+                    Permission.WRITE if flags & WRITE_FLAG else Permission.READ
+                ),
+                "verified": bool(flags & VERIFIED_FLAG),
+            }
+        )
+
+    def permission(self, position: int) -> Permission:
+        """Return the permission of the license at a position."""
+        if self.positions is not None:
+            position = self.positions[position]
+
+        return (
+            Permission.WRITE
+            if self.flags[position] & WRITE_FLAG
+            else Permission.READ
+        )
+
+    def keys(self, name: str) -> Iterable[Hashable]:
+        """Return the `name` index key of every license, in store order.
+
+        UUIDs keys are their packed bytes and roles their table codes, see
+        `lookup_key` to convert looked up values.
+        """
+        if self.positions is not None:
+            key_at = self.key_at
+            return (key_at(name, position) for position in range(len(self)))
+
+        if name == "role":
+            return self.role_codes
+
+        if name == "tenant_role":
+            return zip(self._uuid_keys(self.tenant_ids), self.role_codes)
+
+        return self._uuid_keys(self._uuid_buffer(name))
+
+    def key_at(self, name: str, position: int) -> Hashable:
+        """Return the `name` index key of the license at a position."""
+        if self.positions is not None:
+            position = self.positions[position]
+
+        if name == "role":
+            return self.role_codes[position]
+
+        start = position * 16
+        end = start + 16
+
+        if name == "tenant_role":
+            return (
+                bytes(self.tenant_ids[start:end]),
+                self.role_codes[position],
+            )
+
+        return bytes(self._uuid_buffer(name)[start:end])
+
+    def lookup_key(self, name: str, value: Any) -> Optional[Hashable]:
+        """Convert a looked up value to an index key, None if absent."""
+        if name == "role":
+            return self._role_table.get(value)
+
+        if name == "tenant_role":
+            tenant_id, role = value
+            code = self._role_table.get(role)
+            return None if code is None else (tenant_id.bytes, code)
+
+        return value.bytes
+
+    def __len__(self) -> int:
+        if self.positions is not None:
+            return len(self.positions)
+
+        return len(self.flags)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self.row(i) for i in range(len(self))[position]]
+
+        size = len(self)
+
+        if position < 0:
+            position += size
+
+        if not 0 <= position < size:
+            raise IndexError("license position out of range")
+
+        return self.row(position)
+
+    def __iter__(self) -> Iterator["LicensedResource"]:
+        return map(self.row, range(len(self)))
+
+    def __eq__(self, other: Any) -> bool:
+        # Compares as the list of its rows
+        if isinstance(other, (LicenseColumns, list, tuple)):
+            return len(self) == len(other) and all(
+                row == item for row, item in zip(self, other)
+            )
+
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"LicenseColumns({len(self)} licenses)"
+
+    # --------------------------------------------------------------------------
+    # PRIVATE METHODS
+    # --------------------------------------------------------------------------
+
+    @staticmethod
+    def _intern(table: dict[str, int], values: list[str], value: str) -> int:
+        code = table.get(value)
+
+        if code is None:
+            code = len(values)
+            table[value] = code
+            values.append(value)
+
+        return code
+
+    def _uuid_buffer(self, name: str) -> bytearray:
+        if name == "tenant":
+            return self.tenant_ids
+
+        if name == "account":
+            return self.acc_ids
+
+        raise KeyError(name)
+
+    @staticmethod
+    def _uuid_keys(buffer: bytearray) -> Iterator[bytes]:
+        view = bytes(buffer)
+        starts = range(0, len(view), 16)
+        ends = range(16, len(view) + 16, 16)
+        return (view[start:end] for start, end in zip(starts, ends))
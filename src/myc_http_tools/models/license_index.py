@@ -0,0 +1,297 @@
+from itertools import repeat
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Hashable,
+    Iterable,
+    Optional,
+    Sequence,
+    Union,
+)
+from uuid import UUID
+
+from .license_columns import LicenseColumns
+from .permission import Permission
+
+if TYPE_CHECKING:
+    from .licensed_resources import LicensedResource
+
+
+class LicenseRows:
+    """Row store of licensed resources, indexed by the resource attributes.
+
+    Exposes the same index interface as `LicenseColumns`, with the resource
+    attributes themselves as index keys.
+
+    Args:
+        rows: The licensed resources. They are copied, so later changes to the
+            list do not affect the store.
+    """
+
+    __slots__ = ("rows",)
+
+    def __init__(self, rows: Iterable["LicensedResource"]):
+        self.rows: tuple["LicensedResource", ...] = tuple(rows)
+
+    # --------------------------------------------------------------------------
+    # PUBLIC METHODS
+    # --------------------------------------------------------------------------
+
+    def take(self, positions: Iterable[int]) -> list["LicensedResource"]:
+        """Return the licensed resources at the given positions."""
+        rows = self.rows
+        return [rows[position] for position in positions]
+
+    def permission(self, position: int) -> Permission:
+        """Return the permission of the license at a position."""
+        return self.rows[position].perm
+
+    def keys(self, name: str) -> Iterable[Hashable]:
+        """Return the `name` index key of every license, in store order."""
+        return map(KEY_FUNCTIONS[name], self.rows)
+
+    def key_at(self, name: str, position: int) -> Hashable:
+        """Return the `name` index key of the license at a position."""
+        return KEY_FUNCTIONS[name](self.rows[position])
+
+    def lookup_key(self, name: str, value: Any) -> Optional[Hashable]:
+        """Convert a looked up value to an index key."""
+        return value
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, position: int) -> "LicensedResource":
+        return self.rows[position]
+
+
+LicenseStore = Union[LicenseRows, LicenseColumns]
+
+# Selection masks cached per index key, beyond which the oldest are dropped
+MAX_CACHED_MASKS = 256
+
+
+def mask_positions(mask: int) -> list[int]:
+    """Return the positions of the bits set in a selection mask, ascending."""
+    bits = bin(mask)[:1:-1]
+    positions = []
+    position = bits.find("1")
+
+    while position >= 0:
+        positions.append(position)
+        position = bits.find("1", position + 1)
+
+    return positions
+
+
+def positions_mask(positions: Iterable[int], size: int) -> int:
+    """Return the selection mask of the given positions."""
+    bits = bytearray(size + 7 >> 3)
+
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+
+    return int.from_bytes(bits, "little")
+
+
+class LicenseIndex:
+    """Hash indexes over a licenses vector, built lazily one at a time.
+
+    Buckets hold positions in the vector, in ascending order, so lookups
+    return the licenses in the order of a linear scan. Filters combine the
+    buckets as selection masks, integers with a bit set per selected
+    position. The index is immutable once built and shared by every filtered
+    copy of the licensed resources it was built for.
+
+    Args:
+        vector: The licenses vector. Columnar stores are indexed as they are,
+            other vectors are copied into a `LicenseRows` store, so later
+            changes to the list do not affect the index.
+    """
+
+    __slots__ = (
+        "store",
+        "_buckets",
+        "_masks",
+        "_write_mask",
+        "_grants",
+        "_scanned",
+    )
+
+    def __init__(self, vector: Sequence["LicensedResource"]):
+        self.store: LicenseStore = (
+            vector
+            if isinstance(vector, LicenseColumns)
+            else LicenseRows(vector)
+        )
+        self._buckets: dict[str, dict[Hashable, list[int]]] = {}
+        self._masks: dict[str, dict[Hashable, int]] = {}
+        self._write_mask: Optional[int] = None
+        self._grants: dict[tuple[str, ...], dict[tuple, Permission]] = {}
+        self._scanned: set[str] = set()
+
+    # --------------------------------------------------------------------------
+    # PUBLIC METHODS
+    # --------------------------------------------------------------------------
+
+    def key(self, name: str, value: Any) -> Optional[Hashable]:
+        """Return the index key of a looked up value, None if absent."""
+        return self.store.lookup_key(name, value)
+
+    def bucket(self, name: str, key: Optional[Hashable]) -> list[int]:
+        """Return the positions of the licenses whose `name` key is `key`.
+
+        Args:
+            name: One of "tenant", "account", "role" or "tenant_role".
+            key: An index key, as returned by `key`.
+        """
+        buckets = self._buckets.get(name)
+
+        if buckets is None:
+            buckets = self._build(name)
+            self._buckets[name] = buckets
+
+        return buckets.get(key, [])
+
+    def has_bucket(self, name: str) -> bool:
+        """Tell whether the `name` buckets are built."""
+        return name in self._buckets
+
+    def has_write_mask(self) -> bool:
+        """Tell whether the write access mask is built."""
+        return self._write_mask is not None
+
+    def should_build(self, name: str) -> bool:
+        """Tell whether to build an index for a lookup of a few licenses.
+
+        The first lookup of an index not built yet is left to a scan of the
+        selected licenses, the next ones build it.
+
+        Args:
+            name: A bucket name, or "permission" for the write access mask.
+        """
+        if name == "permission":
+            built = self.has_write_mask()
+        else:
+            built = self.has_bucket(name)
+
+        if built or name in self._scanned:
+            return True
+
+        self._scanned.add(name)
+        return False
+
+    def mask(self, name: str, key: Optional[Hashable]) -> int:
+        """Return the selection mask of the `name` bucket of `key`."""
+        masks = self._masks.setdefault(name, {})
+        mask = masks.get(key)
+
+        if mask is None:
+            if len(masks) >= MAX_CACHED_MASKS:
+                # Indexes of cached profiles are shared by threads, another
+                # one may be changing the masks while the oldest is dropped
+                try:
+                    masks.pop(next(iter(masks), None), None)
+                except RuntimeError:
+                    pass
+
+            mask = positions_mask(self.bucket(name, key), len(self.store))
+            masks[key] = mask
+
+        return mask
+
+    def write_mask(self) -> int:
+        """Return the selection mask of the licenses granting write access."""
+        if self._write_mask is None:
+            permission = self.store.permission
+            self._write_mask = positions_mask(
+                (
+                    position
+                    for position in range(len(self.store))
+                    if permission(position) is Permission.WRITE
+                ),
+                len(self.store),
+            )
+
+        return self._write_mask
+
+    def grants(
+        self, fields: tuple[str, ...], selection: Optional[int] = None
+    ) -> dict[tuple, Permission]:
+        """Return the highest permission granted per combination of keys.
+
+        Args:
+            fields: Bucket names among "tenant", "account" and "role". Table
+                keys are tuples of the index keys of these fields, in order.
+            selection: A selection mask of the licenses to consider, None for
+                all of them. Tables of the whole vector are cached.
+        """
+        if selection is None:
+            table = self._grants.get(fields)
+
+            if table is not None:
+                return table
+
+        store = self.store
+        positions: Iterable[int]
+
+        if selection is None:
+            positions = range(len(store))
+            keys: Iterable[tuple] = (
+                zip(*(store.keys(name) for name in fields))
+                if fields
+                else repeat((), len(store))
+            )
+        else:
+            positions = mask_positions(selection)
+            key_at = store.key_at
+            keys = (
+                tuple(key_at(name, position) for name in fields)
+                for position in positions
+            )
+
+        table: dict[tuple, Permission] = {}
+        permission = store.permission
+
+        for position, key in zip(positions, keys):
+            if table.get(key) is not Permission.WRITE:
+                table[key] = permission(position)
+
+        if selection is None:
+            self._grants[fields] = table
+
+        return table
+
+    def max_permission(
+        self, tenant_id: UUID, role: str
+    ) -> Optional[Permission]:
+        """Return the highest permission granted to a role on a tenant."""
+        return self.grants(("tenant", "role")).get(
+            self.key("tenant_role", (tenant_id, role))
+        )
+
+    # --------------------------------------------------------------------------
+    # PRIVATE METHODS
+    # --------------------------------------------------------------------------
+
+    def _build(self, name: str) -> dict[Hashable, list[int]]:
+        buckets: dict[Hashable, list[int]] = {}
+
+        for position, key in enumerate(self.store.keys(name)):
+            bucket = buckets.get(key)
+
+            if bucket is None:
+                buckets[key] = [position]
+            else:
+                bucket.append(position)
+
+        return buckets
+
+
+KEY_FUNCTIONS: dict[str, Callable[["LicensedResource"], Any]] = {
+    "tenant": lambda resource: resource.tenant_id,
+    "account": lambda resource: resource.acc_id,
+    "role": lambda resource: resource.role,
+    "tenant_role": lambda resource: (resource.tenant_id, resource.role),
+}
@@ -1,13 +1,81 @@
 import base64
-from typing import Optional, Self
+import binascii
+import re
+from functools import lru_cache
+from itertools import chain
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    Self,
+    Sequence,
+)
 from urllib.parse import parse_qs, urlparse
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    PrivateAttr,
+    ValidationInfo,
+    field_validator,
+    model_validator,
+)
 from pydantic.alias_generators import to_camel
 
+from myc_http_tools.exceptions import ProfileTooLargeError
+from myc_http_tools.settings import DEFAULT_LICENSE_URL_CACHE_MAX_ENTRIES
+
+from .access_query import AccessQuery
+from .lazy_fields import LazyFieldsModel
+from .license_columns import (
+    SYS_ACC_FLAG,
+    VERIFIED_FLAG,
+    WRITE_FLAG,
+    LicenseColumns,
+)
+from .license_index import LicenseIndex, mask_positions, positions_mask
 from .permission import Permission
 
+_UUID_PATTERN = r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+
+# Canonical license URL, as written by the gateway. Anything else (percent
+# escapes, "+", reordered or repeated parameters, ...) goes through the
+# generic URL parser.
+_LICENSE_URL_PATTERN = re.compile(
+    rf"t/({_UUID_PATTERN})/a/({_UUID_PATTERN})/r/({_UUID_PATTERN})"
+    r"\?p=([^\x00-\x20&=:%+;#]+):([01])&s=([01])&v=([01])&n=([A-Za-z0-9/=]+)"
+)
+
+# Leading segments of a canonical license URL, enough to filter URLs on their
+# tenant, account, role and permission before parsing them
+_LICENSE_URL_SEGMENTS_PATTERN = re.compile(
+    rf"t/({_UUID_PATTERN})/a/({_UUID_PATTERN})/r/{_UUID_PATTERN}"
+    r"\?p=([^\x00-\x20&=:%+;#]+):([01])&"
+)
+
+# Filters pushed down to raw URLs: the segment group checked by each filter,
+# whether it holds a UUID, and the segment value of a parsed license
+_URL_SEGMENTS: dict[str, tuple[int, bool, Callable[[Any], str]]] = {
+    "tenant": (1, True, lambda resource: str(resource.tenant_id)),
+    "account": (2, True, lambda resource: str(resource.acc_id)),
+    "role": (3, False, lambda resource: resource.role),
+    "permission": (4, False, lambda resource: str(resource.perm.to_int())),
+}
+
+# Tenant, account and role UUIDs repeat across licenses, so parsed UUIDs are
+# shared instead of being built once per URL
+_parse_uuid_cached = lru_cache(maxsize=16384)(UUID)
+
+_object_setattr = object.__setattr__
+
+# Selections of at most one license in this many are filtered by checking the
+# selected licenses, when the index needed is not built yet
+SPARSE_SELECTION_RATIO = 4
+
 
 class LicensedResource(BaseModel):
     model_config = ConfigDict(populate_by_name=True, alias_generator=to_camel)
@@ -21,6 +89,58 @@ class LicensedResource(BaseModel):
     perm: Permission
     verified: bool
 
+    # --------------------------------------------------------------------------
+    # PUBLIC METHODS
+    # --------------------------------------------------------------------------
+
+    @classmethod
+    def from_str(cls, value: str) -> Self:
+        """Parse a licensed resource from a URL string.
+
+        Expected URL format: t/{tenant_id}/a/{acc_id}/r/{role_id}?p={role}:{perm}&s={0|1}&v={0|1}&n={base64_encoded_name}
+
+        Canonical URLs are matched by a precompiled pattern and built without
+        re-validation. Other URLs, including invalid ones, go through the
+        generic URL parser, which raises the errors.
+        """
+        match = (
+            _LICENSE_URL_PATTERN.fullmatch(value)
+            if isinstance(value, str)
+            else None
+        )
+
+        if match is not None:
+            try:
+                name_decoded = binascii.a2b_base64(match[8]).decode("utf-8")
+            except ValueError:
+                pass
+            else:
+                return cls._construct(
+                    {
+                        "acc_id": _parse_uuid_cached(match[2]),
+                        "sys_acc": match[6] == "1",
+                        "tenant_id": _parse_uuid_cached(match[1]),
+                        "acc_name": name_decoded,
+                        "role": match[4],
+                        "role_id": _parse_uuid_cached(match[3]),
+                        "perm": (
+                            Permission.READ
+                            if match[5] == "0"
+                            else Permission.WRITE
+                        ),
+                        "verified": match[7] == "1",
+                    }
+                )
+
+        return cls._parse_url(value)
+
+    def __eq__(self, other: Any) -> bool:
+        # Interned records are instances of a frozen subclass
+        if not isinstance(other, LicensedResource):
+            return NotImplemented
+
+        return self.__dict__ == other.__dict__
+
     # --------------------------------------------------------------------------
     # PRIVATE METHODS
     # --------------------------------------------------------------------------
@@ -34,16 +154,22 @@ class LicensedResource(BaseModel):
         except ValueError:
             return False
 
-    # --------------------------------------------------------------------------
-    # PUBLIC METHODS
-    # --------------------------------------------------------------------------
-
     @classmethod
-    def from_str(cls, value: str) -> Self:
-        """Parse a licensed resource from a URL string.
+    def _construct(cls, values: dict[str, Any]) -> Self:
+        """Build an instance from already valid values of every field.
 
-        Expected URL format: t/{tenant_id}/a/{acc_id}/r/{role_id}?p={role}:{perm}&s={0|1}&v={0|1}&n={base64_encoded_name}
+        Same as `model_construct`, without its per-field default handling.
         """
+        resource = cls.__new__(cls)
+        _object_setattr(resource, "__dict__", values)
+        _object_setattr(resource, "__pydantic_fields_set__", set(values))
+        _object_setattr(resource, "__pydantic_extra__", None)
+        _object_setattr(resource, "__pydantic_private__", None)
+        return resource
+
+    @classmethod
+    def _parse_url(cls, value: str) -> Self:
+        """Parse a licensed resource with the generic URL parser."""
         # Construct full URL with localhost.local domain
         full_url = f"https://localhost.local/{value}"
 
@@ -152,17 +278,600 @@ class LicensedResource(BaseModel):
         )
 
 
-class LicensedResources(BaseModel):
+class _InternedLicensedResource(LicensedResource):
+    """Immutable licensed resource shared through the license URL cache.
+
+    License URLs do not name the user, so the same record is shared by every
+    profile holding the URL and attribute assignment is forbidden.
+    """
+
+    model_config = ConfigDict(**LicensedResource.model_config, frozen=True)
+
+
+class LicenseUrlCacheStats(BaseModel):
+    """Snapshot of the license URL cache counters."""
+
+    model_config = ConfigDict(frozen=True)
+
+    hits: int
+    misses: int
+    max_entries: int
+    entries: int
+
+
+def _build_license_url_cache(
+    max_entries: int,
+) -> Callable[[str], LicensedResource]:
+    if max_entries <= 0:
+        return LicensedResource.from_str
+
+    return lru_cache(maxsize=max_entries)(_InternedLicensedResource.from_str)
+
+
+_license_url_cache = _build_license_url_cache(
+    DEFAULT_LICENSE_URL_CACHE_MAX_ENTRIES
+)
+
+
+def configure_license_url_cache(max_entries: int) -> None:
+    """Replace the process-wide license URL cache.
+
+    Parsed license URLs are interned in a bounded LRU cache shared by all
+    profiles, so URLs found in the profiles of many users are parsed once.
+
+    Args:
+        max_entries: Maximum number of cached URLs. Zero disables the cache.
+    """
+    global _license_url_cache
+    _license_url_cache = _build_license_url_cache(max_entries)
+
+
+def get_license_url_cache_stats() -> LicenseUrlCacheStats:
+    """Return the hit and miss counters of the license URL cache."""
+    cache_info = getattr(_license_url_cache, "cache_info", None)
+
+    if cache_info is None:
+        return LicenseUrlCacheStats(hits=0, misses=0, max_entries=0, entries=0)
+
+    info = cache_info()
+    return LicenseUrlCacheStats(
+        hits=info.hits,
+        misses=info.misses,
+        max_entries=info.maxsize,
+        entries=info.currsize,
+    )
+
+
+def _parse_uuid(value: Any) -> Optional[UUID]:
+    try:
+        return UUID(value)
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def _raw_record_tenant(record: Any) -> Optional[UUID]:
+    """Read the tenant of a raw license record, None if unreadable."""
+    if not isinstance(record, dict):
+        return None
+
+    return _parse_uuid(record.get("tenantId", record.get("tenant_id")))
+
+
+def _raw_url_tenant(url: Any) -> Optional[UUID]:
+    """Read the tenant of a raw license URL, None if unreadable."""
+    if not isinstance(url, str):
+        return None
+
+    segments = [seg for seg in url.split("?", 1)[0].split("/", 3) if seg]
+
+    if len(segments) < 2 or segments[0] != "t":
+        return None
+
+    return _parse_uuid(segments[1])
+
+
+def _raw_url_matcher(name: str, values: Iterable[Any]) -> Callable[[Any], bool]:
+    """Build a check of raw license URLs on one of their segments.
+
+    URLs that are not canonical are parsed to be checked.
+
+    Args:
+        name: One of "tenant", "account", "role" or "permission".
+        values: The accepted values of the segment: UUIDs, role names, or
+            permission codes as strings.
+
+    Raises:
+        ValueError: When checking an invalid URL that is not canonical.
+    """
+    group, is_uuid, segment_of = _URL_SEGMENTS[name]
+    accepted = frozenset(str(value) for value in values)
+    match_segments = _LICENSE_URL_SEGMENTS_PATTERN.match
+
+    def matches(url: Any) -> bool:
+        match = match_segments(url) if isinstance(url, str) else None
+
+        if match is None:
+            return segment_of(_license_url_cache(url)) in accepted
+
+        segment = match[group]
+        return (segment.lower() if is_uuid else segment) in accepted
+
+    return matches
+
+
+def _license_matcher(
+    tenant_id: Optional[UUID],
+    account_id: Optional[UUID],
+    roles: Optional[Iterable[str]],
+    permission: Permission,
+    predicate: Optional[Callable[[LicensedResource], bool]],
+) -> Callable[[LicensedResource], bool]:
+    """Build a check of the licenses matching every given filter."""
+    role_set = None if roles is None else frozenset(roles)
+    write = permission is not Permission.READ
+
+    def matches(resource: LicensedResource) -> bool:
+        return (
+            (tenant_id is None or resource.tenant_id == tenant_id)
+            and (account_id is None or resource.acc_id == account_id)
+            and (role_set is None or resource.role in role_set)
+            and (not write or resource.perm is Permission.WRITE)
+            and (predicate is None or predicate(resource))
+        )
+
+    return matches
+
+
+class LicensedResources(LazyFieldsModel):
     model_config = ConfigDict(populate_by_name=True, alias_generator=to_camel)
 
     records: Optional[list[LicensedResource]] = Field(default=None)
     urls: Optional[list[str]] = Field(default=None)
 
+    # Parsed URLs, along with the snapshot of `urls` they were parsed from
+    _licenses_vector: Optional[tuple[list[str], Sequence[LicensedResource]]] = (
+        PrivateAttr(default=None)
+    )
+
+    # Index of the vector this instance was selected from, the selection mask
+    # of its own licenses in that vector (None for all of them) and a snapshot
+    # of its licenses, to detect changes made since. Selected and compacted
+    # instances leave `records` out of their fields until first read, their
+    # licenses being defined by the index and selection alone.
+    _index: Optional[LicenseIndex] = PrivateAttr(default=None)
+    _selection: Optional[int] = PrivateAttr(default=None)
+    _indexed_vector: Optional[Sequence[LicensedResource]] = PrivateAttr(
+        default=None
+    )
+
+    # Columnar view of the selected licenses
+    _view: Optional[LicenseColumns] = PrivateAttr(default=None)
+
+    # License URLs left to parse into `records`, for instances filtered before
+    # parsing, and whether a filter was pushed down to the URLs of this
+    # instance already
+    _raw_urls: Optional[list[str]] = PrivateAttr(default=None)
+    _urls_filtered: Optional[bool] = PrivateAttr(default=None)
+
+    # --------------------------------------------------------------------------
+    # VALIDATORS
+    # --------------------------------------------------------------------------
+
+    @field_validator("records", "urls", mode="after")
+    @classmethod
+    def _check_max_licensed_resources(cls, value, info: ValidationInfo):
+        """Reject oversized lists.
+
+        The limit is read from the `max_licensed_resources` key of the
+        validation context, so it only applies when explicitly requested.
+        This is an after validator: a before validator would make
+        pydantic-core turn the JSON lists into Python objects first, undoing
+        single-pass `model_validate_json`. The work done before the check is
+        bounded by the decompressed size limit instead.
+        """
+        cls._enforce_max_licensed_resources(value, info.context)
+        return value
+
+    @model_validator(mode="after")
+    def _compact_if_requested(self, info: ValidationInfo) -> Self:
+        """Store the licenses in columns when requested.
+
+        Compaction is enabled by the `columnar_licenses` key of the validation
+        context.
+        """
+        if info.context and info.context.get("columnar_licenses"):
+            self._compact()
+
+        return self
+
+    # --------------------------------------------------------------------------
+    # PRIVATE METHODS
+    # --------------------------------------------------------------------------
+
+    @staticmethod
+    def _enforce_max_licensed_resources(
+        value: Any, context: Optional[dict[str, Any]]
+    ) -> None:
+        """Reject lists longer than the `max_licensed_resources` limit."""
+        if not context or not isinstance(value, list):
+            return
+
+        limit = context.get("max_licensed_resources")
+
+        if limit is not None and len(value) > limit:
+            raise ProfileTooLargeError(
+                f"Profile exceeds {limit} licensed resources",
+                limit=limit,
+            )
+
+    def _resolve_lazy_field(self, name: str) -> Any:
+        """Materialize the records of a selected or compacted instance."""
+        if name == "records" and self._index is not None:
+            return list(self._selected_vector())
+
+        if name == "records" and self._raw_urls is not None:
+            parse = _license_url_cache
+            return [parse(url) for url in self._raw_urls]
+
+        return super()._resolve_lazy_field(name)
+
+    def _lazy_fields_resolved(self) -> None:
+        # Materialized records may be changed, the index then being rebuilt
+        self._indexed_vector = list(self.__dict__["records"])
+        self._view = None
+        self._raw_urls = None
+
+    def _compact(self) -> None:
+        """Move the licenses of this instance to a columnar store.
+
+        Records are left out of the fields, to be materialized on first read.
+        URLs are kept as they are, with the store taking the place of their
+        parsed vector.
+        """
+        if "records" not in self.__dict__:
+            if self._raw_urls is None and (
+                self._index is None
+                or isinstance(self._index.store, LicenseColumns)
+            ):
+                return
+
+            # Selection from a row store, or URLs filtered before parsing
+            self.records
+
+        self._selection = None
+        self._indexed_vector = None
+        self._view = None
+
+        if self.records is not None:
+            columns = LicenseColumns(LicensedResource)
+            for resource in self.records:
+                columns.append_row(resource)
+
+            self.__dict__.pop("records")
+            self._index = LicenseIndex(columns)
+
+        else:
+            self._index = None
+
+            if self.urls is not None:
+                urls = list(self.urls)
+                self._licenses_vector = (urls, self._parse_columns(urls))
+
+    def _unparsed_urls(self) -> Optional[list[str]]:
+        """Return the license URLs not parsed yet, None if there are none."""
+        if "records" not in self.__dict__:
+            return self._raw_urls
+
+        if self.records is not None or self.urls is None:
+            return None
+
+        memoized = self._licenses_vector
+
+        if memoized is not None and memoized[0] == self.urls:
+            return None
+
+        return self.urls
+
+    @staticmethod
+    def _parse_columns(urls: list[str]) -> LicenseColumns:
+        """Parse license URLs straight into a columnar store.
+
+        Canonical URLs are packed without building records, others go through
+        `LicensedResource.from_str`.
+        """
+        columns = LicenseColumns(LicensedResource)
+        match_url = _LICENSE_URL_PATTERN.fullmatch
+        from_hex = bytes.fromhex
+
+        for url in urls:
+            match = match_url(url) if isinstance(url, str) else None
+
+            if match is not None:
+                try:
+                    name_decoded = binascii.a2b_base64(match[8]).decode("utf-8")
+                except ValueError:
+                    pass
+                else:
+                    columns.append(
+                        from_hex(match[1].replace("-", "")),
+                        from_hex(match[2].replace("-", "")),
+                        from_hex(match[3].replace("-", "")),
+                        match[4],
+                        name_decoded,
+                        (SYS_ACC_FLAG if match[6] == "1" else 0)
+                        | (VERIFIED_FLAG if match[7] == "1" else 0)
+                        | (WRITE_FLAG if match[5] == "1" else 0),
+                    )
+                    continue
+
+            columns.append_row(LicensedResource.from_str(url))
+
+        return columns
+
+    def _selected_vector(self) -> Sequence[LicensedResource]:
+        """Return the licenses of a selected or compacted instance."""
+        store = self._index.store
+        selection = self._selection
+
+        if not isinstance(store, LicenseColumns):
+            return store.take(
+                range(len(store))
+                if selection is None
+                else mask_positions(selection)
+            )
+
+        if selection is None:
+            return store
+
+        if self._view is None:
+            self._view = store.take(mask_positions(selection))
+
+        return self._view
+
+    def _indexed(self) -> tuple[LicenseIndex, Optional[int]]:
+        """Return the index and selection mask matching the current licenses.
+
+        The index is rebuilt if the licenses changed since it was attached.
+        """
+        if "records" not in self.__dict__ and self._index is not None:
+            return self._index, self._selection
+
+        vector = self.to_licenses_vector()
+        snapshot = self._indexed_vector
+
+        if self._index is not None and (
+            snapshot is vector or snapshot == vector
+        ):
+            return self._index, self._selection
+
+        index = LicenseIndex(vector)
+        self._index = index
+        self._selection = None
+        self._indexed_vector = (
+            vector if isinstance(vector, LicenseColumns) else list(vector)
+        )
+        return index, None
+
+    @staticmethod
+    def _lazy_instance(**private_values: Any) -> "LicensedResources":
+        """Build an instance whose records are materialized on first read."""
+        # Every private attribute defaults to None
+        private = dict.fromkeys(LicensedResources.__private_attributes__)
+        private.update(private_values)
+
+        instance = LicensedResources.__new__(LicensedResources)
+        _object_setattr(instance, "__dict__", {"urls": None})
+        _object_setattr(instance, "__pydantic_fields_set__", {"records"})
+        _object_setattr(instance, "__pydantic_extra__", None)
+        _object_setattr(instance, "__pydantic_private__", private)
+        return instance
+
+    @classmethod
+    def _select(
+        cls, index: LicenseIndex, selection: Optional[int]
+    ) -> "LicensedResources":
+        """Build the licensed resources selected by a mask of the index.
+
+        Records are only materialized on first read, and selections from a
+        columnar store are columnar too.
+        """
+        return cls._lazy_instance(_index=index, _selection=selection)
+
+    def _filter_urls(
+        self, name: str, values: Iterable[Any]
+    ) -> Optional["LicensedResources"]:
+        """Filter license URLs not parsed yet on their raw segments.
+
+        Only the first filter of an instance is pushed down to its URLs:
+        instances filtered again, such as the licensed resources of a cached
+        profile, are parsed and indexed instead.
+
+        Returns:
+            The licensed resources of the matching URLs, to be parsed on first
+            read, or None if the filter is not pushed down.
+        """
+        urls = self._unparsed_urls()
+
+        if urls is None or self._urls_filtered:
+            return None
+
+        self._urls_filtered = True
+        matches = _raw_url_matcher(name, values)
+        return self._lazy_instance(
+            _raw_urls=[url for url in urls if matches(url)]
+        )
+
+    @staticmethod
+    def _is_sparse(index: LicenseIndex, selection: Optional[int]) -> bool:
+        """Tell whether a selection is small enough to be scanned.
+
+        Checking the selected licenses one by one is cheaper than building an
+        index over the whole vector for a single lookup, see
+        `LicenseIndex.should_build`.
+        """
+        return (
+            selection is not None
+            and selection.bit_count() * SPARSE_SELECTION_RATIO
+            <= len(index.store)
+        )
+
+    def _filter(self, name: str, keys: Iterable[Any]) -> "LicensedResources":
+        """Select the licenses whose `name` index key is any of `keys`."""
+        filtered = self._filter_urls(name, keys)
+
+        if filtered is not None:
+            return filtered
+
+        index, selection = self._indexed()
+        index_keys = {index.key(name, key) for key in keys}
+
+        if self._is_sparse(index, selection) and not index.should_build(name):
+            key_at = index.store.key_at
+            return self._select(
+                index,
+                positions_mask(
+                    (
+                        position
+                        for position in mask_positions(selection)
+                        if key_at(name, position) in index_keys
+                    ),
+                    len(index.store),
+                ),
+            )
+
+        mask = 0
+        for key in index_keys:
+            mask |= index.mask(name, key)
+
+        return self._select(
+            index, mask if selection is None else mask & selection
+        )
+
+    def _match_mask(
+        self,
+        tenant_id: Optional[UUID],
+        account_id: Optional[UUID],
+        roles: Optional[Iterable[str]],
+        permission: Permission,
+    ) -> tuple[LicenseIndex, Optional[int]]:
+        """Return the index and the mask of the licenses matching every filter.
+
+        The mask is None when every license of the index matches. Account and
+        tenant masks are ANDed first, stopping as soon as none is left.
+        """
+        index, mask = self._indexed()
+        filters: list[tuple[str, Iterable[Any]]] = []
+
+        if account_id is not None:
+            filters.append(("account", (account_id,)))
+        if tenant_id is not None:
+            filters.append(("tenant", (tenant_id,)))
+        if roles is not None:
+            filters.append(("role", set(roles)))
+        if permission is not Permission.READ:
+            filters.append(("permission", ()))
+
+        for name, keys in filters:
+            if name == "permission":
+                matches = index.write_mask()
+            else:
+                matches = 0
+                for key in keys:
+                    matches |= index.mask(name, index.key(name, key))
+
+            mask = matches if mask is None else mask & matches
+
+            if not mask:
+                break
+
+        return index, mask
+
     # --------------------------------------------------------------------------
     # PUBLIC METHODS
     # --------------------------------------------------------------------------
 
-    def to_licenses_vector(self) -> list[LicensedResource]:
+    @classmethod
+    def select_tenant(
+        cls,
+        value: Any,
+        tenant_id: UUID,
+        context: Optional[dict[str, Any]] = None,
+    ) -> Any:
+        """Keep the raw licensed resources of a tenant, before validation.
+
+        Records are matched on their `tenantId` key and URLs on their tenant
+        path segment, so the licenses of other tenants are never validated.
+        Entries whose tenant cannot be read are kept, for validation to report
+        them. As in `to_licenses_vector`, records take precedence over URLs.
+
+        Args:
+            value: The raw licensed resources, as found in the JSON document.
+            tenant_id: The UUID of the tenant to keep.
+            context: The validation context holding the size limits.
+
+        Raises:
+            ProfileTooLargeError: If the raw lists exceed the size limit.
+        """
+        if not isinstance(value, dict):
+            return value
+
+        for key in ("records", "urls"):
+            cls._enforce_max_licensed_resources(value.get(key), context)
+
+        records = value.get("records")
+        if isinstance(records, list):
+            return {
+                "records": [
+                    record
+                    for record in records
+                    if _raw_record_tenant(record) in (tenant_id, None)
+                ]
+            }
+
+        urls = value.get("urls")
+        if isinstance(urls, list):
+            return {
+                "urls": [
+                    url
+                    for url in urls
+                    if _raw_url_tenant(url) in (tenant_id, None)
+                ]
+            }
+
+        return value
+
+    def compact(self) -> "LicensedResources":
+        """Return a copy storing its licenses in columns.
+
+        UUIDs are packed in byte buffers, roles and account names interned in
+        tables and flags packed in a byte per license, which takes a fraction
+        of the memory of the records. `to_licenses_vector` then returns a
+        read-only view materializing records on item access, and `records` is
+        materialized on first read. Filtered copies stay columnar.
+        """
+        compacted = self.model_copy()
+        compacted._compact()
+        return compacted
+
+    def to_licenses_vector(self) -> Sequence[LicensedResource]:
+        """Return the licensed resources, parsing URLs at most once.
+
+        Parsed URLs are memoized along with a snapshot of the URL list, so
+        reassigning or mutating `urls` invalidates them. Copies made with
+        `model_copy` share the memoized vector. URLs are parsed through the
+        process-wide license URL cache, which returns immutable records
+        shared across profiles.
+
+        Compacted instances return a read-only `LicenseColumns` view instead
+        of a list, see `compact`. Filtered copies materialize their records on
+        the first call.
+        """
+        if "records" not in self.__dict__ and self._index is not None:
+            if isinstance(self._index.store, LicenseColumns):
+                return self._selected_vector()
+
+            return self.records
+
         if self.records is None and self.urls is None:
             return []
 
@@ -170,6 +879,447 @@ class LicensedResources(BaseModel):
             return self.records
 
         if self.urls is not None:
-            return [LicensedResource.from_str(url) for url in self.urls]
+            memoized = self._licenses_vector
+            if memoized is not None and memoized[0] == self.urls:
+                return memoized[1]
+
+            urls = list(self.urls)
+
+            if isinstance(memoized[1] if memoized else None, LicenseColumns):
+                # Compacted instance whose URLs changed
+                vector = self._parse_columns(urls)
+            else:
+                parse = _license_url_cache
+                vector = [parse(url) for url in urls]
+
+            self._licenses_vector = (urls, vector)
+            return vector
 
         return []
+
+    def iter_licenses(
+        self,
+        tenant_id: Optional[UUID] = None,
+        account_id: Optional[UUID] = None,
+        roles: Optional[Iterable[str]] = None,
+        permission: Permission = Permission.READ,
+        predicate: Optional[Callable[[LicensedResource], bool]] = None,
+    ) -> Iterator[LicensedResource]:
+        """Iterate over the licensed resources matching every given filter.
+
+        URLs not parsed yet are parsed one at a time as the iteration goes,
+        so existence and first match lookups stop parsing once answered, and
+        the vector is not memoized. Parsed licenses are iterated as returned
+        by `to_licenses_vector`.
+
+        Args:
+            tenant_id: The tenant of the licenses, if any.
+            account_id: The account of the licenses, if any.
+            roles: The roles the licenses may have, if any.
+            permission: The permission the licenses should grant.
+            predicate: An extra check of the licenses, applied last.
+
+        Raises:
+            ValueError: When a URL reached by the iteration is invalid.
+        """
+        matches = _license_matcher(
+            tenant_id, account_id, roles, permission, predicate
+        )
+
+        urls = self._unparsed_urls()
+
+        if urls is not None:
+            licenses: Iterable[LicensedResource] = map(
+                _license_url_cache, list(urls)
+            )
+        else:
+            licenses = self.to_licenses_vector()
+
+        return filter(matches, licenses)
+
+    def is_empty(self) -> bool:
+        """Tell whether there are no licensed resources.
+
+        Filtered copies answer from their selection mask, and URLs not
+        parsed yet from their count, without materializing the records.
+        """
+        urls = self._unparsed_urls()
+
+        if urls is not None:
+            return len(urls) == 0
+
+        if "records" not in self.__dict__ and self._index is not None:
+            if self._selection is None:
+                return len(self._index.store) == 0
+
+            return self._selection == 0
+
+        return len(self.to_licenses_vector()) == 0
+
+    def filter_by_tenant(self, tenant_id: UUID) -> "LicensedResources":
+        """Return the licensed resources of a tenant.
+
+        This and the other `filter_by_*` methods look matches up in hash
+        indexes built once per licenses vector and shared with the filtered
+        copies. Matches are kept as selection masks over the vector, so each
+        filter of a chain is a bitwise AND and records are only materialized
+        when read.
+        """
+        return self._filter("tenant", (tenant_id,))
+
+    def filter_by_account(self, account_id: UUID) -> "LicensedResources":
+        """Return the licensed resources of an account."""
+        return self._filter("account", (account_id,))
+
+    def filter_by_roles(self, roles: list[str]) -> "LicensedResources":
+        """Return the licensed resources matching any of the roles."""
+        return self._filter("role", roles)
+
+    def filter_by_permission(
+        self, permission: Permission
+    ) -> "LicensedResources":
+        """Return the licensed resources granting at least `permission`."""
+        # Every license grants at least read access
+        if permission is Permission.READ:
+            urls = self._unparsed_urls()
+
+            if urls is not None:
+                return self._lazy_instance(
+                    _raw_urls=list(urls), _urls_filtered=self._urls_filtered
+                )
+
+            return self._select(*self._indexed())
+
+        filtered = self._filter_urls("permission", ("1",))
+
+        if filtered is not None:
+            return filtered
+
+        index, selection = self._indexed()
+
+        if self._is_sparse(index, selection) and not index.should_build(
+            "permission"
+        ):
+            permission_at = index.store.permission
+            return self._select(
+                index,
+                positions_mask(
+                    (
+                        position
+                        for position in mask_positions(selection)
+                        if permission_at(position) is Permission.WRITE
+                    ),
+                    len(index.store),
+                ),
+            )
+
+        mask = index.write_mask()
+        return self._select(
+            index, mask if selection is None else mask & selection
+        )
+
+    def estimate_matches(self, name: str, value: Any) -> int:
+        """Estimate the number of matches of a filter from the index.
+
+        Args:
+            name: One of "tenant", "account", "roles" or "permission", naming
+                the `filter_by_*` method.
+            value: The argument of that method.
+
+        Returns:
+            The number of licenses of the indexed vector matching the filter,
+            an upper bound of its matches among the licenses of this instance.
+            Estimates are read from the index statistics already built, the
+            size of the vector being returned otherwise (or the number of URLs
+            not parsed yet), and without checking
+            the licenses for changes: they are only fit for ordering filters.
+        """
+        index = self._index
+
+        if index is None:
+            urls = self._unparsed_urls()
+
+            if urls is not None:
+                return len(urls)
+
+            index, _ = self._indexed()
+
+        if name == "permission":
+            if value is Permission.READ or not index.has_write_mask():
+                return len(index.store)
+
+            return index.write_mask().bit_count()
+
+        bucket_name = "role" if name == "roles" else name
+
+        if not index.has_bucket(bucket_name):
+            return len(index.store)
+
+        if name == "roles":
+            return sum(
+                len(index.bucket("role", index.key("role", role)))
+                for role in set(value)
+            )
+
+        return len(index.bucket(name, index.key(name, value)))
+
+    def count_matches(
+        self,
+        tenant_id: Optional[UUID] = None,
+        account_id: Optional[UUID] = None,
+        roles: Optional[Iterable[str]] = None,
+        permission: Permission = Permission.READ,
+    ) -> int:
+        """Count the licensed resources matching every given filter.
+
+        Same as the length of the chained `filter_by_*` results, counted on
+        the selection masks without building the filtered copies.
+        """
+        index, mask = self._match_mask(tenant_id, account_id, roles, permission)
+
+        if mask is None:
+            return len(index.store)
+
+        return mask.bit_count()
+
+    def has_match(
+        self,
+        tenant_id: Optional[UUID] = None,
+        account_id: Optional[UUID] = None,
+        roles: Optional[Iterable[str]] = None,
+        permission: Permission = Permission.READ,
+    ) -> bool:
+        """Tell whether any licensed resource matches every given filter.
+
+        Tenant and roles lookups, the usual guard, are answered from the
+        highest permission granted per tenant and role. Lookups of an account
+        check the licenses of its index bucket. Both stop at the first match.
+        Other lookups intersect the selection masks of `count_matches`. URLs
+        not parsed yet are streamed through `iter_licenses` instead, parsing
+        them up to the first match.
+        """
+        if self._unparsed_urls() is not None:
+            return (
+                next(
+                    self.iter_licenses(
+                        tenant_id, account_id, roles, permission
+                    ),
+                    None,
+                )
+                is not None
+            )
+
+        index, selection = self._indexed()
+
+        if roles is not None:
+            roles = set(roles)
+
+        if account_id is not None:
+            key_at = index.store.key_at
+            tenant_key = (
+                None if tenant_id is None else index.key("tenant", tenant_id)
+            )
+            role_keys = (
+                None
+                if roles is None
+                else {index.key("role", role) for role in roles}
+            )
+            permission_at = index.store.permission
+
+            for position in index.bucket(
+                "account", index.key("account", account_id)
+            ):
+                if (
+                    (selection is None or selection >> position & 1)
+                    and (
+                        tenant_key is None
+                        or key_at("tenant", position) == tenant_key
+                    )
+                    and (
+                        role_keys is None
+                        or key_at("role", position) in role_keys
+                    )
+                    and (
+                        permission is Permission.READ
+                        or permission_at(position) is Permission.WRITE
+                    )
+                ):
+                    return True
+
+            return False
+
+        if selection is None and tenant_id is not None and roles is not None:
+            for role in roles:
+                granted = index.max_permission(tenant_id, role)
+
+                if granted is Permission.WRITE or (
+                    granted is not None and permission is Permission.READ
+                ):
+                    return True
+
+            return False
+
+        index, mask = self._match_mask(tenant_id, account_id, roles, permission)
+
+        if mask is None:
+            return len(index.store) > 0
+
+        return mask != 0
+
+    def matching_accounts(
+        self,
+        tenant_id: Optional[UUID] = None,
+        account_id: Optional[UUID] = None,
+        roles: Optional[Iterable[str]] = None,
+        permission: Permission = Permission.READ,
+    ) -> list[UUID]:
+        """Return the account of each licensed resource matching every filter.
+
+        Same as the accounts of the chained `filter_by_*` results, in order,
+        without building the filtered copies. Tenant and roles lookups, the
+        usual guard, read the positions of the matches from the tenant and
+        role buckets. Other lookups select them on the masks of
+        `count_matches`. URLs not parsed yet are streamed through
+        `iter_licenses` instead.
+        """
+        if self._unparsed_urls() is not None:
+            return [
+                resource.acc_id
+                for resource in self.iter_licenses(
+                    tenant_id, account_id, roles, permission
+                )
+            ]
+
+        index, selection = self._indexed()
+        store = index.store
+        positions: Iterable[int]
+
+        if selection is None and tenant_id is not None and roles is not None:
+            buckets = [
+                index.bucket(
+                    "tenant_role", index.key("tenant_role", (tenant_id, role))
+                )
+                for role in set(roles)
+            ]
+            positions = (
+                buckets[0] if len(buckets) == 1 else sorted(chain(*buckets))
+            )
+
+            if account_id is not None:
+                key_at = store.key_at
+                account_key = index.key("account", account_id)
+                positions = [
+                    position
+                    for position in positions
+                    if key_at("account", position) == account_key
+                ]
+
+            if permission is not Permission.READ:
+                permission_at = store.permission
+                positions = [
+                    position
+                    for position in positions
+                    if permission_at(position) is Permission.WRITE
+                ]
+        else:
+            index, mask = self._match_mask(
+                tenant_id, account_id, roles, permission
+            )
+            positions = (
+                range(len(store)) if mask is None else mask_positions(mask)
+            )
+
+        if account_id is not None:
+            # Every match is a license of the account
+            return [account_id] * len(positions)
+
+        return [resource.acc_id for resource in store.take(positions)]
+
+    def match_many(self, queries: Iterable[AccessQuery]) -> list[bool]:
+        """Tell, for each query, whether a licensed resource matches it.
+
+        Queries are answered in one pass from tables of the highest
+        permission granted per combination of tenant, account and role keys,
+        built once per combination of fields the queries set. Each query then
+        costs a hash lookup, whatever the number of licenses.
+
+        Args:
+            queries: `AccessQuery` instances or plain tuples of their fields.
+
+        Returns:
+            A boolean per query, in order.
+        """
+        index, selection = self._indexed()
+        key = index.key
+        tables: dict[tuple[bool, bool, bool], dict[tuple, Permission]] = {}
+        results = []
+
+        for tenant_id, account_id, role, permission in queries:
+            pattern = (
+                tenant_id is not None,
+                account_id is not None,
+                role is not None,
+            )
+            table = tables.get(pattern)
+
+            if table is None:
+                table = index.grants(
+                    tuple(
+                        name
+                        for name, is_set in zip(
+                            ("tenant", "account", "role"), pattern
+                        )
+                        if is_set
+                    ),
+                    selection,
+                )
+                tables[pattern] = table
+
+            query_key = []
+            if tenant_id is not None:
+                query_key.append(key("tenant", tenant_id))
+            if account_id is not None:
+                query_key.append(key("account", account_id))
+            if role is not None:
+                query_key.append(key("role", role))
+
+            granted = table.get(tuple(query_key))
+            results.append(
+                granted is Permission.WRITE
+                or (granted is not None and permission is Permission.READ)
+            )
+
+        return results
+
+    def max_permission(
+        self, tenant_id: UUID, role: str
+    ) -> Optional[Permission]:
+        """Return the highest permission granted to a role on a tenant."""
+        index, selection = self._indexed()
+
+        if selection is None:
+            return index.max_permission(tenant_id, role)
+
+        key = index.key("tenant_role", (tenant_id, role))
+        matches = index.mask("tenant_role", key) & selection
+
+        if not matches:
+            return None
+
+        if matches & index.write_mask():
+            return Permission.WRITE
+
+        return Permission.READ
+
+    def __eq__(self, other: Any) -> bool:
+        # The memoized vector, indexes and columns are derived data and not
+        # part of the value
+        if not isinstance(other, BaseModel):
+            return NotImplemented
+
+        if type(self) is not type(other):
+            return False
+
+        self._resolve_lazy_fields()
+        other._resolve_lazy_fields()
+        return self.__dict__ == other.__dict__
@@ -1,13 +1,17 @@
-from typing import Optional, Self
+import copy
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Optional, Self, TypeVar, Union
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, create_model
 from pydantic.alias_generators import to_camel
 
 from myc_http_tools.exceptions import (
     InsufficientLicensesError,
     InsufficientPrivilegesError,
 )
+from myc_http_tools.models.access_query import AccessQuery
+from myc_http_tools.models.lazy_fields import LazyFieldsModel
 from myc_http_tools.models.licensed_resources import LicensedResources
 from myc_http_tools.models.owner import Owner
 from myc_http_tools.models.permission import Permission
@@ -20,8 +24,94 @@ from myc_http_tools.models.related_accounts import (
 from myc_http_tools.models.tenants_ownership import TenantsOwnership
 from myc_http_tools.models.verbose_status import VerboseStatus
 
+_object_setattr = object.__setattr__
+
+_T = TypeVar("_T")
+
+
+@lru_cache(maxsize=128)
+def _projection_model(
+    model: type[BaseModel], names: frozenset[str]
+) -> type[BaseModel]:
+    """Build a model validating only the given fields of `model`."""
+    return create_model(
+        f"{model.__name__}Projection",
+        __config__=model.model_config,
+        **{
+            name: (field.annotation, copy.copy(field))
+            for name, field in model.model_fields.items()
+            if name in names
+        },
+    )
+
+
+class _FilterStep:
+    """Filter of a chain, linked to the filters applied before it.
+
+    Chains share the filters of the profiles they derive from, so recording
+    a filter costs O(1). Steps carry the filter itself while it is pending in
+    a deferred plan (see `Profile._filter_plan`).
+    """
+
+    __slots__ = ("previous", "kind", "argument", "value")
+
+    def __init__(
+        self,
+        previous: Union["_FilterStep", tuple[str, ...]],
+        kind: str,
+        argument: Any,
+        value: str,
+    ):
+        self.previous = previous
+        self.kind = kind
+        self.argument = argument
+        self.value = value
+
+    def since(
+        self, start: Union["_FilterStep", tuple[str, ...]]
+    ) -> list["_FilterStep"]:
+        """Return the steps recorded after `start`, in order."""
+        steps = []
+        step: Union[_FilterStep, tuple[str, ...]] = self
+
+        while step is not start:
+            steps.append(step)
+            step = step.previous
+
+        steps.reverse()
+        return steps
+
+    def to_list(self, skipped: frozenset[int] = frozenset()) -> list[str]:
+        """Return the filtering state, numbering entries incrementally.
 
-class Profile(BaseModel):
+        Args:
+            skipped: The `id` of the steps not recorded in the state.
+        """
+        step: Union[_FilterStep, tuple[str, ...]] = self
+
+        while isinstance(step, _FilterStep):
+            step = step.previous
+
+        entries = list(step)
+        for step in self.since(step):
+            if id(step) not in skipped:
+                entries.append(f"{len(entries) + 1}:{step.kind}:{step.value}")
+
+        return entries
+
+
+# Filters by kind: the filter name, as in `LicensedResources.filter_by_<name>`
+# and `LicensedResources.estimate_matches`, and the rank breaking ties between
+# estimates
+_FILTERS: dict[str, tuple[str, int]] = {
+    "tenantId": ("tenant", 0),
+    "accountId": ("account", 1),
+    "role": ("roles", 2),
+    "permission": ("permission", 3),
+}
+
+
+class Profile(LazyFieldsModel):
     """Profile model"""
 
     model_config = ConfigDict(populate_by_name=True, alias_generator=to_camel)
@@ -46,10 +136,118 @@ class Profile(BaseModel):
     meta: Optional[dict] = None
     filtering_state: Optional[list[str]] = None
 
+    # --------------------------------------------------------------------------
+    # PRIVATE ATTRIBUTES
+    # --------------------------------------------------------------------------
+
+    # Raw values of the fields left out of a projection, validated on access
+    _pending_fields: Optional[dict[str, Any]] = PrivateAttr(default=None)
+    _validation_context: Optional[dict[str, Any]] = PrivateAttr(default=None)
+
+    # Filters applied since `filtering_state` was last read, which leave it out
+    # of the fields until then
+    _filter_chain: Optional[_FilterStep] = PrivateAttr(default=None)
+
+    # Deferred filters: the licensed resources they apply to and the last step
+    # before them. `licensed_resources` is left out of the fields until the
+    # plan is evaluated.
+    _filter_plan: Optional[
+        tuple[LicensedResources, Union[_FilterStep, tuple[str, ...]]]
+    ] = PrivateAttr(default=None)
+
     # --------------------------------------------------------------------------
     # PUBLIC METHODS
     # --------------------------------------------------------------------------
 
+    @classmethod
+    def resolve_projection_fields(cls, fields: Iterable[str]) -> frozenset[str]:
+        """Resolve field names or aliases to Profile field names.
+
+        Raises:
+            ValueError: If a name is not a Profile field.
+        """
+        aliases = {
+            field.alias: name for name, field in cls.model_fields.items()
+        }
+
+        names = set()
+        for field in fields:
+            name = aliases.get(field, field)
+
+            if name not in cls.model_fields:
+                raise ValueError(f"Unknown profile field '{field}'")
+
+            names.add(name)
+
+        return frozenset(names)
+
+    @classmethod
+    def model_validate_projection(
+        cls,
+        data: dict[str, Any],
+        fields: Iterable[str],
+        tenant_id: Optional[UUID] = None,
+        context: Optional[dict[str, Any]] = None,
+    ) -> Self:
+        """Validate only the selected fields of a profile document.
+
+        The other fields are kept raw and validated on first access, so routes
+        needing a handful of fields skip validating the rest of the profile.
+        With `tenant_id`, only the licensed resources of that tenant are
+        validated and the profile is returned as `on_tenant(tenant_id)` would.
+
+        Args:
+            data: The profile JSON document, parsed into a dict.
+            fields: Names or aliases of the fields to validate eagerly.
+            tenant_id: The UUID of the tenant to filter licensed resources by.
+            context: The validation context, also used for the fields
+                validated on access.
+
+        Returns:
+            A Profile instance. Invalid fields left out of the projection
+            raise `ValidationError` on first access.
+
+        Raises:
+            ValueError: If a name is not a Profile field.
+            ValidationError: If a selected field is invalid.
+        """
+        names = cls.resolve_projection_fields(fields)
+
+        # Collect the raw values, by alias first as the validator does
+        raw = {}
+        for name, field in cls.model_fields.items():
+            for key in (field.alias or name, name):
+                if key in data:
+                    raw[name] = data[key]
+                    break
+
+        if tenant_id is not None:
+            names |= {"licensed_resources", "filtering_state"}
+
+            if "licensed_resources" in raw:
+                raw["licensed_resources"] = LicensedResources.select_tenant(
+                    raw["licensed_resources"], tenant_id, context
+                )
+
+        validated = _projection_model(cls, names).model_validate(
+            {name: raw[name] for name in names if name in raw},
+            context=context,
+        )
+
+        profile = cls.model_construct(_fields_set=set(raw), **dict(validated))
+        for name in cls.model_fields.keys() - names:
+            profile.__dict__.pop(name, None)
+
+        profile._pending_fields = {
+            name: value for name, value in raw.items() if name not in names
+        }
+        profile._validation_context = context
+
+        if tenant_id is not None:
+            return profile.on_tenant(tenant_id)
+
+        return profile
+
     def with_read_access(self) -> Self:
         return self.__with_permission(Permission.READ)
 
@@ -62,50 +260,17 @@ class Profile(BaseModel):
         This method should be used to filter licensed resources to the tenant
         that the profile is currently working on.
 
+        Filters are deferred: chains are evaluated at once, on first read of
+        `licensed_resources` or `filtering_state`, applying the most selective
+        filters first. Results are the same as filtering in call order.
+
         Args:
             tenant_id: The UUID of the tenant to filter by
 
         Returns:
             A new Profile instance with filtered licensed resources
         """
-        # Filter the licensed resources to the tenant
-        licensed_resources = None
-        if self.licensed_resources is not None:
-            # Get all licensed resources
-            all_resources = self.licensed_resources.to_licenses_vector()
-
-            # Filter by tenant_id
-            filtered_resources = [
-                resource
-                for resource in all_resources
-                if resource.tenant_id == tenant_id
-            ]
-
-            # Create new LicensedResources if we have filtered results
-            if filtered_resources:
-                licensed_resources = LicensedResources(
-                    records=filtered_resources
-                )
-
-        # Update filtering state to track the tenant filter (incremental)
-        updated_filtering_state = (
-            self.filtering_state.copy() if self.filtering_state else []
-        )
-
-        # Get the next filter number
-        next_filter_number = len(updated_filtering_state) + 1
-        tenant_filter = f"{next_filter_number}:tenantId:{tenant_id}"
-
-        # Add the new filter (incremental behavior)
-        updated_filtering_state.append(tenant_filter)
-
-        # Return the new profile
-        return self.model_copy(
-            update={
-                "licensed_resources": licensed_resources,
-                "filtering_state": updated_filtering_state,
-            }
-        )
+        return self.__filter("tenantId", tenant_id, str(tenant_id))
 
     def with_roles(self, roles: list[str]) -> Self:
         """Filter the licensed resources to the specified roles.
@@ -119,43 +284,7 @@ class Profile(BaseModel):
         Returns:
             A new Profile instance with filtered licensed resources
         """
-        # Filter the licensed resources to the roles
-        licensed_resources = None
-        if self.licensed_resources is not None:
-            # Get all licensed resources
-            all_resources = self.licensed_resources.to_licenses_vector()
-
-            # Filter by roles (any role that matches any of the specified roles)
-            filtered_resources = [
-                resource for resource in all_resources if resource.role in roles
-            ]
-
-            # Create new LicensedResources if we have filtered results
-            if filtered_resources:
-                licensed_resources = LicensedResources(
-                    records=filtered_resources
-                )
-
-        # Update filtering state to track the role filter (incremental)
-        updated_filtering_state = (
-            self.filtering_state.copy() if self.filtering_state else []
-        )
-
-        # Get the next filter number
-        next_filter_number = len(updated_filtering_state) + 1
-        roles_str = ",".join(roles)
-        role_filter = f"{next_filter_number}:role:{roles_str}"
-
-        # Add the new filter (incremental behavior)
-        updated_filtering_state.append(role_filter)
-
-        # Return the new profile
-        return self.model_copy(
-            update={
-                "licensed_resources": licensed_resources,
-                "filtering_state": updated_filtering_state,
-            }
-        )
+        return self.__filter("role", list(roles), ",".join(roles))
 
     def on_account(self, account_id: UUID) -> Self:
         """Filter the licensed resources to the account.
@@ -169,45 +298,203 @@ class Profile(BaseModel):
         Returns:
             A new Profile instance with filtered licensed resources
         """
-        # Filter the licensed resources to the account
-        licensed_resources = None
-        if self.licensed_resources is not None:
-            # Get all licensed resources
-            all_resources = self.licensed_resources.to_licenses_vector()
-
-            # Filter by account_id
-            filtered_resources = [
-                resource
-                for resource in all_resources
-                if resource.acc_id == account_id
-            ]
-
-            # Create new LicensedResources if we have filtered results
-            if filtered_resources:
-                licensed_resources = LicensedResources(
-                    records=filtered_resources
-                )
+        return self.__filter("accountId", account_id, str(account_id))
+
+    def count(
+        self,
+        *,
+        tenant_id: Optional[UUID] = None,
+        account_id: Optional[UUID] = None,
+        roles: Optional[list[str]] = None,
+        permission: Permission = Permission.READ,
+    ) -> int:
+        """Count the licensed resources matching the given filters.
+
+        Same as the number of licensed resources left by the equivalent chain
+        of `on_tenant`, `on_account`, `with_roles` and `with_*_access`, without
+        building the intermediate profiles nor recording a filtering state.
+
+        Args:
+            tenant_id: The UUID of the tenant to filter by, if any
+            account_id: The UUID of the account to filter by, if any
+            roles: Role names to filter by, if any
+            permission: The permission the licenses should grant
+
+        Returns:
+            The number of matching licensed resources, 0 if there are none
+        """
+        if self.licensed_resources is None:
+            return 0
+
+        return self.licensed_resources.count_matches(
+            tenant_id=tenant_id,
+            account_id=account_id,
+            roles=roles,
+            permission=permission,
+        )
+
+    def any(
+        self,
+        *,
+        tenant_id: Optional[UUID] = None,
+        account_id: Optional[UUID] = None,
+        roles: Optional[list[str]] = None,
+        permission: Permission = Permission.READ,
+    ) -> bool:
+        """Tell whether any licensed resource matches the given filters.
+
+        Stops at the first match, see `count` for the arguments.
+
+        Returns:
+            True if a licensed resource matches every filter
+        """
+        if self.licensed_resources is None:
+            return False
 
-        # Update filtering state to track the account filter (incremental)
-        updated_filtering_state = (
-            self.filtering_state.copy() if self.filtering_state else []
+        return self.licensed_resources.has_match(
+            tenant_id=tenant_id,
+            account_id=account_id,
+            roles=roles,
+            permission=permission,
         )
 
-        # Get the next filter number
-        next_filter_number = len(updated_filtering_state) + 1
-        account_filter = f"{next_filter_number}:accountId:{account_id}"
+    def can(
+        self,
+        permission: Permission = Permission.READ,
+        *,
+        tenant_id: Optional[UUID] = None,
+        account_id: Optional[UUID] = None,
+        roles: Optional[list[str]] = None,
+    ) -> bool:
+        """Tell whether the profile is authorized, without raising.
+
+        Answers as `get_related_account_or_error` on the equivalent filter
+        chain: staff and manager profiles are always authorized, others when
+        a licensed resource matches the filters, see `any`.
 
-        # Add the new filter (incremental behavior)
-        updated_filtering_state.append(account_filter)
+        Args:
+            permission: The permission the licenses should grant
+            tenant_id: The UUID of the tenant to filter by, if any
+            account_id: The UUID of the account to filter by, if any
+            roles: Role names to filter by, if any
 
-        # Return the new profile
-        return self.model_copy(
-            update={
-                "licensed_resources": licensed_resources,
-                "filtering_state": updated_filtering_state,
-            }
+        Returns:
+            True if the equivalent chain would return related accounts, False
+            if it would raise
+        """
+        if self.is_staff or self.is_manager:
+            return True
+
+        return self.any(
+            tenant_id=tenant_id,
+            account_id=account_id,
+            roles=roles,
+            permission=permission,
         )
 
+    def can_many(self, queries: Iterable[AccessQuery]) -> list[bool]:
+        """Answer `can` for many queries in one pass.
+
+        Builds no intermediate profiles: queries are looked up in tables of
+        the licensed resources, see `LicensedResources.match_many`.
+
+        Args:
+            queries: `AccessQuery` instances or plain
+                `(tenant_id, account_id, role, permission)` tuples, None
+                fields matching any value.
+
+        Returns:
+            A boolean mask, True for each authorized query
+        """
+        if self.is_staff or self.is_manager:
+            return [True for _ in queries]
+
+        if self.licensed_resources is None:
+            return [False for _ in queries]
+
+        return self.licensed_resources.match_many(queries)
+
+    def allowed(
+        self,
+        items: Iterable[_T],
+        key: Optional[Callable[[_T], AccessQuery]] = None,
+    ) -> list[_T]:
+        """Keep the items the profile is authorized on, see `can_many`.
+
+        Args:
+            items: The items to check, such as the rows of a list endpoint.
+            key: Builds the query of an item. Items are the queries when
+                omitted.
+
+        Returns:
+            The authorized items, in order
+        """
+        items = list(items)
+        queries = items if key is None else map(key, items)
+
+        return [
+            item
+            for item, allowed in zip(items, self.can_many(queries))
+            if allowed
+        ]
+
+    def authorize(
+        self,
+        permission: Permission = Permission.READ,
+        *,
+        tenant_id: Optional[UUID] = None,
+        account_id: Optional[UUID] = None,
+        roles: Optional[Iterable[str]] = None,
+    ) -> RelatedAccounts:
+        """Get the related accounts of the equivalent filter chain.
+
+        Same as `get_related_account_or_error` on the `with_*_access`,
+        `on_tenant`, `with_roles` and `on_account` chain, in that order. The
+        accounts are read from the matching licensed resources without
+        building the intermediate profiles. When none matches, the chain is
+        replayed to raise its error, along with its filtering state.
+
+        Args:
+            permission: The permission the licenses should grant
+            tenant_id: The UUID of the tenant to filter by, if any
+            account_id: The UUID of the account to filter by, if any
+            roles: Role names to filter by, if any
+
+        Returns:
+            RelatedAccounts: The appropriate variant based on privileges
+
+        Raises:
+            InsufficientLicensesError: When there are no licensed resources
+            InsufficientPrivilegesError: When there are insufficient privileges
+        """
+        if self.is_staff:
+            return HasStaffPrivileges()
+
+        if self.is_manager:
+            return HasManagerPrivileges()
+
+        if self.licensed_resources is not None:
+            accounts = self.licensed_resources.matching_accounts(
+                tenant_id=tenant_id,
+                account_id=account_id,
+                roles=roles,
+                permission=permission,
+            )
+
+            if accounts:
+                return AllowedAccounts(accounts=accounts)
+
+        profile = self.__with_permission(permission)
+
+        if tenant_id is not None:
+            profile = profile.on_tenant(tenant_id)
+        if roles is not None:
+            profile = profile.with_roles(list(roles))
+        if account_id is not None:
+            profile = profile.on_account(account_id)
+
+        return profile.get_related_account_or_error()
+
     def get_related_account_or_error(self) -> RelatedAccounts:
         """Get related accounts based on profile privileges.
 
@@ -253,32 +540,147 @@ class Profile(BaseModel):
     # PRIVATE METHODS
     # --------------------------------------------------------------------------
 
+    def _resolve_lazy_field(self, name: str) -> Any:
+        """Resolve a filtered field or a field left out of a projection."""
+        if self._filter_plan is not None and name in (
+            "licensed_resources",
+            "filtering_state",
+        ):
+            return self.__evaluate_filter_plan()[name]
+
+        if name == "filtering_state" and self._filter_chain is not None:
+            return self._filter_chain.to_list()
+
+        pending = self._pending_fields
+
+        if pending is None:
+            return super()._resolve_lazy_field(name)
+
+        model = _projection_model(type(self), frozenset((name,)))
+
+        return getattr(
+            model.model_validate(
+                {name: pending[name]} if name in pending else {},
+                context=self._validation_context,
+            ),
+            name,
+        )
+
+    def _lazy_fields_resolved(self) -> None:
+        self._pending_fields = None
+        self._validation_context = None
+        self._filter_chain = None
+        self._filter_plan = None
+
     def __with_permission(self, permission: Permission) -> Self:
-        if self.licensed_resources is None:
+        if (
+            self._filter_plan is None or "licensed_resources" in self.__dict__
+        ) and self.licensed_resources is None:
             return self
 
-        licensed_resources = self.licensed_resources.model_copy()
+        return self.__filter("permission", permission, permission.value)
 
-        licensed_resources.records = list(
-            filter(
-                lambda x: x.perm.to_int() >= permission.to_int(),
-                licensed_resources.to_licenses_vector(),
+    def __filter(self, kind: str, argument: Any, value: str) -> Self:
+        """Copy the profile with a filter appended to its plan.
+
+        Same as `model_copy` with the filtered fields updated, except that
+        neither field is built: the filter is recorded in O(1) and applied
+        when the plan is evaluated.
+        """
+        plan = self._filter_plan
+        chain = self._filter_chain
+
+        if "filtering_state" in self.__dict__ or chain is None:
+            chain = tuple(self.filtering_state or ())
+
+        if plan is None or "licensed_resources" in self.__dict__:
+            plan = (
+                None
+                if self.licensed_resources is None
+                else (self.licensed_resources, chain)
             )
+
+        values = self.__dict__.copy()
+        values.pop("filtering_state", None)
+
+        if plan is None:
+            # Nothing to filter, only the filtering state is updated
+            values["licensed_resources"] = None
+        else:
+            values.pop("licensed_resources", None)
+
+        private = dict(self.__pydantic_private__ or {})
+        private["_filter_chain"] = _FilterStep(chain, kind, argument, value)
+        private["_filter_plan"] = plan
+
+        derived = self.__class__.__new__(self.__class__)
+        _object_setattr(derived, "__dict__", values)
+        _object_setattr(
+            derived,
+            "__pydantic_fields_set__",
+            self.__pydantic_fields_set__
+            | {"licensed_resources", "filtering_state"},
         )
+        _object_setattr(derived, "__pydantic_extra__", None)
+        _object_setattr(derived, "__pydantic_private__", private)
+        return derived
+
+    def __evaluate_filter_plan(self) -> dict[str, Any]:
+        """Apply the deferred filters, setting the fields they left out.
+
+        Filters are applied from the most to the least selective, estimated
+        from the index statistics. When nothing matches, the filters are
+        replayed in call order, which tells which filters emptied the
+        licensed resources (`None`) and which permission filters were then
+        skipped, as when filtering eagerly.
+        """
+        licensed_resources, start = self._filter_plan
+        steps = self._filter_chain.since(start)
+
+        def estimate(step: _FilterStep) -> tuple[int, int]:
+            name, rank = _FILTERS[step.kind]
+            return (
+                licensed_resources.estimate_matches(name, step.argument),
+                rank,
+            )
 
-        licensed_resources.urls = None
+        def apply(
+            resources: LicensedResources, step: _FilterStep
+        ) -> LicensedResources:
+            name, _ = _FILTERS[step.kind]
+            return getattr(resources, f"filter_by_{name}")(step.argument)
 
-        filtering_state = (
-            self.filtering_state.copy() if self.filtering_state else []
-        )
-        next_filter_number = len(filtering_state) + 1
-        filtering_state.append(
-            f"{next_filter_number}:permission:{permission.value}"
-        )
+        selected = licensed_resources
+        for step in sorted(steps, key=estimate):
+            selected = apply(selected, step)
 
-        return self.model_copy(
-            update={
-                "licensed_resources": licensed_resources,
-                "filtering_state": filtering_state,
-            }
-        )
+            if selected.is_empty():
+                break
+
+        skipped = set()
+
+        if selected.is_empty():
+            selected = licensed_resources
+
+            for step in steps:
+                if selected is None:
+                    if step.kind == "permission":
+                        skipped.add(id(step))
+
+                    continue
+
+                selected = apply(selected, step)
+
+                if step.kind != "permission" and selected.is_empty():
+                    selected = None
+
+        fields = {
+            "licensed_resources": selected,
+            "filtering_state": self._filter_chain.to_list(frozenset(skipped)),
+        }
+
+        # Fields assigned since the plan was recorded are kept
+        for name, value in fields.items():
+            self.__dict__.setdefault(name, value)
+
+        return fields
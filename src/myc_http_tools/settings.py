@@ -11,3 +11,35 @@ DEFAULT_REQUEST_ID_KEY = "x-mycelium-request-id"
 DEFAULT_CONNECTION_STRING_KEY = "x-mycelium-connection-string"
 
 DEFAULT_TENANT_ID_KEY = "x-mycelium-tenant-id"
+
+# ------------------------------------------------------------------------------
+# PROFILE SIZE LIMITS
+# ------------------------------------------------------------------------------
+
+DEFAULT_MAX_PROFILE_HEADER_SIZE = 1024 * 1024
+
+DEFAULT_MAX_DECOMPRESSED_PROFILE_SIZE = 16 * 1024 * 1024
+
+DEFAULT_MAX_LICENSED_RESOURCES = 50_000
+
+# ------------------------------------------------------------------------------
+# PROFILE CACHE
+# ------------------------------------------------------------------------------
+
+DEFAULT_PROFILE_CACHE_MAX_ENTRIES = 4096
+
+DEFAULT_PROFILE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+DEFAULT_PROFILE_CACHE_TTL_SECONDS = 60.0
+
+# ------------------------------------------------------------------------------
+# LICENSE URL CACHE
+# ------------------------------------------------------------------------------
+
+DEFAULT_LICENSE_URL_CACHE_MAX_ENTRIES = 16_384
+
+# ------------------------------------------------------------------------------
+# PROFILE DECODING
+# ------------------------------------------------------------------------------
+
+DEFAULT_PROFILE_OFFLOAD_THRESHOLD = 2 * 1024
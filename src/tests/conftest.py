@@ -0,0 +1,44 @@
+"""
+Shared fixtures of the test suite
+"""
+
+import base64
+import json
+from pathlib import Path
+
+import pytest
+import zstandard as zstd
+
+LARGE_PROFILE_PATH = Path(__file__).parent / "mock" / "large-profile.json"
+
+
+@pytest.fixture(scope="session")
+def large_profile_bytes() -> bytes:
+    """The large profile mock, as raw JSON bytes."""
+    return LARGE_PROFILE_PATH.read_bytes()
+
+
+@pytest.fixture(scope="session")
+def load_large_profile(large_profile_bytes):
+    """Return a loader of the large profile mock.
+
+    Each call parses a new dict, so tests may change it.
+    """
+
+    def load() -> dict:
+        return json.loads(large_profile_bytes)
+
+    return load
+
+
+@pytest.fixture(scope="session")
+def encode_profile():
+    """Return an encoder compressing a profile dict as the gateway does."""
+
+    def encode(profile_dict: dict) -> str:
+        compressed = zstd.ZstdCompressor().compress(
+            json.dumps(profile_dict).encode("utf-8")
+        )
+        return base64.standard_b64encode(compressed).decode("ascii")
+
+    return encode
@@ -0,0 +1,196 @@
+"""
+Tests for compression codecs and ZSTD backends
+"""
+
+import base64
+import gzip
+import zlib
+
+import pytest
+import zstandard as zstd
+
+from myc_http_tools.exceptions import ProfileDecodingError, ProfileTooLargeError
+from myc_http_tools.functions import (
+    Codec,
+    ProfileFormat,
+    ZstdBackend,
+    decode_and_decompress_profile_from_base64_robust,
+    get_codec,
+    get_codec_for_format,
+    get_zstd_backend,
+    get_zstd_backends,
+    parse_zstd_frame_header,
+    select_zstd_backend,
+    set_zstd_backend,
+    zstd_backends,
+)
+
+
+@pytest.fixture(params=sorted(get_zstd_backends()))
+def zstd_backend(request):
+    """Run the test once per installed ZSTD backend."""
+    previous = get_zstd_backend()
+    yield set_zstd_backend(request.param)
+    set_zstd_backend(previous.name)
+
+
+class TestParseZstdFrameHeader:
+    """Test cases for parse_zstd_frame_header function"""
+
+    def test_content_size(self):
+        """Test that the declared content size is read"""
+        for size in (0, 100, 300, 70_000):
+            frame = zstd.ZstdCompressor().compress(b"x" * size)
+
+            assert parse_zstd_frame_header(frame).content_size == size
+
+    def test_missing_content_size(self):
+        """Test frames that do not declare their content size"""
+        frame = zstd.ZstdCompressor(write_content_size=False).compress(b"x")
+
+        assert parse_zstd_frame_header(frame).content_size is None
+
+    def test_dictionary_id(self):
+        """Test that the dictionary ID matches zstandard"""
+        frame = zstd.ZstdCompressor().compress(b"x")
+
+        assert parse_zstd_frame_header(frame).dictionary_id == 0
+        assert (
+            parse_zstd_frame_header(frame).dictionary_id
+            == zstd.get_frame_parameters(frame).dict_id
+        )
+
+    def test_invalid_magic(self):
+        """Test that non-ZSTD data is rejected"""
+        with pytest.raises(ValueError):
+            parse_zstd_frame_header(b"not zstd data")
+
+
+class TestZstdBackends:
+    """Test cases for the ZSTD backends"""
+
+    def test_roundtrip(self, zstd_backend, large_profile_bytes):
+        """Test that every backend decompresses every other backend"""
+        payload = large_profile_bytes
+
+        for other in get_zstd_backends().values():
+            assert zstd_backend.decompress(other.compress(payload)) == payload
+
+    def test_output_cap(self, zstd_backend):
+        """Test that backends stop at the output cap"""
+        frame = zstd.ZstdCompressor(write_content_size=False).compress(
+            b" " * 1024 * 1024
+        )
+
+        with pytest.raises(ProfileTooLargeError):
+            zstd_backend.decompress(frame, max_output_size=1024)
+
+    def test_truncated_frame(self, zstd_backend, large_profile_bytes):
+        """Test that truncated frames are rejected"""
+        frame = zstd.ZstdCompressor(write_content_size=False).compress(
+            large_profile_bytes
+        )
+
+        with pytest.raises(Exception):
+            zstd_backend.decompress(frame[:-16])
+
+    def test_select_fastest_backend(self):
+        """Test that the benchmark selects a registered backend"""
+        previous = get_zstd_backend()
+
+        try:
+            selected = select_zstd_backend(rounds=2)
+            assert selected.name in get_zstd_backends()
+            assert get_zstd_backend() is selected
+        finally:
+            set_zstd_backend(previous.name)
+
+    def test_select_backend_when_every_backend_fails(self, monkeypatch):
+        """Test that the first backend is kept when none passes the benchmark"""
+
+        class BrokenBackend(ZstdBackend):
+            def __init__(self, name):
+                self.name = name
+
+            def compress(self, data):
+                return zstd.ZstdCompressor().compress(data)
+
+            def decompress(self, data, max_output_size=None, dictionary=None):
+                raise RuntimeError("broken backend")
+
+        backends = {name: BrokenBackend(name) for name in ("first", "second")}
+        monkeypatch.setattr(zstd_backends, "_backends", backends)
+        monkeypatch.setattr(zstd_backends, "_selected_backend", None)
+
+        assert select_zstd_backend(rounds=2) is backends["first"]
+        assert get_zstd_backend() is backends["first"]
+
+    def test_set_unknown_backend(self):
+        """Test that unknown backend names are rejected"""
+        with pytest.raises(ValueError):
+            set_zstd_backend("unknown")
+
+    @pytest.mark.parametrize("base", [Codec, ZstdBackend])
+    def test_incomplete_implementations_are_rejected(self, base):
+        """Test that codecs and backends missing a method cannot be built"""
+
+        class CompressOnly(base):
+            def compress(self, data):
+                return bytes(data)
+
+        with pytest.raises(TypeError):
+            CompressOnly()
+
+
+class TestCodecs:
+    """Test cases for the codec registry"""
+
+    @pytest.mark.parametrize("name", ["zstd", "zlib", "gzip", "identity"])
+    def test_roundtrip(self, name, large_profile_bytes):
+        """Test that every codec decompresses its own output"""
+        codec = get_codec(name)
+        payload = large_profile_bytes
+
+        assert codec.decompress(codec.compress(payload)) == payload
+
+    @pytest.mark.parametrize("name", ["zstd", "zlib", "gzip", "identity"])
+    def test_output_cap(self, name, large_profile_bytes):
+        """Test that every codec enforces the output cap"""
+        codec = get_codec(name)
+        payload = large_profile_bytes
+
+        with pytest.raises(ProfileTooLargeError):
+            codec.decompress(codec.compress(payload), len(payload) - 1)
+
+    def test_codecs_by_format(self):
+        """Test that sniffed formats map to codecs"""
+        assert get_codec_for_format(ProfileFormat.ZSTD).name == "zstd"
+        assert get_codec_for_format(ProfileFormat.ZLIB).name == "zlib"
+        assert get_codec_for_format(ProfileFormat.GZIP).name == "gzip"
+        assert get_codec_for_format(ProfileFormat.JSON).name == "identity"
+        assert get_codec_for_format(ProfileFormat.UNKNOWN) is None
+
+    def test_unknown_codec(self):
+        """Test that unknown codec names are rejected"""
+        with pytest.raises(ValueError):
+            get_codec("brotli")
+
+    @pytest.mark.parametrize("compress", [zlib.compress, gzip.compress])
+    def test_robust_decoder_with_deflate(self, compress, large_profile_bytes):
+        """Test that the robust decoder dispatches zlib and gzip payloads"""
+        encoded = base64.standard_b64encode(compress(large_profile_bytes))
+
+        profile = decode_and_decompress_profile_from_base64_robust(encoded)
+
+        assert profile.licensed_resources is not None
+
+    def test_robust_decoder_with_corrupted_deflate(self, large_profile_bytes):
+        """Test that corrupted zlib payloads raise ProfileDecodingError"""
+        encoded = base64.standard_b64encode(
+            zlib.compress(large_profile_bytes)[:-16]
+        )
+
+        with pytest.raises(ProfileDecodingError) as exc_info:
+            decode_and_decompress_profile_from_base64_robust(encoded)
+
+        assert "Failed to decompress profile" in exc_info.value.message
@@ -9,8 +9,12 @@ from pathlib import Path
 import pytest
 import zstandard as zstd
 
-from myc_http_tools.exceptions import ProfileDecodingError
-from myc_http_tools.functions import decode_and_decompress_profile_from_base64
+from myc_http_tools.exceptions import ProfileDecodingError, ProfileTooLargeError
+from myc_http_tools.functions import (
+    decode_and_decompress_profile_from_base64,
+    deserialize_profile,
+)
+from myc_http_tools.models.license_columns import LicenseColumns
 from myc_http_tools.models.profile import Profile
 
 
@@ -275,3 +279,172 @@ class TestDecodeAndDecompressProfileFromBase64:
             assert (
                 original_record.name == decoded_record.name
             ), f"Tenant ownership {i} name should match"
+
+    def test_decode_and_decompress_profile_invalid_utf8(self):
+        """Test error when decompressed content is not valid UTF-8"""
+        compressor = zstd.ZstdCompressor()
+        compressed = compressor.compress(b'{"accId": "\xff\xfe"}')
+        encoded = base64.standard_b64encode(compressed).decode("ascii")
+
+        with pytest.raises(ProfileDecodingError) as exc_info:
+            decode_and_decompress_profile_from_base64(encoded)
+
+        assert "Failed to deserialize profile" in exc_info.value.message
+        assert exc_info.value.code == "MYC00020"
+
+
+# Core schema types of validators receiving Python objects: pydantic-core
+# converts the JSON input of their fields first and validates it in Python
+# mode, undoing single-pass validation
+_PYTHON_INPUT_VALIDATORS = {
+    "function-before",
+    "function-wrap",
+    "function-plain",
+}
+
+
+class TestDeserializeProfile:
+    """Test cases for deserialize_profile function"""
+
+    def test_deserialize_profile_from_bytes(self):
+        """Test single-pass validation matches dict-based validation"""
+        profile_dict = load_large_profile()
+        payload = json.dumps(profile_dict).encode("utf-8")
+
+        profile = deserialize_profile(payload)
+
+        assert profile == Profile.model_validate(profile_dict)
+
+    def test_deserialize_profile_with_columnar_licenses(self):
+        """Test that columnar licenses decode to the same profile"""
+        profile_dict = load_large_profile()
+        payload = json.dumps(profile_dict).encode("utf-8")
+
+        profile = deserialize_profile(payload, columnar_licenses=True)
+
+        assert isinstance(
+            profile.licensed_resources.to_licenses_vector(), LicenseColumns
+        )
+        assert profile == Profile.model_validate(profile_dict)
+
+    def test_deserialize_profile_invalid_schema(self):
+        """Test that schema errors are wrapped in ProfileDecodingError"""
+        with pytest.raises(ProfileDecodingError) as exc_info:
+            deserialize_profile(b'{"invalid_field": "value"}')
+
+        assert "Failed to deserialize profile" in exc_info.value.message
+
+    def test_deserialize_profile_validates_json(self, monkeypatch):
+        """Test that payloads are validated without an intermediate dict"""
+        calls = []
+        validate_json = Profile.model_validate_json
+
+        def counting_validate_json(*args, **kwargs):
+            calls.append(args)
+            return validate_json(*args, **kwargs)
+
+        def refuse_dicts(*args, **kwargs):
+            raise AssertionError("Profiles should be validated from JSON")
+
+        monkeypatch.setattr(
+            Profile, "model_validate_json", counting_validate_json
+        )
+        monkeypatch.setattr(Profile, "model_validate", refuse_dicts)
+
+        deserialize_profile(json.dumps(load_large_profile()).encode("utf-8"))
+
+        assert len(calls) == 1
+
+    def test_validation_schema_has_no_python_validators(self):
+        """Test that no validator turns the JSON input into Python objects"""
+        found = []
+
+        def walk(schema, path):
+            if isinstance(schema, dict):
+                if schema.get("type") in _PYTHON_INPUT_VALIDATORS:
+                    found.append(path)
+                for key, value in schema.items():
+                    if key != "serialization":
+                        walk(value, f"{path}/{key}")
+            elif isinstance(schema, list):
+                for i, value in enumerate(schema):
+                    walk(value, f"{path}[{i}]")
+
+        walk(Profile.__pydantic_core_schema__, "")
+
+        assert found == []
+
+
+class TestProfileSizeLimits:
+    """Test cases for the decoding size limits"""
+
+    def test_header_size_limit(self):
+        """Test that oversized headers are rejected before decoding"""
+        encoded = compress_and_encode_profile_to_base64(
+            Profile.model_validate(load_large_profile())
+        )
+
+        with pytest.raises(ProfileTooLargeError) as exc_info:
+            decode_and_decompress_profile_from_base64(
+                encoded, max_header_size=len(encoded) - 1
+            )
+
+        assert exc_info.value.limit == len(encoded) - 1
+        assert exc_info.value.code == "MYC00020"
+
+    def test_decompressed_size_limit_from_frame_header(self):
+        """Test that frames declaring a large content size are rejected"""
+        payload = json.dumps(load_large_profile()).encode("utf-8")
+        compressed = zstd.ZstdCompressor().compress(payload)
+        encoded = base64.standard_b64encode(compressed)
+
+        with pytest.raises(ProfileTooLargeError):
+            decode_and_decompress_profile_from_base64(
+                encoded, max_decompressed_size=len(payload) - 1
+            )
+
+    def test_decompressed_size_limit_when_streaming(self):
+        """Test that streamed frames stop at the decompressed size limit"""
+        bomb = zstd.ZstdCompressor(write_content_size=False).compress(
+            b" " * (64 * 1024 * 1024)
+        )
+        encoded = base64.standard_b64encode(bomb)
+
+        with pytest.raises(ProfileTooLargeError):
+            decode_and_decompress_profile_from_base64(
+                encoded, max_decompressed_size=1024 * 1024
+            )
+
+    def test_licensed_resources_limit(self):
+        """Test that profiles with too many licenses are rejected"""
+        encoded = compress_and_encode_profile_to_base64(
+            Profile.model_validate(load_large_profile())
+        )
+
+        with pytest.raises(ProfileTooLargeError) as exc_info:
+            decode_and_decompress_profile_from_base64(
+                encoded, max_licensed_resources=10
+            )
+
+        assert "10 licensed resources" in exc_info.value.message
+
+    def test_limits_can_be_disabled(self):
+        """Test that None disables every limit"""
+        encoded = compress_and_encode_profile_to_base64(
+            Profile.model_validate(load_large_profile())
+        )
+
+        profile = decode_and_decompress_profile_from_base64(
+            encoded,
+            max_header_size=None,
+            max_decompressed_size=None,
+            max_licensed_resources=None,
+        )
+
+        assert profile.licensed_resources is not None
+
+    def test_model_validation_without_context_is_unlimited(self):
+        """Test that direct model validation does not apply the limit"""
+        profile = Profile.model_validate(load_large_profile())
+
+        assert len(profile.licensed_resources.records) > 10
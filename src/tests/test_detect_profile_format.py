@@ -0,0 +1,101 @@
+"""
+Tests for profile format detection and the robust decoder
+"""
+
+import base64
+
+import pytest
+import zstandard as zstd
+
+from myc_http_tools.exceptions import ProfileDecodingError
+from myc_http_tools.functions import (
+    ProfileFormat,
+    decode_and_decompress_profile_from_base64_robust,
+    detect_profile_format,
+    get_profile_format_counters,
+    reset_profile_format_counters,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_counters():
+    reset_profile_format_counters()
+    yield
+    reset_profile_format_counters()
+
+
+class TestDetectProfileFormat:
+    """Test cases for detect_profile_format function"""
+
+    def test_detect_zstd(self):
+        """Test that ZSTD frames are detected by their magic number"""
+        compressed = zstd.ZstdCompressor().compress(b"{}")
+
+        assert detect_profile_format(compressed) is ProfileFormat.ZSTD
+
+    def test_detect_json(self):
+        """Test that JSON objects are detected, even with leading spaces"""
+        assert detect_profile_format(b'{"a": 1}') is ProfileFormat.JSON
+        assert detect_profile_format(b' \n\t{"a": 1}') is ProfileFormat.JSON
+
+    def test_detect_unknown(self):
+        """Test that other payloads are reported as unknown"""
+        assert detect_profile_format(b"not a profile") is ProfileFormat.UNKNOWN
+        assert detect_profile_format(b"") is ProfileFormat.UNKNOWN
+
+    def test_counters(self):
+        """Test that every detection is counted"""
+        detect_profile_format(b"{}")
+        detect_profile_format(b"{}")
+        detect_profile_format(b"")
+
+        assert get_profile_format_counters() == {
+            "zstd": 0,
+            "zlib": 0,
+            "gzip": 0,
+            "json": 2,
+            "unknown": 1,
+        }
+
+
+class TestDecodeAndDecompressProfileFromBase64Robust:
+    """Test cases for decode_and_decompress_profile_from_base64_robust"""
+
+    def test_decode_zstd_profile(self, large_profile_bytes):
+        """Test decoding a ZSTD-compressed profile"""
+        compressed = zstd.ZstdCompressor().compress(large_profile_bytes)
+        encoded = base64.standard_b64encode(compressed)
+
+        profile = decode_and_decompress_profile_from_base64_robust(encoded)
+
+        assert profile.acc_id is not None
+        assert get_profile_format_counters()["zstd"] == 1
+
+    def test_decode_plain_json_profile(self, large_profile_bytes):
+        """Test decoding an uncompressed profile without ZSTD round trip"""
+        encoded = base64.standard_b64encode(large_profile_bytes)
+
+        profile = decode_and_decompress_profile_from_base64_robust(encoded)
+
+        assert profile.acc_id is not None
+        assert get_profile_format_counters()["json"] == 1
+
+    def test_decode_corrupted_zstd_profile(self, large_profile_bytes):
+        """Test error when a ZSTD frame is corrupted"""
+        compressed = zstd.ZstdCompressor().compress(large_profile_bytes)
+        encoded = base64.standard_b64encode(compressed[:-16])
+
+        with pytest.raises(ProfileDecodingError) as exc_info:
+            decode_and_decompress_profile_from_base64_robust(encoded)
+
+        assert "Failed to decompress profile" in exc_info.value.message
+
+    def test_decode_unknown_format(self):
+        """Test error when the payload is neither ZSTD nor JSON"""
+        encoded = base64.standard_b64encode(b"not a profile")
+
+        with pytest.raises(ProfileDecodingError) as exc_info:
+            decode_and_decompress_profile_from_base64_robust(encoded)
+
+        assert "Failed to deserialize profile" in exc_info.value.message
+        assert get_profile_format_counters()["unknown"] == 1
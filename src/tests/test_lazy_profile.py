@@ -0,0 +1,162 @@
+"""
+Tests for LazyProfile class
+"""
+
+import pytest
+from pydantic import BaseModel
+
+from myc_http_tools.exceptions import ProfileDecodingError
+from myc_http_tools.functions import decode_and_decompress_profile_from_base64
+from myc_http_tools.models.lazy_profile import LazyProfile
+from myc_http_tools.models.profile import Profile
+
+
+class CountingDecoder:
+    """Decoder wrapper counting how many times the decode runs."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, header):
+        self.calls += 1
+        return decode_and_decompress_profile_from_base64(header)
+
+
+class TestLazyProfile:
+    """Test cases for LazyProfile class"""
+
+    def test_no_decoding_until_access(self, encode_profile, load_large_profile):
+        """Test that creating the proxy does not decode the header"""
+        decoder = CountingDecoder()
+
+        lazy = LazyProfile(encode_profile(load_large_profile()), decoder)
+
+        assert decoder.calls == 0
+        assert lazy.is_decoded is False
+        assert "not decoded" in repr(lazy)
+
+    def test_decodes_once_on_attribute_access(
+        self, encode_profile, load_large_profile
+    ):
+        """Test that the header is decoded once, on first access"""
+        profile_dict = load_large_profile()
+        decoder = CountingDecoder()
+        lazy = LazyProfile(encode_profile(profile_dict), decoder)
+
+        assert str(lazy.acc_id) == profile_dict["accId"]
+        assert lazy.is_staff == profile_dict["isStaff"]
+        assert decoder.calls == 1
+        assert lazy.is_decoded is True
+
+    def test_behaves_like_profile(self, encode_profile, load_large_profile):
+        """Test isinstance, equality and filtering methods"""
+        profile_dict = load_large_profile()
+        lazy = LazyProfile(encode_profile(profile_dict))
+        profile = Profile.model_validate(profile_dict)
+
+        tenant_id = profile.licensed_resources.records[0].tenant_id
+
+        assert isinstance(lazy, Profile)
+        assert lazy == profile
+        assert (
+            lazy.with_read_access().on_tenant(tenant_id).filtering_state
+            == profile.with_read_access().on_tenant(tenant_id).filtering_state
+        )
+
+    def test_isinstance_does_not_decode(self):
+        """Test that isinstance checks leave the header undecoded"""
+        decoder = CountingDecoder()
+        lazy = LazyProfile("not-valid-base64!!!", decoder)
+
+        assert isinstance(lazy, Profile)
+        assert isinstance(lazy, BaseModel)
+        assert decoder.calls == 0
+        assert lazy.is_decoded is False
+
+    def test_decoding_error_without_callback(self):
+        """Test that decoding errors surface as ProfileDecodingError"""
+        lazy = LazyProfile("not-valid-base64!!!")
+
+        with pytest.raises(ProfileDecodingError):
+            lazy.acc_id
+
+    def test_decoding_error_with_callback(self):
+        """Test that the error callback is used on failure"""
+
+        class Unauthorized(Exception):
+            pass
+
+        def on_error(error):
+            raise Unauthorized() from error
+
+        lazy = LazyProfile("not-valid-base64!!!", on_error=on_error)
+
+        with pytest.raises(Unauthorized):
+            lazy.acc_id
+
+
+class TestLazyProfileFastAPI:
+    """Test cases for the lazy FastAPI integration"""
+
+    @pytest.fixture
+    def client(self):
+        fastapi = pytest.importorskip("fastapi")
+        testclient = pytest.importorskip("fastapi.testclient")
+        from starlette.middleware.base import BaseHTTPMiddleware
+
+        from myc_http_tools.fastapi import (
+            get_lazy_profile_from_header_required,
+            lazy_profile_middleware,
+        )
+
+        app = fastapi.FastAPI()
+        app.add_middleware(BaseHTTPMiddleware, dispatch=lazy_profile_middleware)
+
+        @app.get("/health")
+        def health(request: fastapi.Request):
+            return {"decoded": request.state.profile.is_decoded}
+
+        @app.get("/me")
+        def me(request: fastapi.Request):
+            return {"accId": str(request.state.profile.acc_id)}
+
+        @app.get("/dependency")
+        def dependency(
+            profile: Profile = fastapi.Depends(
+                get_lazy_profile_from_header_required
+            ),
+        ):
+            return {"accId": str(profile.acc_id)}
+
+        return testclient.TestClient(app)
+
+    def test_unused_profile_is_not_decoded(self, client):
+        """Test that routes not reading the profile skip decoding"""
+        response = client.get(
+            "/health", headers={"x-mycelium-profile": "not-valid-base64!!!"}
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"decoded": False}
+
+    def test_profile_is_decoded_on_access(
+        self, client, encode_profile, load_large_profile
+    ):
+        """Test that routes reading the profile get it decoded"""
+        profile_dict = load_large_profile()
+        headers = {"x-mycelium-profile": encode_profile(profile_dict)}
+
+        for path in ("/me", "/dependency"):
+            response = client.get(path, headers=headers)
+
+            assert response.status_code == 200
+            assert response.json() == {"accId": profile_dict["accId"]}
+
+    def test_invalid_profile_raises_401_on_access(self, client):
+        """Test that decoding failures raise HTTP 401 on access"""
+        headers = {"x-mycelium-profile": "not-valid-base64!!!"}
+
+        for path in ("/me", "/dependency"):
+            response = client.get(path, headers=headers)
+
+            assert response.status_code == 401
@@ -318,3 +318,71 @@ class TestLicensedResourceFromStr:
             LicensedResource._is_uuid("123e4567-e89b-12d3-a456-4266141740000")
             is False
         )  # Too long
+
+
+TENANT_ID = "123e4567-e89b-12d3-a456-426614174000"
+ACCOUNT_ID = "987fcdeb-51a2-43d1-9f12-345678901234"
+ROLE_ID = "456e7890-e89b-12d3-a456-426614174567"
+NAME = base64.b64encode("Conta de Usuário".encode("utf-8")).decode("ascii")
+PATH = f"t/{TENANT_ID}/a/{ACCOUNT_ID}/r/{ROLE_ID}"
+
+PARSER_CASES = [
+    # Canonical URLs, parsed by the fast path
+    f"{PATH}?p=admin:0&s=0&v=0&n={NAME}",
+    f"{PATH}?p=admin:1&s=1&v=1&n={NAME}",
+    f"t/{TENANT_ID.upper()}/a/{ACCOUNT_ID.upper()}/r/{ROLE_ID}?p=admin:1&s=1&v=1&n={NAME}",
+    # Non canonical URLs, parsed by the generic parser
+    f"/{PATH}/?p=admin:1&s=1&v=1&n={NAME}",
+    f"{PATH}?n={NAME}&v=1&s=0&p=admin:1",
+    f"{PATH}?p=admin:1&p=editor:0&s=1&v=1&n={NAME}",
+    f"{PATH}?p=team%20lead:1&s=1&v=1&n={NAME}",
+    f"{PATH}?p=team+lead:1&s=1&v=1&n={NAME}",
+    f"{PATH}?p=admin:1&s=1&v=1&n=QQ+B",
+    f"{PATH}?p=admin:01&s=1&v=1&n={NAME}",
+    f"{PATH}?p=admin:1&s=1&v=1&n={NAME}#fragment",
+    f"t/{TENANT_ID.replace('-', '')}/a/{ACCOUNT_ID}/r/{ROLE_ID}?p=admin:1&s=1&v=1&n={NAME}",
+    # Invalid URLs
+    "",
+    "t/x/a/y/r/z",
+    f"t/{TENANT_ID}/a/{ACCOUNT_ID}/r/not-a-uuid?p=admin:1&s=1&v=1&n={NAME}",
+    f"{PATH}?s=1&v=1&n={NAME}",
+    f"{PATH}?p=admin&s=1&v=1&n={NAME}",
+    f"{PATH}?p=admin:2&s=1&v=1&n={NAME}",
+    f"{PATH}?p=admin:1&s=2&v=1&n={NAME}",
+    f"{PATH}?p=admin:1&s=x&v=1&n={NAME}",
+    f"{PATH}?p=admin:1&s=1&v=2&n={NAME}",
+    f"{PATH}?p=admin:1&s=1&v=1",
+    f"{PATH}?p=admin:1&s=1&v=1&n=QQ",
+    f"{PATH}?p=admin:1&s=1&v=1&n=/w==",
+]
+
+
+class TestLicensedResourceFastParser:
+    """Test that the fast path matches the generic URL parser"""
+
+    @pytest.mark.parametrize("url", PARSER_CASES)
+    def test_same_result_as_generic_parser(self, url):
+        """Test that results and error messages are unchanged"""
+        try:
+            expected = LicensedResource._parse_url(url)
+        except Exception as e:
+            with pytest.raises(type(e)) as exc_info:
+                LicensedResource.from_str(url)
+            assert str(exc_info.value) == str(e)
+        else:
+            resource = LicensedResource.from_str(url)
+            assert resource == expected
+            assert resource.model_dump() == expected.model_dump()
+
+    def test_fast_path_skips_validation(self, monkeypatch):
+        """Test that canonical URLs are built without validation"""
+        monkeypatch.setattr(
+            LicensedResource,
+            "_parse_url",
+            classmethod(lambda cls, value: pytest.fail("generic parser")),
+        )
+
+        resource = LicensedResource.from_str(PARSER_CASES[0])
+
+        assert resource.acc_name == "Conta de Usuário"
+        assert resource.perm == Permission.READ
@@ -4,13 +4,23 @@ Tests for LicensedResources class
 
 import base64
 import pytest
+from pydantic import ValidationError
 from uuid import UUID
 
 from myc_http_tools.models.licensed_resources import (
     LicensedResource,
     LicensedResources,
+    configure_license_url_cache,
+    get_license_url_cache_stats,
+)
+from myc_http_tools.models.license_columns import LicenseColumns
+from myc_http_tools.models.license_index import (
+    MAX_CACHED_MASKS,
+    LicenseIndex,
+    positions_mask,
 )
 from myc_http_tools.models.permission import Permission
+from myc_http_tools.settings import DEFAULT_LICENSE_URL_CACHE_MAX_ENTRIES
 
 
 class TestLicensedResources:
@@ -305,3 +315,618 @@ class TestLicensedResources:
 
         assert licensed_resources.records is None
         assert licensed_resources.urls is None
+
+
+def make_url(
+    index: int, tenant_id: str = "123e4567-e89b-12d3-a456-426614174000"
+) -> str:
+    """Build a valid license URL for the given account index."""
+    account_id = f"987fcdeb-51a2-43d1-9f12-{index:012d}"
+    role_id = "456e7890-e89b-12d3-a456-426614174567"
+    name_encoded = base64.b64encode(f"User {index}".encode("utf-8")).decode(
+        "ascii"
+    )
+    return f"t/{tenant_id}/a/{account_id}/r/{role_id}?p=admin:0&s=0&v=1&n={name_encoded}"
+
+
+class TestLicensesVectorMemoization:
+    """Test cases for the memoized licenses vector"""
+
+    @pytest.fixture
+    def from_str_calls(self, monkeypatch):
+        calls = []
+        original = LicensedResource.from_str.__func__
+
+        def counting_from_str(cls, value):
+            calls.append(value)
+            return original(cls, value)
+
+        monkeypatch.setattr(
+            LicensedResource, "from_str", classmethod(counting_from_str)
+        )
+
+        # Count every parse, without the process-wide license URL cache
+        configure_license_url_cache(0)
+        yield calls
+        configure_license_url_cache(DEFAULT_LICENSE_URL_CACHE_MAX_ENTRIES)
+
+    def test_urls_are_parsed_once(self, from_str_calls):
+        """Test that repeated calls do not parse the URLs again"""
+        licensed_resources = LicensedResources(urls=[make_url(1), make_url(2)])
+
+        first = licensed_resources.to_licenses_vector()
+        second = licensed_resources.to_licenses_vector()
+
+        assert first == second
+        assert len(from_str_calls) == 2
+
+    def test_reassigned_urls_invalidate(self, from_str_calls):
+        """Test that reassigning the URLs parses them again"""
+        licensed_resources = LicensedResources(urls=[make_url(1)])
+        licensed_resources.to_licenses_vector()
+
+        licensed_resources.urls = [make_url(2)]
+        result = licensed_resources.to_licenses_vector()
+
+        assert [r.acc_name for r in result] == ["User 2"]
+        assert len(from_str_calls) == 2
+
+    def test_mutated_urls_invalidate(self, from_str_calls):
+        """Test that mutating the URL list parses it again"""
+        licensed_resources = LicensedResources(urls=[make_url(1)])
+        licensed_resources.to_licenses_vector()
+
+        licensed_resources.urls.append(make_url(2))
+        result = licensed_resources.to_licenses_vector()
+
+        assert [r.acc_name for r in result] == ["User 1", "User 2"]
+
+    def test_records_take_precedence(self, from_str_calls):
+        """Test that records assigned later are returned"""
+        licensed_resources = LicensedResources(urls=[make_url(1)])
+        vector = licensed_resources.to_licenses_vector()
+
+        licensed_resources.records = vector[:0]
+
+        assert licensed_resources.to_licenses_vector() == []
+
+    def test_copies_share_the_vector(self, from_str_calls):
+        """Test that model copies reuse the parsed URLs"""
+        licensed_resources = LicensedResources(urls=[make_url(1), make_url(2)])
+        licensed_resources.to_licenses_vector()
+
+        licensed_resources.model_copy().to_licenses_vector()
+
+        assert len(from_str_calls) == 2
+
+    def test_memoization_does_not_affect_equality(self):
+        """Test that parsed and unparsed instances compare equal"""
+        parsed = LicensedResources(urls=[make_url(1)])
+        parsed.to_licenses_vector()
+
+        assert parsed == LicensedResources(urls=[make_url(1)])
+        assert parsed != LicensedResources(urls=[make_url(2)])
+
+
+class TestLicenseUrlCache:
+    """Test cases for the process-wide license URL cache"""
+
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self):
+        configure_license_url_cache(2)
+        yield
+        configure_license_url_cache(DEFAULT_LICENSE_URL_CACHE_MAX_ENTRIES)
+
+    def test_records_are_shared_across_instances(self):
+        """Test that identical URLs resolve to the same record"""
+        first = LicensedResources(urls=[make_url(1)]).to_licenses_vector()
+        second = LicensedResources(urls=[make_url(1)]).to_licenses_vector()
+
+        assert first[0] is second[0]
+        assert get_license_url_cache_stats().hits == 1
+        assert get_license_url_cache_stats().misses == 1
+
+    def test_shared_records_are_immutable(self):
+        """Test that shared records reject attribute assignment"""
+        record = LicensedResources(urls=[make_url(1)]).to_licenses_vector()[0]
+
+        with pytest.raises(ValidationError):
+            record.role = "editor"
+
+    def test_shared_records_equal_parsed_records(self):
+        """Test that shared records compare equal to parsed ones"""
+        record = LicensedResources(urls=[make_url(1)]).to_licenses_vector()[0]
+
+        assert record == LicensedResource.from_str(make_url(1))
+        assert LicensedResource.from_str(make_url(1)) == record
+        assert isinstance(record, LicensedResource)
+
+    def test_cache_is_bounded(self):
+        """Test that the cache keeps at most max_entries URLs"""
+        LicensedResources(
+            urls=[make_url(i) for i in range(5)]
+        ).to_licenses_vector()
+
+        stats = get_license_url_cache_stats()
+        assert stats.entries == 2
+        assert stats.max_entries == 2
+
+    def test_invalid_urls_are_not_cached(self):
+        """Test that invalid URLs raise on every call"""
+        for _ in range(2):
+            with pytest.raises(ValueError, match="Invalid path format"):
+                LicensedResources(urls=["invalid"]).to_licenses_vector()
+
+        assert get_license_url_cache_stats().entries == 0
+
+    def test_disabled_cache(self):
+        """Test that a zero size disables the cache"""
+        configure_license_url_cache(0)
+
+        first = LicensedResources(urls=[make_url(1)]).to_licenses_vector()
+        second = LicensedResources(urls=[make_url(1)]).to_licenses_vector()
+
+        assert first[0] is not second[0]
+        assert get_license_url_cache_stats().entries == 0
+
+
+def make_record(index: int) -> LicensedResource:
+    """Build a record spread over 3 tenants, 4 accounts and 3 roles."""
+    return LicensedResource(
+        tenant_id=UUID(int=index % 3),
+        acc_id=UUID(int=100 + index % 4),
+        role_id=UUID(int=200 + index % 3),
+        role=["admin", "editor", "viewer"][index % 3 - 1],
+        perm=Permission.WRITE if index % 5 == 0 else Permission.READ,
+        sys_acc=False,
+        acc_name=f"Account {index}",
+        verified=True,
+    )
+
+
+class TestLicenseIndexes:
+    """Test cases for the indexed filters of LicensedResources"""
+
+    @pytest.fixture
+    def records(self):
+        return [make_record(i) for i in range(60)]
+
+    def test_filters_match_linear_scans(self, records):
+        """Test that indexed filters return the linear scan results, in order"""
+        licensed_resources = LicensedResources(records=records)
+
+        assert licensed_resources.filter_by_tenant(UUID(int=1)).records == [
+            r for r in records if r.tenant_id == UUID(int=1)
+        ]
+        assert licensed_resources.filter_by_account(UUID(int=102)).records == [
+            r for r in records if r.acc_id == UUID(int=102)
+        ]
+        assert licensed_resources.filter_by_roles(
+            ["viewer", "admin", "admin"]
+        ).records == [r for r in records if r.role in ["viewer", "admin"]]
+        assert licensed_resources.filter_by_permission(
+            Permission.WRITE
+        ).records == [r for r in records if r.perm == Permission.WRITE]
+
+    def test_chained_filters_match_linear_scans(self, records):
+        """Test that filters on filtered copies intersect correctly"""
+        licensed_resources = LicensedResources(records=records)
+
+        result = (
+            licensed_resources.filter_by_account(UUID(int=101))
+            .filter_by_tenant(UUID(int=2))
+            .filter_by_roles(["editor", "viewer"])
+        )
+
+        assert result.records == [
+            r
+            for r in records
+            if r.acc_id == UUID(int=101)
+            and r.tenant_id == UUID(int=2)
+            and r.role in ["editor", "viewer"]
+        ]
+
+    def test_index_is_shared_with_filtered_copies(self, records):
+        """Test that the index is built once and carried over"""
+        licensed_resources = LicensedResources(records=records)
+
+        filtered = licensed_resources.filter_by_tenant(UUID(int=1))
+        filtered.filter_by_account(UUID(int=101))
+
+        assert filtered._index is licensed_resources._index
+
+    def test_filtered_copies_are_lazy(self, records):
+        """Test that filtered copies keep a selection mask until read"""
+        licensed_resources = LicensedResources(records=records)
+
+        filtered = licensed_resources.filter_by_tenant(
+            UUID(int=1)
+        ).filter_by_permission(Permission.WRITE)
+
+        assert "records" not in filtered.__dict__
+        assert not filtered.is_empty()
+        assert filtered.filter_by_tenant(UUID(int=2)).is_empty()
+        assert filtered.records == [
+            r
+            for r in records
+            if r.tenant_id == UUID(int=1) and r.perm == Permission.WRITE
+        ]
+
+    def test_sparse_selections_are_scanned_once(self, records):
+        """Test that small selections defer building the indexes they use"""
+        licensed_resources = LicensedResources(records=records)
+        account = licensed_resources.filter_by_account(UUID(int=101))
+        index = licensed_resources._index
+
+        expected = [
+            r
+            for r in records
+            if r.acc_id == UUID(int=101)
+            and r.tenant_id == UUID(int=1)
+            and r.perm == Permission.WRITE
+        ]
+
+        scanned = account.filter_by_tenant(UUID(int=1)).filter_by_permission(
+            Permission.WRITE
+        )
+
+        assert scanned.records == expected
+        assert not index.has_bucket("tenant")
+        assert not index.has_write_mask()
+
+        built = account.filter_by_tenant(UUID(int=1)).filter_by_permission(
+            Permission.WRITE
+        )
+
+        assert built.records == expected
+        assert index.has_bucket("tenant")
+        assert index.has_write_mask()
+
+    @pytest.mark.parametrize("concurrent_change", ["evicted", "resized"])
+    def test_masks_survive_concurrent_evictions(
+        self, records, concurrent_change
+    ):
+        """Test that another thread changing the masks does not fail lookups"""
+        index = LicenseIndex(records)
+        expected = positions_mask(index.bucket("tenant", UUID(int=1)), 60)
+
+        class ConcurrentMasks(dict):
+            def __iter__(self):
+                if concurrent_change == "resized":
+                    raise RuntimeError(
+                        "dictionary changed size during iteration"
+                    )
+
+                # The oldest mask was dropped by another thread already
+                return iter(["evicted", *super().__iter__()])
+
+        index._masks["tenant"] = ConcurrentMasks(
+            {UUID(int=1000 + i): 0 for i in range(MAX_CACHED_MASKS)}
+        )
+
+        assert index.mask("tenant", UUID(int=1)) == expected
+
+    def test_changed_records_rebuild_the_index(self, records):
+        """Test that changes to the records invalidate the index"""
+        licensed_resources = LicensedResources(records=records)
+        filtered = licensed_resources.filter_by_tenant(UUID(int=1))
+
+        filtered.records.append(records[0])
+        result = filtered.filter_by_tenant(UUID(int=0))
+
+        assert result.records == [records[0]]
+        assert filtered._index is not licensed_resources._index
+
+    def test_filters_on_urls(self):
+        """Test that filters work on URL licenses"""
+        licensed_resources = LicensedResources(
+            urls=[
+                make_url(1),
+                make_url(2, "223e4567-e89b-12d3-a456-426614174001"),
+            ]
+        )
+
+        result = licensed_resources.filter_by_tenant(
+            UUID("223e4567-e89b-12d3-a456-426614174001")
+        )
+
+        assert [r.acc_name for r in result.records] == ["User 2"]
+        assert result.urls is None
+
+    def test_max_permission(self, records):
+        """Test the highest permission of a role on a tenant"""
+        licensed_resources = LicensedResources(records=records)
+
+        for tenant in range(3):
+            for role in ["admin", "editor", "viewer"]:
+                perms = [
+                    r.perm.to_int()
+                    for r in records
+                    if r.tenant_id == UUID(int=tenant) and r.role == role
+                ]
+                expected = (
+                    Permission.WRITE
+                    if perms and max(perms)
+                    else (Permission.READ if perms else None)
+                )
+
+                assert (
+                    licensed_resources.max_permission(UUID(int=tenant), role)
+                    == expected
+                )
+
+    def test_max_permission_on_filtered_copy(self, records):
+        """Test that filtered copies only consider their own licenses"""
+        licensed_resources = LicensedResources(records=records)
+
+        for account in range(100, 104):
+            filtered = licensed_resources.filter_by_account(UUID(int=account))
+
+            for tenant in range(3):
+                for role in ["admin", "editor", "viewer"]:
+                    perms = [
+                        r.perm
+                        for r in filtered.records
+                        if r.tenant_id == UUID(int=tenant) and r.role == role
+                    ]
+                    expected = max(perms, key=Permission.to_int, default=None)
+
+                    assert (
+                        filtered.max_permission(UUID(int=tenant), role)
+                        == expected
+                    )
+
+
+class TestLicenseColumns:
+    """Test cases for the columnar store of LicensedResources"""
+
+    @pytest.fixture
+    def records(self):
+        return [make_record(i) for i in range(60)]
+
+    def test_compact_records(self, records):
+        """Test that compacted records are a lazy view of the same records"""
+        compacted = LicensedResources(records=records).compact()
+
+        vector = compacted.to_licenses_vector()
+
+        assert isinstance(vector, LicenseColumns)
+        assert "records" not in compacted.__dict__
+        assert len(vector) == len(records)
+        assert list(vector) == records
+        assert vector[-1] == records[-1]
+        assert vector[10:13] == records[10:13]
+        assert compacted.records == records
+
+    def test_compact_urls(self):
+        """Test that URLs are packed, including non-canonical ones"""
+        urls = [make_url(1), make_url(10).replace("==", "%3D%3D")]
+        licensed_resources = LicensedResources(urls=urls)
+
+        compacted = licensed_resources.compact()
+
+        assert isinstance(compacted.to_licenses_vector(), LicenseColumns)
+        assert compacted.to_licenses_vector() == list(
+            licensed_resources.to_licenses_vector()
+        )
+        assert compacted.urls == urls
+        assert compacted.records is None
+
+    def test_compact_value_is_unchanged(self, records):
+        """Test that compacting does not change equality or serialization"""
+        licensed_resources = LicensedResources(records=records)
+
+        compacted = licensed_resources.compact()
+
+        assert compacted.model_dump() == licensed_resources.model_dump()
+        assert compacted == licensed_resources
+
+    def test_filters_stay_columnar(self, records):
+        """Test that filters on compacted records match linear scans"""
+        compacted = LicensedResources(records=records).compact()
+
+        result = (
+            compacted.filter_by_account(UUID(int=101))
+            .filter_by_tenant(UUID(int=2))
+            .filter_by_roles(["editor", "viewer", "unknown"])
+            .filter_by_permission(Permission.READ)
+        )
+
+        assert isinstance(result.to_licenses_vector(), LicenseColumns)
+        assert result.to_licenses_vector() == [
+            r
+            for r in records
+            if r.acc_id == UUID(int=101)
+            and r.tenant_id == UUID(int=2)
+            and r.role in ["editor", "viewer"]
+        ]
+        assert compacted.filter_by_permission(
+            Permission.WRITE
+        ).to_licenses_vector() == [
+            r for r in records if r.perm == Permission.WRITE
+        ]
+
+    def test_max_permission(self, records):
+        """Test the highest permission on compacted records"""
+        licensed_resources = LicensedResources(records=records)
+        compacted = licensed_resources.compact()
+        filtered = compacted.filter_by_account(UUID(int=100))
+
+        for tenant in range(3):
+            for role in ["admin", "editor", "viewer", "unknown"]:
+                assert compacted.max_permission(
+                    UUID(int=tenant), role
+                ) == licensed_resources.max_permission(UUID(int=tenant), role)
+                assert filtered.max_permission(
+                    UUID(int=tenant), role
+                ) == licensed_resources.filter_by_account(
+                    UUID(int=100)
+                ).max_permission(
+                    UUID(int=tenant), role
+                )
+
+    def test_changed_records_rebuild_the_index(self, records):
+        """Test that materialized records can still be changed"""
+        compacted = LicensedResources(records=records).compact()
+        filtered = compacted.filter_by_tenant(UUID(int=1))
+
+        filtered.records.append(records[0])
+        result = filtered.filter_by_tenant(UUID(int=0))
+
+        assert result.records == [records[0]]
+
+    def test_validation_context(self, records):
+        """Test that the validation context compacts validated licenses"""
+        data = LicensedResources(records=records).model_dump()
+
+        licensed_resources = LicensedResources.model_validate(
+            data, context={"columnar_licenses": True}
+        )
+
+        assert isinstance(
+            licensed_resources.to_licenses_vector(), LicenseColumns
+        )
+        assert licensed_resources.records == records
+
+
+class TestIterLicenses:
+    """Test cases for the streaming license iterator"""
+
+    @pytest.fixture
+    def records(self):
+        return [make_record(i) for i in range(60)]
+
+    def test_filters_match_linear_scans(self, records):
+        """Test that pushed-down filters match a scan of the vector"""
+        for licensed_resources in (
+            LicensedResources(records=records),
+            LicensedResources(records=records).compact(),
+            LicensedResources(records=records).filter_by_tenant(UUID(int=1)),
+        ):
+            vector = list(licensed_resources.to_licenses_vector())
+
+            assert list(
+                licensed_resources.iter_licenses(
+                    account_id=UUID(int=101),
+                    roles=["admin", "viewer"],
+                    permission=Permission.WRITE,
+                )
+            ) == [
+                r
+                for r in vector
+                if r.acc_id == UUID(int=101)
+                and r.role in ["admin", "viewer"]
+                and r.perm == Permission.WRITE
+            ]
+            assert list(
+                licensed_resources.iter_licenses(
+                    predicate=lambda r: r.acc_id == UUID(int=102)
+                )
+            ) == [r for r in vector if r.acc_id == UUID(int=102)]
+
+    def test_urls_are_parsed_up_to_the_first_match(self):
+        """Test that existence checks stop parsing once answered"""
+        tenant_id = "223e4567-e89b-12d3-a456-426614174001"
+        licensed_resources = LicensedResources(
+            urls=[make_url(1), make_url(2, tenant_id), "invalid-url"]
+        )
+
+        first = next(
+            licensed_resources.iter_licenses(tenant_id=UUID(tenant_id))
+        )
+
+        assert first.acc_name == "User 2"
+        assert licensed_resources.has_match(tenant_id=UUID(tenant_id))
+        assert licensed_resources._licenses_vector is None
+
+        with pytest.raises(ValueError):
+            licensed_resources.has_match(permission=Permission.WRITE)
+
+    def test_parsed_urls_are_reused(self):
+        """Test that memoized vectors are iterated instead of the URLs"""
+        licensed_resources = LicensedResources(urls=[make_url(1), make_url(2)])
+        vector = licensed_resources.to_licenses_vector()
+
+        assert list(licensed_resources.iter_licenses()) == vector
+        assert all(
+            a is b for a, b in zip(licensed_resources.iter_licenses(), vector)
+        )
+
+
+class TestUrlPushDown:
+    """Test cases for the filters checked on raw license URLs"""
+
+    TENANT = "223e4567-e89b-12d3-a456-426614174001"
+    OTHER_TENANT = "123e4567-e89b-12d3-a456-426614174000"
+
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self):
+        configure_license_url_cache(DEFAULT_LICENSE_URL_CACHE_MAX_ENTRIES)
+        yield
+        configure_license_url_cache(DEFAULT_LICENSE_URL_CACHE_MAX_ENTRIES)
+
+    @pytest.fixture
+    def urls(self):
+        return [
+            make_url(i, self.TENANT if i % 3 == 0 else self.OTHER_TENANT)
+            for i in range(12)
+        ]
+
+    def test_only_matching_urls_are_parsed(self, urls):
+        """Test that URLs of other tenants are rejected before parsing"""
+        result = LicensedResources(urls=urls).filter_by_tenant(
+            UUID(self.TENANT)
+        )
+
+        assert get_license_url_cache_stats().misses == 0
+        assert [r.acc_name for r in result.records] == [
+            "User 0",
+            "User 3",
+            "User 6",
+            "User 9",
+        ]
+        assert result.urls is None
+        assert get_license_url_cache_stats().misses == 4
+
+    def test_non_canonical_urls_are_checked_once_parsed(self, urls):
+        """Test that URLs not in the canonical form are parsed to be checked"""
+        reordered = urls[1].replace("?p=admin:0&s=0", "?s=0&p=admin:0")
+        uppercase = urls[2].replace(urls[2][2:38], urls[2][2:38].upper())
+
+        licensed_resources = LicensedResources(
+            urls=[reordered, uppercase, urls[3]]
+        )
+
+        assert [
+            r.acc_name
+            for r in licensed_resources.filter_by_tenant(
+                UUID(self.OTHER_TENANT)
+            ).records
+        ] == ["User 1", "User 2"]
+
+    def test_chained_filters_stay_on_urls(self, urls):
+        """Test that chained filters narrow the URLs before parsing"""
+        result = (
+            LicensedResources(urls=urls)
+            .filter_by_permission(Permission.READ)
+            .filter_by_tenant(UUID(self.TENANT))
+            .filter_by_roles(["admin"])
+            .filter_by_account(UUID("987fcdeb-51a2-43d1-9f12-000000000006"))
+        )
+
+        assert not result.is_empty()
+        assert get_license_url_cache_stats().misses == 0
+        assert [r.acc_name for r in result.records] == ["User 6"]
+        assert result.filter_by_permission(Permission.WRITE).is_empty()
+
+    def test_filtered_again_instances_are_indexed(self, urls):
+        """Test that only the first filter of an instance is pushed down"""
+        licensed_resources = LicensedResources(urls=urls)
+
+        licensed_resources.filter_by_tenant(UUID(self.TENANT))
+        assert licensed_resources._index is None
+
+        result = licensed_resources.filter_by_tenant(UUID(self.TENANT))
+
+        assert licensed_resources._index is not None
+        assert len(result.records) == 4
@@ -2,13 +2,21 @@
 Tests for Profile class
 """
 
+import base64
 from uuid import UUID
 
 import pytest
 
+from myc_http_tools.exceptions import (
+    InsufficientLicensesError,
+    InsufficientPrivilegesError,
+)
+from myc_http_tools.models.access_query import AccessQuery
 from myc_http_tools.models.licensed_resources import (
     LicensedResource,
     LicensedResources,
+    configure_license_url_cache,
+    get_license_url_cache_stats,
 )
 from myc_http_tools.models.owner import Owner
 from myc_http_tools.models.permission import Permission
@@ -18,6 +26,7 @@ from myc_http_tools.models.tenants_ownership import (
     TenantsOwnership,
 )
 from myc_http_tools.models.verbose_status import VerboseStatus
+from myc_http_tools.settings import DEFAULT_LICENSE_URL_CACHE_MAX_ENTRIES
 
 
 class TestProfile:
@@ -2102,3 +2111,495 @@ class TestProfile:
         # Step 4: Get related accounts should return staff privileges (bypasses licensed resources)
         related_accounts = profile.get_related_account_or_error()
         assert related_accounts.type == "has_staff_privileges"
+
+
+def make_chain_profile(filtering_state=None) -> Profile:
+    """Build a profile with 40 licenses over 4 tenants, accounts and roles."""
+    return Profile(
+        acc_id=UUID(int=1),
+        is_subscription=False,
+        is_staff=False,
+        is_manager=False,
+        owner_is_active=True,
+        account_is_active=True,
+        account_was_approved=True,
+        account_was_archived=False,
+        account_was_deleted=False,
+        filtering_state=filtering_state,
+        licensed_resources=LicensedResources(
+            records=[
+                LicensedResource(
+                    tenant_id=UUID(int=i % 4),
+                    acc_id=UUID(int=100 + i % 5),
+                    role_id=UUID(int=200 + i % 2),
+                    role=["admin", "user"][i % 2],
+                    perm=Permission.WRITE if i % 3 == 0 else Permission.READ,
+                    sys_acc=False,
+                    acc_name=f"Account {i}",
+                    verified=True,
+                )
+                for i in range(40)
+            ]
+        ),
+    )
+
+
+class TestProfileFilterChain:
+    """Test cases for the selection masks and filtering state of chains"""
+
+    def test_chain_defers_records_and_filtering_state(self):
+        """Test that chains materialize nothing until read"""
+        profile = (
+            make_chain_profile()
+            .on_tenant(UUID(int=1))
+            .with_write_access()
+            .with_roles(["user"])
+        )
+
+        assert "filtering_state" not in profile.__dict__
+        assert "records" not in profile.licensed_resources.__dict__
+
+        assert profile.filtering_state == [
+            f"1:tenantId:{UUID(int=1)}",
+            "2:permission:write",
+            "3:role:user",
+        ]
+        assert profile.licensed_resources.records == [
+            record
+            for record in make_chain_profile().licensed_resources.records
+            if record.tenant_id == UUID(int=1)
+            and record.perm == Permission.WRITE
+            and record.role == "user"
+        ]
+
+    def test_chain_extends_initial_filtering_state(self):
+        """Test that chains number their filters after the initial state"""
+        profile = make_chain_profile(["1:tenantId:x"]).on_account(UUID(int=101))
+
+        assert profile.filtering_state == [
+            "1:tenantId:x",
+            f"2:accountId:{UUID(int=101)}",
+        ]
+
+    def test_branches_do_not_share_filtering_state(self):
+        """Test that chains forked from the same profile are independent"""
+        base = make_chain_profile().with_read_access()
+
+        tenant = base.on_tenant(UUID(int=2))
+        account = base.on_account(UUID(int=102))
+        base.filtering_state.append("2:changed")
+        after_read = base.with_roles(["admin"])
+
+        assert tenant.filtering_state == [
+            "1:permission:read",
+            f"2:tenantId:{UUID(int=2)}",
+        ]
+        assert account.filtering_state == [
+            "1:permission:read",
+            f"2:accountId:{UUID(int=102)}",
+        ]
+        assert after_read.filtering_state == [
+            "1:permission:read",
+            "2:changed",
+            "3:role:admin",
+        ]
+
+    def test_chain_equals_eager_profile(self):
+        """Test that derived profiles equal their fully built counterpart"""
+        profile = make_chain_profile().on_tenant(UUID(int=3))
+
+        expected = make_chain_profile().model_copy(
+            update={
+                "licensed_resources": LicensedResources(
+                    records=profile.licensed_resources.records
+                ),
+                "filtering_state": [f"1:tenantId:{UUID(int=3)}"],
+            }
+        )
+
+        assert profile == expected
+        assert profile.model_dump() == expected.model_dump()
+
+    def test_chain_iterates_every_field(self):
+        """Test that iterating a derived profile yields every field"""
+        profile = make_chain_profile()
+        filtered = profile.on_tenant(UUID(int=3)).with_read_access()
+
+        assert list(dict(filtered)) == list(dict(profile))
+        assert dict(filtered)["licensed_resources"] == (
+            filtered.licensed_resources
+        )
+        assert dict(filtered)["filtering_state"] == [
+            f"1:tenantId:{UUID(int=3)}",
+            "2:permission:read",
+        ]
+
+    def test_empty_selection_clears_licensed_resources(self):
+        """Test that empty selections are detected without reading records"""
+        profile = make_chain_profile().on_tenant(UUID(int=1))
+
+        assert profile.with_roles(["admin"]).licensed_resources is None
+        assert profile.with_roles(["user"]).licensed_resources is not None
+
+
+class TestProfileFilterPlan:
+    """Test cases for the deferred evaluation of filter chains"""
+
+    @pytest.fixture
+    def applied(self, monkeypatch):
+        """Record the filters applied to licensed resources, in order."""
+        applied = []
+
+        for name in ("tenant", "account", "roles", "permission"):
+            method = getattr(LicensedResources, f"filter_by_{name}")
+
+            def spy(self, value, name=name, method=method):
+                applied.append(name)
+                return method(self, value)
+
+            monkeypatch.setattr(LicensedResources, f"filter_by_{name}", spy)
+
+        return applied
+
+    def test_filters_are_deferred(self, applied):
+        """Test that no filter is applied until licensed resources are read"""
+        profile = make_chain_profile().with_read_access().on_tenant(UUID(int=1))
+
+        assert applied == []
+        assert "licensed_resources" not in profile.__dict__
+
+        assert profile.licensed_resources is not None
+        assert len(applied) == 2
+
+    def test_filters_are_applied_by_rank_on_cold_indexes(self, applied):
+        """Test that tenant and account filters go first without statistics"""
+        profile = (
+            make_chain_profile()
+            .with_write_access()
+            .with_roles(["admin"])
+            .on_account(UUID(int=103))
+            .on_tenant(UUID(int=2))
+        )
+
+        profile.licensed_resources
+
+        assert applied == ["tenant", "account", "roles", "permission"]
+
+    def test_selective_filters_are_applied_first(self, applied):
+        """Test that filters are reordered by their estimated matches"""
+        base = make_chain_profile()
+        base.licensed_resources.filter_by_tenant(UUID(int=2))
+        base.licensed_resources.filter_by_account(UUID(int=103))
+        applied.clear()
+
+        profile = (
+            base.with_write_access()
+            .with_roles(["admin"])
+            .on_tenant(UUID(int=2))
+            .on_account(UUID(int=103))
+        )
+
+        profile.licensed_resources
+
+        assert applied == ["account", "tenant", "roles", "permission"]
+        assert profile.filtering_state == [
+            "1:permission:write",
+            "2:role:admin",
+            f"3:tenantId:{UUID(int=2)}",
+            f"4:accountId:{UUID(int=103)}",
+        ]
+
+    def test_staff_profiles_skip_evaluation(self, applied):
+        """Test that privileges are checked before evaluating the plan"""
+        profile = make_chain_profile().on_tenant(UUID(int=1))
+        profile.is_staff = True
+
+        profile.get_related_account_or_error()
+
+        assert applied == []
+
+    def test_permission_after_empty_filter_is_not_recorded(self):
+        """Test that call order decides which filters emptied the chain"""
+        profile = (
+            make_chain_profile()
+            .on_tenant(UUID(int=9))
+            .with_write_access()
+            .on_account(UUID(int=100))
+        )
+
+        assert profile.licensed_resources is None
+        assert profile.filtering_state == [
+            f"1:tenantId:{UUID(int=9)}",
+            f"2:accountId:{UUID(int=100)}",
+        ]
+
+    def test_empty_permission_filter_keeps_licensed_resources(self):
+        """Test that permission filters leave empty licensed resources"""
+        profile = (
+            make_chain_profile()
+            .on_tenant(UUID(int=3))
+            .on_account(UUID(int=101))
+            .with_write_access()
+        )
+
+        assert profile.licensed_resources is not None
+        assert profile.licensed_resources.records == []
+        assert profile.filtering_state == [
+            f"1:tenantId:{UUID(int=3)}",
+            f"2:accountId:{UUID(int=101)}",
+            "3:permission:write",
+        ]
+
+    def test_url_licenses_are_parsed_after_filtering(self):
+        """Test that chains on license URLs only parse the matching URLs"""
+        configure_license_url_cache(DEFAULT_LICENSE_URL_CACHE_MAX_ENTRIES)
+        records = make_chain_profile().licensed_resources.records
+        profile = make_chain_profile()
+        profile.licensed_resources = LicensedResources(
+            urls=[
+                f"t/{r.tenant_id}/a/{r.acc_id}/r/{r.role_id}"
+                f"?p={r.role}:{r.perm.to_int()}&s=0&v=1"
+                f"&n={base64.b64encode(r.acc_name.encode()).decode()}"
+                for r in records
+            ]
+        )
+
+        result = (
+            profile.with_write_access()
+            .on_tenant(UUID(int=1))
+            .on_account(UUID(int=101))
+        )
+
+        assert result.licensed_resources.records == [
+            r
+            for r in records
+            if r.tenant_id == UUID(int=1)
+            and r.acc_id == UUID(int=101)
+            and r.perm == Permission.WRITE
+        ]
+        assert get_license_url_cache_stats().misses == 1
+
+
+class TestProfilePredicates:
+    """Test cases for the boolean authorization predicates"""
+
+    @staticmethod
+    def chain(profile, tenant_id, account_id, roles, permission):
+        """Apply the filter chain equivalent to the predicate arguments."""
+        if tenant_id is not None:
+            profile = profile.on_tenant(tenant_id)
+        if account_id is not None:
+            profile = profile.on_account(account_id)
+        if roles is not None:
+            profile = profile.with_roles(roles)
+        if permission is Permission.WRITE:
+            return profile.with_write_access()
+        return profile.with_read_access()
+
+    @staticmethod
+    def arguments():
+        """Every combination of the predicate arguments."""
+        for tenant_id in (None, UUID(int=1), UUID(int=9)):
+            for account_id in (None, UUID(int=101), UUID(int=104)):
+                for roles in (None, [], ["admin"], ["user", "admin"]):
+                    for permission in Permission:
+                        yield tenant_id, account_id, roles, permission
+
+    def test_count_matches_filter_chains(self):
+        """Test that count returns the length of the chained results"""
+        for base in (
+            make_chain_profile(),
+            make_chain_profile().on_tenant(UUID(int=2)),
+        ):
+            for tenant_id, account_id, roles, permission in self.arguments():
+                chained = self.chain(
+                    base, tenant_id, account_id, roles, permission
+                ).licensed_resources
+                expected = 0 if chained is None else len(chained.records)
+
+                assert (
+                    base.count(
+                        tenant_id=tenant_id,
+                        account_id=account_id,
+                        roles=roles,
+                        permission=permission,
+                    )
+                    == expected
+                )
+                assert base.any(
+                    tenant_id=tenant_id,
+                    account_id=account_id,
+                    roles=roles,
+                    permission=permission,
+                ) == bool(expected)
+
+    def test_can_matches_get_related_account_or_error(self):
+        """Test that can answers as the exception-based chain"""
+        staff = make_chain_profile()
+        staff.is_staff = True
+
+        for base in (make_chain_profile(), staff):
+            for tenant_id, account_id, roles, permission in self.arguments():
+                try:
+                    self.chain(
+                        base, tenant_id, account_id, roles, permission
+                    ).get_related_account_or_error()
+                    expected = True
+                except (
+                    InsufficientLicensesError,
+                    InsufficientPrivilegesError,
+                ):
+                    expected = False
+
+                assert (
+                    base.can(
+                        permission,
+                        tenant_id=tenant_id,
+                        account_id=account_id,
+                        roles=roles,
+                    )
+                    is expected
+                )
+
+    def test_predicates_leave_the_profile_unchanged(self):
+        """Test that predicates record no filtering state"""
+        profile = make_chain_profile()
+
+        assert profile.can(
+            Permission.WRITE, tenant_id=UUID(int=0), roles=["admin"]
+        )
+        assert profile.count(account_id=UUID(int=100)) == 8
+        assert profile.filtering_state is None
+        assert len(profile.licensed_resources.records) == 40
+
+    def test_predicates_without_licensed_resources(self):
+        """Test that profiles without licenses match nothing"""
+        profile = make_chain_profile()
+        profile.licensed_resources = None
+
+        assert profile.count() == 0
+        assert not profile.any()
+        assert not profile.can(Permission.READ)
+
+    def test_can_many_matches_can(self):
+        """Test that batch queries answer as one call of can per query"""
+        staff = make_chain_profile()
+        staff.is_staff = True
+        compacted = make_chain_profile()
+        compacted.licensed_resources = compacted.licensed_resources.compact()
+
+        queries = [
+            AccessQuery(tenant_id, account_id, role, permission)
+            for tenant_id, account_id, roles, permission in self.arguments()
+            for role in roles or [None, "guest"]
+        ]
+
+        for base in (
+            make_chain_profile(),
+            make_chain_profile().on_tenant(UUID(int=1)),
+            compacted,
+            staff,
+        ):
+            assert base.can_many(queries) == [
+                base.can(
+                    query.permission,
+                    tenant_id=query.tenant_id,
+                    account_id=query.account_id,
+                    roles=None if query.role is None else [query.role],
+                )
+                for query in queries
+            ]
+
+    def test_allowed_keeps_authorized_items(self):
+        """Test that allowed filters items through their queries"""
+        profile = make_chain_profile()
+        rows = [
+            {"account": UUID(int=100 + i), "tenant": UUID(int=i)}
+            for i in range(6)
+        ]
+
+        allowed = profile.allowed(
+            rows,
+            key=lambda row: (
+                row["tenant"],
+                row["account"],
+                "admin",
+                Permission.WRITE,
+            ),
+        )
+
+        assert allowed == [rows[0]]
+        assert profile.allowed(
+            [(UUID(int=1), None, None, Permission.READ)]
+        ) == [(UUID(int=1), None, None, Permission.READ)]
+
+
+class TestProfileAuthorize:
+    """Test cases for the related accounts of filter arguments"""
+
+    @staticmethod
+    def outcome(call):
+        """Return the related accounts of a call, or the error it raised."""
+        try:
+            return call().model_dump()
+        except (InsufficientLicensesError, InsufficientPrivilegesError) as e:
+            return type(e), e.message, getattr(e, "filtering_state", None)
+
+    def test_authorize_matches_get_related_account_or_error(self):
+        """Test that authorize answers as the README filter chain"""
+        staff = make_chain_profile()
+        staff.is_staff = True
+        unlicensed = make_chain_profile()
+        unlicensed.licensed_resources = None
+
+        for base in (
+            make_chain_profile(),
+            make_chain_profile(["1:x:y"]).on_tenant(UUID(int=2)),
+            unlicensed,
+            staff,
+        ):
+            for (
+                tenant_id,
+                account_id,
+                roles,
+                permission,
+            ) in TestProfilePredicates.arguments():
+
+                def chain():
+                    profile = (
+                        base.with_write_access()
+                        if permission is Permission.WRITE
+                        else base.with_read_access()
+                    )
+                    if tenant_id is not None:
+                        profile = profile.on_tenant(tenant_id)
+                    if roles is not None:
+                        profile = profile.with_roles(roles)
+                    if account_id is not None:
+                        profile = profile.on_account(account_id)
+                    return profile.get_related_account_or_error()
+
+                assert self.outcome(chain) == self.outcome(
+                    lambda: base.authorize(
+                        permission,
+                        tenant_id=tenant_id,
+                        account_id=account_id,
+                        roles=roles,
+                    )
+                )
+
+    def test_authorize_builds_no_profiles(self, monkeypatch):
+        """Test that granted requests skip the filter chain"""
+        profile = make_chain_profile()
+
+        def chained(*args):
+            raise AssertionError("the filter chain was built")
+
+        monkeypatch.setattr(Profile, "on_tenant", chained)
+        related = profile.authorize(tenant_id=UUID(int=2), roles=["admin"])
+
+        assert related.accounts == [
+            record.acc_id
+            for record in profile.licensed_resources.records
+            if record.tenant_id == UUID(int=2) and record.role == "admin"
+        ]
@@ -0,0 +1,234 @@
+"""
+Tests for ProfileCache
+"""
+
+import pytest
+from pydantic import ValidationError
+
+from myc_http_tools.exceptions import ProfileDecodingError
+from myc_http_tools.functions import (
+    ProfileCache,
+    decode_and_decompress_profile_from_base64,
+)
+from myc_http_tools.models.profile import Profile
+
+
+class CountingDecoder:
+    """Decoder wrapper counting how many times the decode runs."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, header):
+        self.calls += 1
+        return decode_and_decompress_profile_from_base64(header)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestProfileCache:
+    """Test cases for ProfileCache"""
+
+    def test_hit_skips_decoding(self, encode_profile, load_large_profile):
+        """Test that a second lookup of the same header does not decode"""
+        header = encode_profile(load_large_profile())
+        decoder = CountingDecoder()
+        cache = ProfileCache()
+
+        first = cache.get_or_decode(header, decoder=decoder)
+        second = cache.get_or_decode(header, decoder=decoder)
+
+        assert decoder.calls == 1
+        assert first is second
+        assert isinstance(second, Profile)
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 1
+        assert cache.stats.entries == 1
+        # Decoded profiles hold far more memory than their header
+        assert cache.stats.size_bytes > len(header)
+
+    def test_str_and_bytes_share_entries(
+        self, encode_profile, load_large_profile
+    ):
+        """Test that str and bytes headers map to the same entry"""
+        header = encode_profile(load_large_profile())
+        decoder = CountingDecoder()
+        cache = ProfileCache()
+
+        cache.get_or_decode(header, decoder=decoder)
+        cache.get_or_decode(header.encode("ascii"), decoder=decoder)
+
+        assert decoder.calls == 1
+
+    def test_cached_profile_is_immutable(
+        self, encode_profile, load_large_profile
+    ):
+        """Test that cached profiles reject attribute assignment"""
+        header = encode_profile(load_large_profile())
+        cache = ProfileCache()
+
+        profile = cache.get_or_decode(header)
+
+        with pytest.raises(ValidationError):
+            profile.is_staff = True
+
+    def test_cached_profile_is_deeply_immutable(
+        self, encode_profile, load_large_profile
+    ):
+        """Test that nested values of cached profiles reject changes"""
+        header = encode_profile(load_large_profile())
+        cache = ProfileCache()
+
+        profile = cache.get_or_decode(header)
+
+        with pytest.raises(TypeError):
+            profile.owners.append(profile.owners[0])
+
+        with pytest.raises(ValidationError):
+            profile.owners[0].email = "other@example.com"
+
+        with pytest.raises(TypeError):
+            profile.licensed_resources.records.clear()
+
+        with pytest.raises(ValidationError):
+            profile.licensed_resources.records[0].role = "other"
+
+        again = cache.get_or_decode(header)
+
+        assert len(again.owners) == 1
+        assert again.owners[0].email != "other@example.com"
+        assert (
+            again.model_dump()
+            == decode_and_decompress_profile_from_base64(header).model_dump()
+        )
+
+    def test_cached_profile_copies_are_mutable(
+        self, encode_profile, load_large_profile
+    ):
+        """Test that copies of cached values can be changed"""
+        header = encode_profile(load_large_profile())
+        profile = ProfileCache().get_or_decode(header)
+
+        owners = list(profile.owners)
+        owners.append(profile.owners[0])
+        copied = profile.model_copy(deep=True)
+
+        assert len(owners) == 2
+        assert type(copied.owners) is list
+        assert copied == profile
+
+    def test_cached_profile_supports_filtering(
+        self, encode_profile, load_large_profile
+    ):
+        """Test that filters still work on cached profiles"""
+        profile_dict = load_large_profile()
+        header = encode_profile(profile_dict)
+        cache = ProfileCache()
+
+        cached = cache.get_or_decode(header)
+        original = Profile.model_validate(profile_dict)
+
+        tenant_id = original.licensed_resources.records[0].tenant_id
+
+        assert (
+            cached.with_read_access().on_tenant(tenant_id).filtering_state
+            == original.with_read_access().on_tenant(tenant_id).filtering_state
+        )
+
+    def test_ttl_expiration(self, encode_profile, load_large_profile):
+        """Test that entries expire after the TTL"""
+        header = encode_profile(load_large_profile())
+        decoder = CountingDecoder()
+        clock = FakeClock()
+        cache = ProfileCache(ttl=10, clock=clock)
+
+        cache.get_or_decode(header, decoder=decoder)
+        clock.now = 9.9
+        cache.get_or_decode(header, decoder=decoder)
+        assert decoder.calls == 1
+
+        clock.now = 10.0
+        cache.get_or_decode(header, decoder=decoder)
+        assert decoder.calls == 2
+        assert cache.stats.expirations == 1
+
+    def test_lru_eviction_by_entry_count(
+        self, encode_profile, load_large_profile
+    ):
+        """Test that the least recently used entry is evicted"""
+        profile_dict = load_large_profile()
+        headers = []
+        for is_staff in (False, True):
+            profile_dict["isStaff"] = is_staff
+            headers.append(encode_profile(profile_dict))
+
+        cache = ProfileCache(max_entries=1, scan_resistant=False)
+
+        cache.get_or_decode(headers[0])
+        cache.get_or_decode(headers[1])
+
+        assert cache.get(headers[0]) is None
+        assert cache.get(headers[1]) is not None
+        assert cache.stats.evictions == 1
+
+    def test_byte_budget(self, encode_profile, load_large_profile):
+        """Test that the byte budget bounds the cache size"""
+        header = encode_profile(load_large_profile())
+        sizing = ProfileCache()
+        sizing.get_or_decode(header)
+        size = sizing.stats.size_bytes
+
+        cache = ProfileCache(max_bytes=size - 1)
+        cache.get_or_decode(header)
+
+        assert len(cache) == 0
+        assert cache.stats.size_bytes == 0
+
+    def test_scan_resistant_admission(self, encode_profile, load_large_profile):
+        """Test that one-off headers do not evict hot entries"""
+        profile_dict = load_large_profile()
+        hot = encode_profile(profile_dict)
+        profile_dict["isStaff"] = True
+        cold = encode_profile(profile_dict)
+
+        cache = ProfileCache(max_entries=1)
+
+        cache.get_or_decode(hot)
+        cache.get_or_decode(cold)
+
+        assert cache.get(hot) is not None
+        assert cache.get(cold) is None
+        assert cache.stats.rejections == 1
+
+        # A second sighting admits the header
+        cache.get_or_decode(cold)
+
+        assert cache.get(cold) is not None
+        assert cache.get(hot) is None
+
+    def test_decoding_errors_are_not_cached(self):
+        """Test that failures propagate and are not cached"""
+        cache = ProfileCache()
+
+        with pytest.raises(ProfileDecodingError):
+            cache.get_or_decode("not-valid-base64!!!")
+
+        assert len(cache) == 0
+        assert cache.stats.misses == 1
+
+    def test_invalid_configuration(self):
+        """Test that non-positive limits are rejected"""
+        with pytest.raises(ValueError):
+            ProfileCache(max_entries=0)
+
+        with pytest.raises(ValueError):
+            ProfileCache(max_bytes=0)
+
+        with pytest.raises(ValueError):
+            ProfileCache(ttl=0)
@@ -0,0 +1,773 @@
+"""
+Tests for the ASGI profile middleware and the async profile dependencies
+"""
+
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from myc_http_tools.settings import (
+    DEFAULT_LICENSE_URL_CACHE_MAX_ENTRIES,
+    DEFAULT_PROFILE_KEY,
+)
+
+
+@pytest.fixture
+def settings():
+    """Inject settings, restoring the defaults afterwards."""
+    pytest.importorskip("fastapi")
+    from myc_http_tools.fastapi import MyceliumSettings, configure_settings
+
+    yield lambda **values: configure_settings(MyceliumSettings(**values))
+
+    configure_settings(
+        MyceliumSettings(
+            profile_cache=False,
+            license_url_cache_max_entries=DEFAULT_LICENSE_URL_CACHE_MAX_ENTRIES,
+        )
+    )
+
+
+# Names of the header dependencies exported by the FastAPI integration
+PROFILE_DEPENDENCIES = [
+    "get_profile_from_header",
+    "get_profile_from_header_required",
+    "get_profile_from_header_async",
+    "get_profile_from_header_required_async",
+    "get_lazy_profile_from_header",
+    "get_lazy_profile_from_header_required",
+]
+
+
+def make_client(lazy: bool = False):
+    """Build a test client of an app mounting the ASGI middleware."""
+    fastapi = pytest.importorskip("fastapi")
+    testclient = pytest.importorskip("fastapi.testclient")
+    from fastapi.responses import StreamingResponse
+
+    from myc_http_tools.fastapi import ProfileMiddleware
+
+    app = fastapi.FastAPI()
+    app.add_middleware(ProfileMiddleware, lazy=lazy)
+
+    @app.get("/me")
+    def me(request: fastapi.Request):
+        profile = request.state.profile
+        return {"accId": None if profile is None else str(profile.acc_id)}
+
+    @app.get("/health")
+    def health(request: fastapi.Request):
+        return {"decoded": request.state.profile.is_decoded}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([b"first,", b"second"]))
+
+    return testclient.TestClient(app)
+
+
+class TestProfileMiddleware:
+    """Test cases for the ASGI profile middleware"""
+
+    def test_profile_is_attached_to_request_state(
+        self, encode_profile, load_large_profile
+    ):
+        """Test that routes read the decoded profile from request state"""
+        profile_dict = load_large_profile()
+
+        response = make_client().get(
+            "/me", headers={DEFAULT_PROFILE_KEY: encode_profile(profile_dict)}
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"accId": profile_dict["accId"]}
+
+    def test_lazy_profile_is_not_decoded_until_read(self):
+        """Test that the lazy middleware attaches a LazyProfile"""
+        response = make_client(lazy=True).get(
+            "/health", headers={DEFAULT_PROFILE_KEY: "not-valid-base64!!!"}
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"decoded": False}
+
+    def test_development_mode_is_lenient(self, settings):
+        """Test that missing or invalid headers give no profile"""
+        settings(environment="development")
+        client = make_client()
+
+        for headers in ({}, {DEFAULT_PROFILE_KEY: "not-valid-base64!!!"}):
+            response = client.get("/me", headers=headers)
+
+            assert response.status_code == 200
+            assert response.json() == {"accId": None}
+
+    def test_production_errors_are_json_responses(self, settings):
+        """Test that rejected requests get the HTTP error as JSON"""
+        settings(environment="production")
+        client = make_client()
+
+        missing = client.get("/me")
+        invalid = client.get(
+            "/me", headers={DEFAULT_PROFILE_KEY: "not-valid-base64!!!"}
+        )
+
+        assert missing.status_code == 403
+        assert DEFAULT_PROFILE_KEY in missing.json()["detail"]
+        assert invalid.status_code == 401
+        assert invalid.json() == {
+            "detail": "Unable to check user identity. Please contact administrators"
+        }
+
+    def test_streaming_responses_pass_through(self):
+        """Test that streamed bodies reach the client untouched"""
+        with make_client() as client:
+            response = client.get("/stream")
+
+        assert response.status_code == 200
+        assert response.content == b"first,second"
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Thread pool counting the submitted tasks."""
+
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+@pytest.fixture
+def decoding_executor():
+    """Offload every header to a counting executor, restoring the defaults."""
+    from myc_http_tools.fastapi import configure_profile_decoding
+    from myc_http_tools.functions import configure_profile_cache
+
+    with CountingExecutor() as executor:
+        configure_profile_decoding(executor, offload_threshold=0)
+        yield executor
+
+    configure_profile_decoding()
+    configure_profile_cache(None)
+
+
+def make_dependency_client():
+    """Build a test client of an app using the async dependencies."""
+    fastapi = pytest.importorskip("fastapi")
+    testclient = pytest.importorskip("fastapi.testclient")
+
+    from myc_http_tools.fastapi import (
+        get_profile_from_header_async,
+        get_profile_from_header_required_async,
+    )
+
+    app = fastapi.FastAPI()
+
+    @app.get("/me")
+    async def me(profile=fastapi.Depends(get_profile_from_header_async)):
+        return {"accId": None if profile is None else str(profile.acc_id)}
+
+    @app.get("/required")
+    async def required(
+        profile=fastapi.Depends(get_profile_from_header_required_async),
+    ):
+        return {"accId": str(profile.acc_id)}
+
+    return testclient.TestClient(app)
+
+
+class TestAsyncProfileDependencies:
+    """Test cases for the async profile dependencies"""
+
+    def test_small_profiles_are_decoded_inline(
+        self, encode_profile, load_large_profile
+    ):
+        """Test that headers below the threshold skip the executor"""
+        from myc_http_tools.fastapi import configure_profile_decoding
+
+        profile_dict = load_large_profile()
+        header = encode_profile(profile_dict)
+
+        with CountingExecutor() as executor:
+            configure_profile_decoding(
+                executor, offload_threshold=len(header) + 1
+            )
+            try:
+                client = make_dependency_client()
+                responses = [
+                    client.get(path, headers={DEFAULT_PROFILE_KEY: header})
+                    for path in ("/me", "/required")
+                ]
+            finally:
+                configure_profile_decoding()
+
+        assert [response.json() for response in responses] == [
+            {"accId": profile_dict["accId"]}
+        ] * 2
+        assert executor.submitted == 0
+
+    def test_large_profiles_are_offloaded(
+        self, decoding_executor, encode_profile, load_large_profile
+    ):
+        """Test that headers above the threshold are decoded in the executor"""
+        profile_dict = load_large_profile()
+
+        response = make_dependency_client().get(
+            "/required",
+            headers={DEFAULT_PROFILE_KEY: encode_profile(profile_dict)},
+        )
+
+        assert response.json() == {"accId": profile_dict["accId"]}
+        assert decoding_executor.submitted == 1
+
+    def test_offloaded_profiles_are_cached(
+        self, decoding_executor, encode_profile, load_large_profile
+    ):
+        """Test that cached profiles are not offloaded again"""
+        from myc_http_tools.functions import (
+            ProfileCache,
+            configure_profile_cache,
+        )
+
+        configure_profile_cache(ProfileCache(scan_resistant=False))
+        client = make_dependency_client()
+        headers = {DEFAULT_PROFILE_KEY: encode_profile(load_large_profile())}
+
+        for _ in range(3):
+            assert client.get("/me", headers=headers).status_code == 200
+
+        assert decoding_executor.submitted == 1
+
+    def test_development_mode_is_lenient(self, settings, decoding_executor):
+        """Test that missing or invalid headers give no profile"""
+        settings(environment="development")
+        client = make_dependency_client()
+
+        for headers in ({}, {DEFAULT_PROFILE_KEY: "not-valid-base64!!!"}):
+            response = client.get("/me", headers=headers)
+
+            assert response.status_code == 200
+            assert response.json() == {"accId": None}
+
+    def test_production_errors(self, settings, decoding_executor):
+        """Test that missing and invalid headers are rejected"""
+        settings(environment="production")
+        client = make_dependency_client()
+        invalid = {DEFAULT_PROFILE_KEY: "not-valid-base64!!!"}
+
+        assert client.get("/me").status_code == 403
+        assert client.get("/me", headers=invalid).status_code == 401
+        assert client.get("/required", headers=invalid).status_code == 401
+
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    """Count the profile headers decoded by the FastAPI integration."""
+    from myc_http_tools.fastapi import middleware
+
+    calls = []
+    binding = middleware._settings_binding()
+    decode = binding.decoder
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args)
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(binding, "decoder", counting_decode)
+    return calls
+
+
+class TestProfileDecodedOncePerRequest:
+    """Test cases for the profile shared by the integration points"""
+
+    def make_client(self, middleware: bool):
+        """Build an app reading the profile through every integration point."""
+        fastapi = pytest.importorskip("fastapi")
+        testclient = pytest.importorskip("fastapi.testclient")
+
+        from myc_http_tools.fastapi import (
+            ProfileMiddleware,
+            get_current_profile,
+            get_profile_from_header,
+            get_profile_from_header_required_async,
+            get_profile_from_request,
+        )
+
+        def from_request(request: fastapi.Request):
+            return get_profile_from_request(request)
+
+        def service_account():
+            return str(get_current_profile().acc_id)
+
+        app = fastapi.FastAPI()
+        if middleware:
+            app.add_middleware(ProfileMiddleware)
+
+        @app.get("/me")
+        def me(
+            request: fastapi.Request,
+            optional=fastapi.Depends(get_profile_from_header),
+            required=fastapi.Depends(get_profile_from_header_required_async),
+            manual=fastapi.Depends(from_request),
+        ):
+            profiles = {id(optional), id(required), id(manual)}
+            if middleware:
+                profiles.add(id(request.state.profile))
+
+            return {"accId": str(manual.acc_id), "instances": len(profiles)}
+
+        @app.get("/service")
+        def service():
+            return {"accId": service_account()}
+
+        return testclient.TestClient(app)
+
+    @pytest.mark.parametrize("middleware", [False, True])
+    def test_header_is_decoded_once(
+        self, decode_calls, middleware, encode_profile, load_large_profile
+    ):
+        """Test that the middleware and the dependencies share one profile"""
+        profile_dict = load_large_profile()
+
+        response = self.make_client(middleware).get(
+            "/me", headers={DEFAULT_PROFILE_KEY: encode_profile(profile_dict)}
+        )
+
+        assert response.json() == {
+            "accId": profile_dict["accId"],
+            "instances": 1,
+        }
+        assert len(decode_calls) == 1
+
+    def test_current_profile_is_published(
+        self, decode_calls, encode_profile, load_large_profile
+    ):
+        """Test that service layers reach the profile of the request"""
+        profile_dict = load_large_profile()
+
+        response = self.make_client(middleware=True).get(
+            "/service",
+            headers={DEFAULT_PROFILE_KEY: encode_profile(profile_dict)},
+        )
+
+        assert response.json() == {"accId": profile_dict["accId"]}
+        assert len(decode_calls) == 1
+
+    def make_publishing_client(self, integration: str):
+        """Build an app publishing the profile without ProfileMiddleware."""
+        fastapi = pytest.importorskip("fastapi")
+        testclient = pytest.importorskip("fastapi.testclient")
+        from starlette.middleware.base import BaseHTTPMiddleware
+
+        from myc_http_tools.fastapi import (
+            get_current_profile,
+            get_profile_from_header,
+            get_profile_from_header_async,
+            profile_middleware,
+        )
+
+        app = fastapi.FastAPI()
+        dependencies = []
+        if integration == "middleware":
+            app.add_middleware(BaseHTTPMiddleware, dispatch=profile_middleware)
+        elif integration == "dependency":
+            dependencies.append(fastapi.Depends(get_profile_from_header_async))
+        else:
+            dependencies.append(fastapi.Depends(get_profile_from_header))
+
+        @app.get("/service", dependencies=dependencies)
+        def service():
+            try:
+                return {"accId": str(get_current_profile().acc_id)}
+            except LookupError:
+                return {"accId": None}
+
+        return testclient.TestClient(app)
+
+    @pytest.mark.parametrize("integration", ["middleware", "dependency"])
+    def test_current_profile_is_published_without_profile_middleware(
+        self, integration, encode_profile, load_large_profile
+    ):
+        """Test that the other integration points publish the profile too"""
+        profile_dict = load_large_profile()
+
+        response = self.make_publishing_client(integration).get(
+            "/service",
+            headers={DEFAULT_PROFILE_KEY: encode_profile(profile_dict)},
+        )
+
+        assert response.json() == {"accId": profile_dict["accId"]}
+
+    def test_sync_dependencies_do_not_publish_the_profile(
+        self, encode_profile, load_large_profile
+    ):
+        """Test that profiles decoded in the threadpool stay unpublished"""
+        response = self.make_publishing_client("sync_dependency").get(
+            "/service",
+            headers={DEFAULT_PROFILE_KEY: encode_profile(load_large_profile())},
+        )
+
+        assert response.json() == {"accId": None}
+
+    def test_lazy_dependency_reuses_the_attached_profile(
+        self, settings, encode_profile, load_large_profile
+    ):
+        """Test that the lazy dependency prefers the profile of the request"""
+        fastapi = pytest.importorskip("fastapi")
+        testclient = pytest.importorskip("fastapi.testclient")
+
+        from myc_http_tools.fastapi import (
+            ProfileMiddleware,
+            get_lazy_profile_from_header,
+        )
+
+        settings(environment="production", profile_key="X-Profile")
+        profile_dict = load_large_profile()
+
+        app = fastapi.FastAPI()
+        app.add_middleware(ProfileMiddleware)
+
+        @app.get("/me")
+        def me(profile=fastapi.Depends(get_lazy_profile_from_header)):
+            return {"accId": str(profile.acc_id)}
+
+        response = testclient.TestClient(app).get(
+            "/me", headers={"X-Profile": encode_profile(profile_dict)}
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"accId": profile_dict["accId"]}
+
+    def test_current_profile_outside_requests(self):
+        """Test that reading the profile outside a request fails"""
+        pytest.importorskip("fastapi")
+        from myc_http_tools.fastapi import get_current_profile
+
+        with pytest.raises(LookupError):
+            get_current_profile()
+
+
+class TestSettings:
+    """Test cases for the settings of the FastAPI integration"""
+
+    def test_environment_is_read_once(self, monkeypatch, settings):
+        """Test that the environment mode is not read per request"""
+        settings(environment="development")
+        monkeypatch.setenv("ENVIRONMENT", "production")
+
+        response = make_client().get("/me")
+
+        assert response.status_code == 200
+        assert response.json() == {"accId": None}
+
+    @pytest.mark.parametrize(
+        "environment, status_code", [("development", 200), ("production", 403)]
+    )
+    def test_environment_is_read_on_first_use(
+        self, monkeypatch, environment, status_code
+    ):
+        """Test that an environment set after the import is honored"""
+        pytest.importorskip("fastapi")
+        from myc_http_tools.fastapi import middleware
+
+        monkeypatch.setattr(middleware, "_binding", None)
+        monkeypatch.setenv("ENVIRONMENT", environment)
+
+        response = make_client().get("/me")
+
+        assert response.status_code == status_code
+        assert middleware.get_settings().environment == environment
+
+    def test_from_env(self):
+        """Test that the mode is read from ENVIRONMENT"""
+        from myc_http_tools.fastapi import MyceliumSettings
+
+        assert MyceliumSettings.from_env({}).is_development
+        assert not MyceliumSettings.from_env(
+            {"ENVIRONMENT": "production"}
+        ).is_development
+
+    def test_settings_are_immutable(self):
+        """Test that settings cannot be changed once built"""
+        from pydantic import ValidationError
+
+        from myc_http_tools.fastapi import MyceliumSettings
+
+        with pytest.raises(ValidationError):
+            MyceliumSettings().environment = "production"
+
+    def test_profile_key_is_configurable(
+        self, settings, encode_profile, load_large_profile
+    ):
+        """Test that the middleware reads the configured header"""
+        profile_dict = load_large_profile()
+        settings(profile_key="X-Profile")
+
+        response = make_client().get(
+            "/me", headers={"x-profile": encode_profile(profile_dict)}
+        )
+
+        assert response.json() == {"accId": profile_dict["accId"]}
+
+    @pytest.mark.parametrize("dependency", PROFILE_DEPENDENCIES)
+    def test_dependencies_read_the_configured_header(
+        self, settings, dependency, encode_profile, load_large_profile
+    ):
+        """Test that the header dependencies read the configured header"""
+        fastapi = pytest.importorskip("fastapi")
+        testclient = pytest.importorskip("fastapi.testclient")
+
+        from myc_http_tools import fastapi as integration
+
+        profile_dict = load_large_profile()
+        settings(environment="production", profile_key="X-Profile")
+
+        app = fastapi.FastAPI()
+
+        @app.get("/me")
+        def me(profile=fastapi.Depends(getattr(integration, dependency))):
+            return {"accId": str(profile.acc_id)}
+
+        client = testclient.TestClient(app)
+        header = encode_profile(profile_dict)
+
+        response = client.get("/me", headers={"X-Profile": header})
+        assert response.json() == {"accId": profile_dict["accId"]}
+
+        response = client.get("/me", headers={DEFAULT_PROFILE_KEY: header})
+        assert response.status_code in (401, 403)
+
+    @pytest.mark.parametrize("dependency", PROFILE_DEPENDENCIES)
+    def test_dependencies_declare_the_header(self, dependency):
+        """Test that the header dependencies declare the header to OpenAPI"""
+        fastapi = pytest.importorskip("fastapi")
+
+        from myc_http_tools import fastapi as integration
+
+        app = fastapi.FastAPI()
+
+        @app.get("/me")
+        def me(profile=fastapi.Depends(getattr(integration, dependency))):
+            return {}
+
+        parameters = app.openapi()["paths"]["/me"]["get"]["parameters"]
+
+        assert [(p["name"], p["in"]) for p in parameters] == [
+            (DEFAULT_PROFILE_KEY, "header")
+        ]
+
+    @pytest.mark.parametrize("dependency", PROFILE_DEPENDENCIES)
+    def test_dependencies_called_directly(
+        self, dependency, encode_profile, load_large_profile
+    ):
+        """Test that a given header overrides the one of the request"""
+        pytest.importorskip("fastapi")
+        from starlette.requests import Request
+
+        from myc_http_tools import fastapi as integration
+
+        profile_dict = load_large_profile()
+        request = Request({"type": "http", "headers": []})
+
+        profile = getattr(integration, dependency)(
+            encode_profile(profile_dict), request=request
+        )
+        if inspect.iscoroutine(profile):
+            profile = asyncio.run(profile)
+
+        assert str(profile.acc_id) == profile_dict["accId"]
+
+    def test_size_limits_are_applied(self, settings, encode_profile):
+        """Test that oversized headers are rejected"""
+        settings(environment="production", max_profile_header_size=16)
+
+        response = make_client().get(
+            "/me", headers={DEFAULT_PROFILE_KEY: encode_profile({})}
+        )
+
+        assert response.status_code == 401
+
+    def test_profile_cache_is_configured(self, settings):
+        """Test that the settings enable the profile cache"""
+        from myc_http_tools.functions import get_profile_cache
+
+        settings(profile_cache=True, profile_cache_max_entries=8)
+
+        assert get_profile_cache().max_entries == 8
+
+    def test_zstd_backend_is_selected_at_startup(self, monkeypatch, settings):
+        """Test that configuring the integration runs the backend benchmark"""
+        from myc_http_tools.functions import zstd_backends
+
+        monkeypatch.setattr(zstd_backends, "_selected_backend", None)
+
+        settings(environment="production")
+
+        assert zstd_backends._selected_backend is not None
+
+    def test_standalone_caches_are_kept(self, settings):
+        """Test that settings without cache fields keep the configured caches"""
+        from myc_http_tools.functions import (
+            ProfileCache,
+            configure_profile_cache,
+            get_profile_cache,
+        )
+        from myc_http_tools.models.licensed_resources import (
+            configure_license_url_cache,
+            get_license_url_cache_stats,
+        )
+
+        cache = ProfileCache(max_entries=3)
+        configure_profile_cache(cache)
+        configure_license_url_cache(5)
+
+        settings(environment="production")
+
+        assert get_profile_cache() is cache
+        assert get_license_url_cache_stats().max_entries == 5
+
+
+class TestRequires:
+    """Test cases for the route-level authorization dependency"""
+
+    def make_client(self, **requirements):
+        """Build an app with a route depending on `requires`."""
+        fastapi = pytest.importorskip("fastapi")
+        testclient = pytest.importorskip("fastapi.testclient")
+
+        from myc_http_tools.fastapi import requires
+
+        app = fastapi.FastAPI()
+
+        @app.get("/tenants/{tenant_id}/accounts/{account_id}")
+        async def account(related=fastapi.Depends(requires(**requirements))):
+            return related.model_dump(mode="json")
+
+        return testclient.TestClient(app)
+
+    @staticmethod
+    def member_profile(profile_dict: dict) -> dict:
+        """Remove the manager privileges of a profile."""
+        profile_dict["isManager"] = False
+        return profile_dict
+
+    @staticmethod
+    def path(record: dict) -> str:
+        """Return the route path of a license."""
+        return f"/tenants/{record['tenantId']}/accounts/{record['accId']}"
+
+    def test_granted_requests_get_related_accounts(
+        self, encode_profile, load_large_profile
+    ):
+        """Test that matching licenses give their accounts"""
+        profile_dict = self.member_profile(load_large_profile())
+        record = profile_dict["licensedResources"]["records"][0]
+        client = self.make_client(
+            roles=[record["role"]],
+            tenant_from="path:tenant_id",
+            account_from="path:account_id",
+        )
+
+        response = client.get(
+            self.path(record),
+            headers={DEFAULT_PROFILE_KEY: encode_profile(profile_dict)},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["type"] == "allowed_accounts"
+        assert set(response.json()["accounts"]) == {record["accId"]}
+
+    def test_privileged_profiles_are_granted(
+        self, encode_profile, load_large_profile
+    ):
+        """Test that manager profiles skip the license lookup"""
+        profile_dict = load_large_profile()
+        record = profile_dict["licensedResources"]["records"][0]
+        client = self.make_client(
+            roles=["unknown"], tenant_from="path:tenant_id"
+        )
+
+        response = client.get(
+            self.path(record),
+            headers={DEFAULT_PROFILE_KEY: encode_profile(profile_dict)},
+        )
+
+        assert response.json() == {"type": "has_manager_privileges"}
+
+    def test_denied_requests_are_forbidden(
+        self, encode_profile, load_large_profile
+    ):
+        """Test that unmatched filters give HTTP 403"""
+        profile_dict = self.member_profile(load_large_profile())
+        record = profile_dict["licensedResources"]["records"][0]
+        client = self.make_client(
+            roles=["unknown"], tenant_from="path:tenant_id"
+        )
+
+        response = client.get(
+            self.path(record),
+            headers={DEFAULT_PROFILE_KEY: encode_profile(profile_dict)},
+        )
+
+        assert response.status_code == 403
+        assert response.json() == {
+            "detail": "Insufficient privileges to access this resource"
+        }
+        assert record["tenantId"] not in response.text
+
+    def test_other_errors_propagate(
+        self, monkeypatch, encode_profile, load_large_profile
+    ):
+        """Test that errors other than denials are not turned into HTTP 403"""
+        from myc_http_tools.exceptions import MyceliumError
+        from myc_http_tools.models.profile import Profile
+
+        def fail(*args, **kwargs):
+            raise MyceliumError("Unexpected failure")
+
+        monkeypatch.setattr(Profile, "authorize", fail)
+        profile_dict = self.member_profile(load_large_profile())
+
+        with pytest.raises(MyceliumError):
+            self.make_client().get(
+                self.path(profile_dict["licensedResources"]["records"][0]),
+                headers={DEFAULT_PROFILE_KEY: encode_profile(profile_dict)},
+            )
+
+    def test_invalid_parameters_are_rejected(
+        self, encode_profile, load_large_profile
+    ):
+        """Test that invalid UUID parameters give HTTP 400"""
+        client = self.make_client(tenant_from="path:tenant_id")
+
+        response = client.get(
+            "/tenants/not-a-uuid/accounts/any",
+            headers={
+                DEFAULT_PROFILE_KEY: encode_profile(
+                    self.member_profile(load_large_profile())
+                )
+            },
+        )
+
+        assert response.status_code == 400
+
+    def test_missing_profile_is_unauthorized(self, settings):
+        """Test that requests without a profile give HTTP 401"""
+        settings(environment="development")
+
+        response = self.make_client().get("/tenants/any/accounts/any")
+
+        assert response.status_code == 401
+
+    def test_invalid_sources_are_rejected(self):
+        """Test that sources are checked when the route is defined"""
+        pytest.importorskip("fastapi")
+        from myc_http_tools.fastapi import requires
+
+        with pytest.raises(ValueError):
+            requires(tenant_from="cookie:tenant_id")
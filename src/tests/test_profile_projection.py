@@ -0,0 +1,284 @@
+"""
+Tests for projection decoding of profiles
+"""
+
+import base64
+from uuid import UUID
+
+import pytest
+import zstandard as zstd
+from pydantic import ValidationError
+
+from myc_http_tools.exceptions import ProfileDecodingError, ProfileTooLargeError
+from myc_http_tools.functions import decode_profile_projection
+from myc_http_tools.models.permission import Permission
+from myc_http_tools.models.profile import Profile
+
+
+def to_url(record: dict) -> str:
+    """Encode a license record as a license URL."""
+    name = base64.b64encode(record["accName"].encode("utf-8")).decode("ascii")
+    perm = Permission(record["perm"]).to_int()
+    return (
+        f"t/{record['tenantId']}/a/{record['accId']}/r/{record['roleId']}"
+        f"?p={record['role']}:{perm}&s={int(record['sysAcc'])}"
+        f"&v={int(record['verified'])}&n={name}"
+    )
+
+
+def first_tenant(profile_dict: dict) -> UUID:
+    """Return the tenant of the first licensed resource."""
+    return UUID(profile_dict["licensedResources"]["records"][0]["tenantId"])
+
+
+class TestProfileProjection:
+    """Test cases for Profile.model_validate_projection"""
+
+    def test_only_selected_fields_are_validated(self, load_large_profile):
+        """Test that fields left out of the projection are not validated"""
+        profile = Profile.model_validate_projection(
+            load_large_profile(), ["accId", "is_staff"]
+        )
+
+        assert set(profile.__dict__) == {"acc_id", "is_staff"}
+
+    def test_other_fields_are_validated_on_access(self, load_large_profile):
+        """Test that fields left out are validated on first access"""
+        profile_dict = load_large_profile()
+        full = Profile.model_validate(profile_dict)
+
+        profile = Profile.model_validate_projection(profile_dict, ["accId"])
+
+        assert profile.licensed_resources == full.licensed_resources
+        assert profile.is_manager == full.is_manager
+        assert "licensed_resources" in profile.__dict__
+
+    def test_projection_behaves_like_full_profile(self, load_large_profile):
+        """Test equality, serialization and repr against a full profile"""
+        profile_dict = load_large_profile()
+        full = Profile.model_validate(profile_dict)
+
+        profile = Profile.model_validate_projection(profile_dict, ["accId"])
+
+        assert profile.model_dump_json(by_alias=True) == full.model_dump_json(
+            by_alias=True
+        )
+        assert profile == full
+        assert repr(profile) == repr(full)
+
+    def test_invalid_field_raises_on_access_only(self, load_large_profile):
+        """Test that invalid fields left out raise on first access"""
+        profile_dict = load_large_profile()
+        profile_dict["ownerIsActive"] = "not-a-bool"
+
+        profile = Profile.model_validate_projection(profile_dict, ["accId"])
+
+        with pytest.raises(ValidationError):
+            profile.owner_is_active
+
+    def test_invalid_selected_field_raises(self, load_large_profile):
+        """Test that invalid selected fields raise on validation"""
+        profile_dict = load_large_profile()
+        profile_dict["accId"] = "not-a-uuid"
+
+        with pytest.raises(ValidationError):
+            Profile.model_validate_projection(profile_dict, ["accId"])
+
+    def test_unknown_field(self, load_large_profile):
+        """Test that unknown field names are rejected"""
+        with pytest.raises(ValueError, match="Unknown profile field"):
+            Profile.model_validate_projection(load_large_profile(), ["unknown"])
+
+    def test_tenant_projection_with_records(self, load_large_profile):
+        """Test that tenant projections match on_tenant"""
+        profile_dict = load_large_profile()
+        tenant_id = first_tenant(profile_dict)
+        full = Profile.model_validate(profile_dict)
+
+        profile = Profile.model_validate_projection(
+            profile_dict, ["accId"], tenant_id=tenant_id
+        )
+
+        assert profile == full.on_tenant(tenant_id)
+        assert profile.filtering_state == [f"1:tenantId:{tenant_id}"]
+
+    def test_tenant_projection_with_urls(self, load_large_profile):
+        """Test that tenant projections of URLs match on_tenant"""
+        profile_dict = load_large_profile()
+        tenant_id = first_tenant(profile_dict)
+        records = profile_dict["licensedResources"]["records"]
+        profile_dict["licensedResources"] = {
+            "urls": [to_url(record) for record in records]
+        }
+        full = Profile.model_validate(profile_dict)
+
+        profile = Profile.model_validate_projection(
+            profile_dict, ["accId"], tenant_id=tenant_id
+        )
+
+        assert profile == full.on_tenant(tenant_id)
+
+    def test_tenant_projection_skips_other_tenants(self, load_large_profile):
+        """Test that licenses of other tenants are not validated"""
+        profile_dict = load_large_profile()
+        tenant_id = first_tenant(profile_dict)
+        records = profile_dict["licensedResources"]["records"]
+
+        for record in records:
+            if UUID(record["tenantId"]) != tenant_id:
+                record["perm"] = "invalid"
+
+        profile = Profile.model_validate_projection(
+            profile_dict, ["accId"], tenant_id=tenant_id
+        )
+
+        assert all(
+            record.tenant_id == tenant_id
+            for record in profile.licensed_resources.records
+        )
+
+    def test_tenant_projection_without_licenses(self, load_large_profile):
+        """Test that unknown tenants leave no licensed resources"""
+        profile = Profile.model_validate_projection(
+            load_large_profile(),
+            ["accId"],
+            tenant_id=UUID("00000000-0000-0000-0000-000000000000"),
+        )
+
+        assert profile.licensed_resources is None
+
+    def test_filters_on_projection(self, load_large_profile):
+        """Test that filters work on projected profiles"""
+        profile_dict = load_large_profile()
+        tenant_id = first_tenant(profile_dict)
+        full = Profile.model_validate(profile_dict)
+
+        profile = Profile.model_validate_projection(profile_dict, ["accId"])
+
+        assert profile.with_write_access().on_tenant(
+            tenant_id
+        ) == full.with_write_access().on_tenant(tenant_id)
+
+
+class TestDecodeProfileProjection:
+    """Test cases for decode_profile_projection function"""
+
+    def test_decode_projection(self, encode_profile, load_large_profile):
+        """Test decoding a projection from the profile header"""
+        profile_dict = load_large_profile()
+        tenant_id = first_tenant(profile_dict)
+
+        profile = decode_profile_projection(
+            encode_profile(profile_dict), ["accId"], tenant_id=tenant_id
+        )
+
+        assert profile == Profile.model_validate(profile_dict).on_tenant(
+            tenant_id
+        )
+
+    def test_invalid_selected_field(self, encode_profile, load_large_profile):
+        """Test that invalid selected fields raise ProfileDecodingError"""
+        profile_dict = load_large_profile()
+        profile_dict["accId"] = "not-a-uuid"
+
+        with pytest.raises(ProfileDecodingError, match="deserialize"):
+            decode_profile_projection(encode_profile(profile_dict), ["accId"])
+
+    def test_not_a_json_object(self):
+        """Test that non-object documents raise ProfileDecodingError"""
+        header = base64.standard_b64encode(
+            zstd.ZstdCompressor().compress(b"[]")
+        ).decode("ascii")
+
+        with pytest.raises(ProfileDecodingError, match="JSON object"):
+            decode_profile_projection(header, ["accId"])
+
+    def test_licensed_resources_limit(self, encode_profile, load_large_profile):
+        """Test that the limit applies before the tenant selection"""
+        profile_dict = load_large_profile()
+
+        with pytest.raises(ProfileTooLargeError):
+            decode_profile_projection(
+                encode_profile(profile_dict),
+                ["accId"],
+                tenant_id=first_tenant(profile_dict),
+                max_licensed_resources=10,
+            )
+
+
+class TestProfileProjectionFastAPI:
+    """Test cases for the projection FastAPI dependency"""
+
+    @pytest.fixture
+    def client(self):
+        fastapi = pytest.importorskip("fastapi")
+        testclient = pytest.importorskip("fastapi.testclient")
+
+        from myc_http_tools.fastapi import get_profile_projection_from_header
+
+        app = fastapi.FastAPI()
+
+        @app.get("/tenants/{tenant_id}/accounts")
+        def accounts(
+            profile: Profile = fastapi.Depends(
+                get_profile_projection_from_header(
+                    ["accId", "isStaff"], tenant_path_param="tenant_id"
+                )
+            ),
+        ):
+            return [
+                str(record.acc_id)
+                for record in profile.licensed_resources.records
+            ]
+
+        return testclient.TestClient(app)
+
+    def test_tenant_from_path(self, client, encode_profile, load_large_profile):
+        """Test that the tenant is read from the path"""
+        profile_dict = load_large_profile()
+        tenant_id = first_tenant(profile_dict)
+        expected = [
+            record["accId"]
+            for record in profile_dict["licensedResources"]["records"]
+            if UUID(record["tenantId"]) == tenant_id
+        ]
+
+        response = client.get(
+            f"/tenants/{tenant_id}/accounts",
+            headers={"x-mycelium-profile": encode_profile(profile_dict)},
+        )
+
+        assert response.status_code == 200
+        assert response.json() == expected
+
+    def test_invalid_tenant(self, client, encode_profile, load_large_profile):
+        """Test that invalid tenant UUIDs are rejected"""
+        response = client.get(
+            "/tenants/not-a-uuid/accounts",
+            headers={
+                "x-mycelium-profile": encode_profile(load_large_profile())
+            },
+        )
+
+        assert response.status_code == 400
+
+    def test_invalid_profile(self, client, encode_profile, load_large_profile):
+        """Test that decoding failures raise HTTP 401"""
+        profile_dict = load_large_profile()
+        profile_dict["accId"] = "not-a-uuid"
+
+        response = client.get(
+            f"/tenants/{first_tenant(profile_dict)}/accounts",
+            headers={"x-mycelium-profile": encode_profile(profile_dict)},
+        )
+
+        assert response.status_code == 401
+
+    def test_unknown_field(self):
+        """Test that unknown fields are rejected when building the dependency"""
+        pytest.importorskip("fastapi")
+
+        from myc_http_tools.fastapi import get_profile_projection_from_header
+
+        with pytest.raises(ValueError):
+            get_profile_projection_from_header(["unknown"])
@@ -0,0 +1,101 @@
+"""
+Tests for ZstdDecompressorPool
+"""
+
+import base64
+import json
+import threading
+
+import pytest
+import zstandard as zstd
+
+from myc_http_tools.functions import (
+    ZstdDecompressorPool,
+    ZstdDictionary,
+    decode_and_decompress_profile_from_base64,
+)
+
+
+class TestZstdDecompressorPool:
+    """Test cases for ZstdDecompressorPool"""
+
+    def test_context_is_reused_within_a_thread(self):
+        """Test that the same thread always gets the same context"""
+        pool = ZstdDecompressorPool()
+
+        assert pool.get() is pool.get()
+
+    def test_contexts_are_not_shared_between_threads(self):
+        """Test that each thread gets its own context"""
+        pool = ZstdDecompressorPool()
+        contexts = []
+
+        thread = threading.Thread(target=lambda: contexts.append(pool.get()))
+        thread.start()
+        thread.join()
+
+        assert contexts[0] is not pool.get()
+
+    def test_decompress_with_content_size(self, large_profile_bytes):
+        """Test decompression of frames declaring their content size"""
+        payload = large_profile_bytes
+        compressed = zstd.ZstdCompressor().compress(payload)
+
+        assert ZstdDecompressorPool().decompress(compressed) == payload
+
+    def test_decompress_without_content_size(self, large_profile_bytes):
+        """Test decompression of frames without content size"""
+        payload = large_profile_bytes
+        compressed = zstd.ZstdCompressor(write_content_size=False).compress(
+            payload
+        )
+
+        assert ZstdDecompressorPool().decompress(compressed) == payload
+
+    def test_decompress_memoryview(self, large_profile_bytes):
+        """Test decompression of a memoryview slice"""
+        payload = large_profile_bytes
+        compressed = zstd.ZstdCompressor().compress(payload)
+        buffer = memoryview(b"xx" + compressed)[2:]
+
+        assert ZstdDecompressorPool().decompress(buffer) == payload
+
+    def test_decompress_invalid_frame(self):
+        """Test that invalid frames raise ZstdError"""
+        with pytest.raises(zstd.ZstdError):
+            ZstdDecompressorPool().decompress(b"not zstd data")
+
+    def test_decode_profile_from_memoryview(self, large_profile_bytes):
+        """Test that the decoder accepts memoryview headers"""
+        payload = large_profile_bytes
+        compressed = zstd.ZstdCompressor().compress(payload)
+        header = base64.standard_b64encode(compressed)
+
+        profile = decode_and_decompress_profile_from_base64(memoryview(header))
+
+        assert str(profile.acc_id) == json.loads(payload)["accId"]
+
+    def test_contexts_follow_replaced_dictionaries(self):
+        """Test that a dictionary replaced under the same ID is used"""
+        dictionaries = [
+            zstd.train_dictionary(
+                1024,
+                [
+                    json.dumps({"kind": kind, "index": index}).encode()
+                    for index in range(200)
+                ],
+                dict_id=7,
+            )
+            for kind in ("first", "second")
+        ]
+        payload = json.dumps({"kind": "second", "index": 1}).encode()
+        frame = zstd.ZstdCompressor(dict_data=dictionaries[1]).compress(payload)
+
+        pool = ZstdDecompressorPool()
+        first, second = (
+            ZstdDictionary(dictionary.as_bytes()) for dictionary in dictionaries
+        )
+
+        assert first.dict_id == second.dict_id
+        assert pool.get(first) is pool.get(first)
+        assert pool.decompress(frame, dictionary=second) == payload
@@ -0,0 +1,132 @@
+"""
+Tests for ZSTD dictionary support
+"""
+
+import base64
+import json
+import random
+
+import pytest
+import zstandard as zstd
+
+from myc_http_tools.exceptions import ProfileDecodingError
+from myc_http_tools.functions import (
+    decode_and_decompress_profile_from_base64,
+    get_zstd_backend,
+    get_zstd_backends,
+    get_zstd_dictionary,
+    register_zstd_dictionary,
+    set_zstd_backend,
+    train_profile_dictionary,
+    unregister_zstd_dictionary,
+)
+from myc_http_tools.models.profile import Profile
+
+
+def profile_corpus(profile_dict: dict, size: int = 200) -> list[dict]:
+    """Build a corpus of profiles holding random subsets of the licenses."""
+    records = profile_dict["licensedResources"]["records"]
+    corpus = []
+
+    for seed in range(size):
+        rng = random.Random(seed)
+        sample = dict(profile_dict)
+        sample["licensedResources"] = {
+            "records": rng.sample(records, rng.randint(1, 40))
+        }
+        corpus.append(sample)
+
+    return corpus
+
+
+@pytest.fixture(scope="module")
+def trained(load_large_profile):
+    dictionary, report = train_profile_dictionary(
+        profile_corpus(load_large_profile())
+    )
+    yield dictionary, report
+    unregister_zstd_dictionary(report.dict_id)
+
+
+class TestTrainProfileDictionary:
+    """Test cases for train_profile_dictionary function"""
+
+    def test_report(self, trained):
+        """Test that the report reflects the dictionary gain"""
+        dictionary, report = trained
+
+        assert report.dict_id == dictionary.dict_id()
+        assert report.samples == 200
+        assert report.dictionary_size == len(dictionary.as_bytes())
+        assert report.compressed_size_with_dictionary < report.compressed_size
+        assert report.ratio_with_dictionary > report.ratio
+        assert 0 < report.size_reduction < 1
+
+    def test_accepts_profile_objects(self, load_large_profile):
+        """Test that Profile objects can be used as samples"""
+        corpus = [
+            Profile.model_validate(p)
+            for p in profile_corpus(load_large_profile(), 100)
+        ]
+
+        _, report = train_profile_dictionary(corpus, dict_size=4096)
+
+        assert report.samples == 100
+
+    def test_empty_corpus(self):
+        """Test that an empty corpus is rejected"""
+        with pytest.raises(ValueError):
+            train_profile_dictionary([])
+
+
+class TestDictionaryDecoding:
+    """Test cases for dictionary-aware decoding"""
+
+    def test_register_dictionary(self, trained):
+        """Test that dictionaries are registered by their ID"""
+        dictionary, _ = trained
+
+        dict_id = register_zstd_dictionary(dictionary)
+
+        assert dict_id == dictionary.dict_id()
+        assert get_zstd_dictionary(dict_id).data == dictionary.as_bytes()
+
+    def test_register_invalid_dictionary(self):
+        """Test that raw content without the dictionary magic is rejected"""
+        with pytest.raises(ValueError):
+            register_zstd_dictionary(b"not a dictionary")
+
+    @pytest.mark.parametrize("backend", sorted(get_zstd_backends()))
+    def test_decode_with_dictionary(self, trained, backend, load_large_profile):
+        """Test decoding dictionary-compressed profiles on every backend"""
+        dictionary, _ = trained
+        register_zstd_dictionary(dictionary)
+
+        payload = json.dumps(load_large_profile()).encode("utf-8")
+        compressed = zstd.ZstdCompressor(dict_data=dictionary).compress(payload)
+        encoded = base64.standard_b64encode(compressed)
+
+        previous = get_zstd_backend()
+        try:
+            set_zstd_backend(backend)
+            profile = decode_and_decompress_profile_from_base64(encoded)
+        finally:
+            set_zstd_backend(previous.name)
+
+        assert profile == Profile.model_validate_json(payload)
+
+    def test_decode_with_unknown_dictionary(self, trained, load_large_profile):
+        """Test error when the frame dictionary is not registered"""
+        dictionary, report = trained
+        unregister_zstd_dictionary(report.dict_id)
+
+        compressed = zstd.ZstdCompressor(dict_data=dictionary).compress(
+            json.dumps(load_large_profile()).encode("utf-8")
+        )
+
+        with pytest.raises(ProfileDecodingError) as exc_info:
+            decode_and_decompress_profile_from_base64(
+                base64.standard_b64encode(compressed)
+            )
+
+        assert "Unknown ZSTD dictionary" in exc_info.value.message